@@ -32,8 +32,10 @@ from pathlib import Path
 import tomlkit
 
 from .app import App
+from .result_backend import AsyncResultHandle
 from .task import task
+from .workflow import chain, chord, group
 
 
 __version__ = "0.0.17"
-__all__ = ["__version__", "task", "App"]
+__all__ = ["__version__", "task", "App", "AsyncResultHandle", "chain", "chord", "group"]
@@ -8,8 +8,9 @@ import typing as t
 import typer
 
 from . import __version__
+from .beat import run_beat_forever
 from .config import Config
-from .interfaces import ConcurrencyType
+from .interfaces import ConcurrencyType, DispatchStrategy, PriorityMode
 from .worker import Defaults, run_worker_forever
 
 cli = typer.Typer()
@@ -36,6 +37,9 @@ def worker_command(
     poll_interval_s: t.Optional[float] = Defaults.poll_interval_s(),
     concurrency_type: t.Optional[ConcurrencyType] = Defaults.concurrency_type(),
     worker_rate_limit: t.Optional[int] = Defaults.worker_rate_limit(),
+    dispatch_strategy: t.Optional[DispatchStrategy] = Defaults.dispatch_strategy(),
+    priority_mode: t.Optional[PriorityMode] = Defaults.priority_mode(),
+    queues: t.Optional[str] = Defaults.queues(),
 ):
     """Command to start workers."""
     run_worker_forever(
@@ -43,10 +47,19 @@ def worker_command(
         concurrency=concurrency,
         concurrency_type=concurrency_type,
         worker_rate_limit=worker_rate_limit,
+        dispatch_strategy=dispatch_strategy,
+        priority_mode=priority_mode,
+        queues=queues,
         poll_interval_s=poll_interval_s,
     )
 
 
+@cli.command(name="beat")
+def beat_command(app: str):
+    """Command to apply the periodic tasks of an app on their schedule."""
+    run_beat_forever(app_import_path=app)
+
+
 @cli.command(name="metric")
 def metric_server(app: str):
     """Command to start server to collect and report tasks metrics (TODO)."""
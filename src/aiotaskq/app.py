@@ -15,14 +15,26 @@ if TYPE_CHECKING:
 class App:
     """Define the aiotaskq application instance."""
 
+    # All the tasks defined, by qualified name, i.e. "<module>.<qualname>"
     _task_registry: dict[str, "Task"] = {}
 
     def __getattribute__(self, name: str, /) -> Any:
-        """Get access to all task instances defined within the application."""
+        """
+        Get access to all task instances defined within the application, by name, e.g. `app.add`.
+
+        Tasks of different modules sharing the same name are only accessible by qualified name,
+        e.g. `getattr(app, "tasks.add")`.
+        """
 
         task_registry = object.__getattribute__(self, "_task_registry")
         if name in task_registry:
             return task_registry[name]
+        tasks: list["Task"] = [task for task in task_registry.values() if task.__name__ == name]
+        if len(tasks) > 1:
+            names = ", ".join(sorted(task.name for task in tasks))
+            raise AttributeError(f'Several tasks are named "{name}", access one of: {names}')
+        if tasks:
+            return tasks[0]
         return object.__getattribute__(self, name)
 
     def autodiscover_tasks(self, tasks_module_name: str = "tasks"):
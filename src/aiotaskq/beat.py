@@ -0,0 +1,175 @@
+"""
+Define the beat process, which applies the periodic tasks of an app on their schedule.
+
+Several beat processes can run for high availability. They elect a leader via a lease in Redis,
+which the leader renews every third of `AIOTASKQ_BEAT_LEASE_S`, and only the leader applies the
+tasks. The next time each task is due at is kept in Redis too, so that a beat process taking
+over goes on with the same schedule, applying once the tasks missed while there was no leader.
+
+At each tick, the leader claims all the tasks due at once with a Lua script, which fails if it
+has lost its lease meanwhile, then publishes them in bulk. It sleeps until the next task is
+due, so tasks are applied within a few milliseconds of their schedule.
+"""
+
+import asyncio
+import contextlib
+import signal
+import sys
+import time
+import typing as t
+import uuid
+
+from .config import Config
+from .constants import Constants
+from .pubsub import RedisConnectionPools
+from .registry import TaskRegistry
+from .routing import publish_tasks
+from .schedule import CronSchedule, IntervalSchedule, get_schedule, get_schedule_arguments
+from .task import Task
+from .worker import BaseWorker, validate_input
+
+# Acquire the lease if nobody holds it, or renew it if we hold it, and return whether we hold it
+# KEYS: leader key
+# ARGV: id of the beat process, lease in milliseconds
+_ELECT_SCRIPT = """
+local leader = redis.call("GET", KEYS[1])
+if leader == false then
+    redis.call("SET", KEYS[1], ARGV[1], "PX", ARGV[2])
+    return 1
+end
+if leader == ARGV[1] then
+    redis.call("PEXPIRE", KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Store the next time the due tasks are due at, unless we've lost the lease meanwhile
+# KEYS: leader key, schedule key
+# ARGV: id of the beat process, then the name and next time of each due task
+_CLAIM_SCRIPT = """
+if redis.call("GET", KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call("HSET", KEYS[2], unpack(ARGV, 2))
+return 1
+"""
+
+# Release the lease, unless another beat process holds it
+# KEYS: leader key
+# ARGV: id of the beat process
+_RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class Beat(BaseWorker):
+    """Apply the periodic tasks of an app on their schedule, see `aiotaskq.schedule`."""
+
+    def __init__(self, app_import_path: str) -> None:
+        """Import the app, and collect the schedules of its periodic tasks."""
+        super().__init__(app_import_path=app_import_path)
+        self.id: str = uuid.uuid4().hex
+        self.is_leader: bool = False
+        self._tasks: dict[str, Task] = {
+            task.name: task for task in TaskRegistry.all() if task.schedule is not None
+        }
+        self._schedules: dict[str, IntervalSchedule | CronSchedule] = {
+            name: get_schedule(task.schedule) for name, task in self._tasks.items()
+        }
+        # The next time each task is due at, as UNIX timestamps, only known to the leader
+        self._next_times: dict[str, float] = {}
+
+    async def _pre_run(self):
+        self._logger.info("Starting beat for %s periodic tasks", len(self._tasks))
+        loop = asyncio.get_event_loop()
+        loop.add_signal_handler(signal.SIGTERM, self._handle_murder_signals)
+        loop.add_signal_handler(signal.SIGINT, self._handle_murder_signals)
+
+    def _handle_murder_signals(self):
+        for task in asyncio.tasks.all_tasks():
+            task.cancel()
+
+    async def _main_loop(self):
+        client = RedisConnectionPools.get_client(url=Config.beat_url())
+        lease_s: float = Config.beat_lease_s()
+        try:
+            while True:
+                renew_at: float = time.time() + lease_s / 3
+                is_leader: bool = await client.register_script(_ELECT_SCRIPT)(
+                    keys=[Constants.beat_leader_key()], args=[self.id, int(lease_s * 1000)]
+                )
+                if is_leader and not self.is_leader:
+                    self._logger.info("Became the leader beat [id=%s]", self.id)
+                    await self._load_next_times(client)
+                self.is_leader = bool(is_leader)
+                wake_at: float = renew_at
+                if self.is_leader:
+                    await self._apply_due_tasks(client)
+                    wake_at = min([renew_at, *self._next_times.values()])
+                await asyncio.sleep(max(0.0, wake_at - time.time()))
+        finally:
+            if self.is_leader:
+                # Let another beat process take over right away
+                await client.register_script(_RELEASE_SCRIPT)(
+                    keys=[Constants.beat_leader_key()], args=[self.id]
+                )
+                self.is_leader = False
+
+    async def _load_next_times(self, client) -> None:
+        """Go on with the schedule left by the previous leader, if any."""
+        stored: dict[bytes, bytes] = await client.hgetall(Constants.beat_schedule_key())
+        now: float = time.time()
+        self._next_times = {}
+        for name, schedule in self._schedules.items():
+            next_time: t.Optional[bytes] = stored.get(name.encode())
+            self._next_times[name] = (
+                schedule.get_next(now) if next_time is None else float(next_time)
+            )
+
+    async def _apply_due_tasks(self, client) -> None:
+        now: float = time.time()
+        due: list[str] = [name for name, next_time in self._next_times.items() if next_time <= now]
+        if not due:
+            return
+        # The next times are computed from the schedules, not from when the tasks are applied, so
+        # that they don't drift, and the runs missed if any are skipped
+        next_times: dict[str, float] = {name: self._schedules[name].get_next(now) for name in due}
+        claimed: int = await client.register_script(_CLAIM_SCRIPT)(
+            keys=[Constants.beat_leader_key(), Constants.beat_schedule_key()],
+            args=[self.id, *[value for item in next_times.items() for value in item]],
+        )
+        if not claimed:
+            self._logger.info("Lost the lead to another beat [id=%s]", self.id)
+            self.is_leader = False
+            self._next_times = {}
+            return
+        self._next_times.update(next_times)
+        await self._publish(tasks=[self._tasks[name] for name in due])
+
+    async def _publish(self, tasks: list[Task]) -> None:
+        """Publish the calls to the tasks with their scheduled arguments, in bulk."""
+        calls: list[Task] = []
+        for task in tasks:
+            assert task.schedule is not None
+            task_ = task._bind_call(  # pylint: disable=protected-access
+                *get_schedule_arguments(task.schedule)
+            )
+            task_.id = task_.generate_task_id()
+            self._logger.debug("Applying periodic task %s [task_id=%s]", task.name, task_.id)
+            calls.append(task_)
+        await publish_tasks(calls)
+
+
+def run_beat_forever(app_import_path: str) -> None:
+    """Run the beat process in a forever loop."""
+    if (err_msg := validate_input(app_import_path=app_import_path)) is not None:
+        print(err_msg)
+        sys.exit(1)
+
+    beat = Beat(app_import_path=app_import_path)
+    with contextlib.suppress(asyncio.CancelledError):
+        beat.run_forever()
@@ -0,0 +1,129 @@
+"""
+Define the memoization of the results of pure tasks.
+
+Opt in per task with the task option `cache`, e.g. `options={"cache": {"ttl_s": 300}}`. The
+client hashes the canonical form of the arguments of each call into a cache key sent along with
+the task. The worker then returns the result stored under that key without executing the task,
+or executes it and stores its result. With `"client_lookup": True`, the client looks the key up
+itself before even publishing the task.
+
+Hits and misses are counted per namespace, see `ResultCache.stats`.
+"""
+
+import hashlib
+import json
+import typing as t
+
+from .config import Config
+from .pubsub import RedisConnectionPools
+
+if t.TYPE_CHECKING:
+    from .interfaces import CacheOptions
+    from .task import AsyncResult, Task
+
+_KEY_TEMPLATE = "cache:{namespace}:{task_name}:{digest}"
+_STATS_KEY_TEMPLATE = "cache:stats:{namespace}"
+
+
+class ResultCache:
+    """Expose the lookup and storage of the cached results of tasks."""
+
+    @classmethod
+    def get_key(cls, task: "Task") -> t.Optional[str]:
+        """
+        Return the cache key of the call held by the task, or None if it can't be cached.
+
+        Calls are canonicalized first, so that e.g. `add(1, 2)` and `add(y=2, x=1)` share a key.
+        """
+        assert task.cache is not None
+        digest: t.Optional[str] = get_call_digest(task)
+        if digest is None:
+            return None
+        return _KEY_TEMPLATE.format(
+            namespace=cls._get_namespace(task.cache), task_name=task.name, digest=digest
+        )
+
+    @classmethod
+    async def lookup(cls, task: "Task", count_miss: bool = True) -> t.Optional["AsyncResult"]:
+        """
+        Return the cached result of the call held by the task, with the task's id, if any.
+
+        Count the lookup as a hit, or as a miss if `count_miss` is True.
+        """
+        # pylint: disable=import-outside-toplevel
+        from .serde import Serialization
+        from .task import AsyncResult as AsyncResultClass
+
+        assert task.cache is not None and task.cache_key is not None
+        client = RedisConnectionPools.get_client(url=Config.cache_url())
+        message: t.Optional[bytes] = await client.get(task.cache_key)
+        stats_key = _STATS_KEY_TEMPLATE.format(namespace=cls._get_namespace(task.cache))
+        if message is None:
+            if count_miss:
+                await client.hincrby(stats_key, "misses", 1)
+            return None
+        await client.hincrby(stats_key, "hits", 1)
+        cached: AsyncResult = Serialization.deserialize(AsyncResultClass, message)
+        cached.task_id = task.id
+        return cached
+
+    @classmethod
+    async def store(cls, task: "Task", result: "AsyncResult") -> None:
+        """Store the result of the call held by the task, unless it's an error or too big."""
+        # pylint: disable=import-outside-toplevel
+        from .serde import Serialization
+        from .task import AsyncResult as AsyncResultClass
+
+        assert task.cache is not None and task.cache_key is not None
+        if result.error is not None:
+            return
+        # The task id is set back on lookup, since it differs for every call
+        cached = AsyncResultClass(task_id="", ready=True, result=result.result, error=None)
+        message: bytes = Serialization.serialize(cached)
+        max_size: int = task.cache.get("max_size", Config.cache_max_size())
+        if len(message) > max_size:
+            return
+        client = RedisConnectionPools.get_client(url=Config.cache_url())
+        await client.set(task.cache_key, message, ex=task.cache.get("ttl_s"))
+
+    @classmethod
+    async def stats(cls, namespace: t.Optional[str] = None) -> dict[str, int]:
+        """Return the number of hits and misses so far in the given namespace."""
+        client = RedisConnectionPools.get_client(url=Config.cache_url())
+        stats_key = _STATS_KEY_TEMPLATE.format(namespace=namespace or Config.cache_namespace())
+        counts: dict[bytes, bytes] = await client.hgetall(stats_key)
+        return {
+            "hits": int(counts.get(b"hits", 0)),
+            "misses": int(counts.get(b"misses", 0)),
+        }
+
+    @staticmethod
+    def _get_namespace(cache: "CacheOptions") -> str:
+        return cache.get("namespace") or Config.cache_namespace()
+
+
+def get_call_digest(task: "Task") -> t.Optional[str]:
+    """
+    Return the hash of the canonicalized arguments of the call held by the task, or None if they
+    can't be canonicalized, i.e. they're not JSON serializable, sets or buffers.
+    """
+    assert task.args is not None and task.kwargs is not None
+    bound = task._signature.bind(*task.args, **task.kwargs)  # pylint: disable=protected-access
+    bound.apply_defaults()
+    try:
+        canonical: str = json.dumps(
+            bound.arguments, sort_keys=True, separators=(",", ":"), default=_canonicalize
+        )
+    except (TypeError, ValueError):
+        return None
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _canonicalize(obj: t.Any) -> t.Any:
+    """
+    Return a JSON-compatible form of the argument that is the same in every process, or raise
+    TypeError if there is none, e.g. for objects whose repr holds their memory address.
+    """
+    if isinstance(obj, (set, frozenset)):
+        return sorted(json.dumps(o, sort_keys=True, default=_canonicalize) for o in obj)
+    return {"buffer": hashlib.blake2b(memoryview(obj)).hexdigest()}
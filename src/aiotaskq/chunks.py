@@ -0,0 +1,89 @@
+"""
+Define the packing of many calls to a task into chunks, each sent as a single message.
+
+For tiny tasks, the cost of a message, i.e. serialization, publishing to the worker manager, then
+to a grunt worker and publishing the result back, dominates the cost of the call itself. With
+`Task.chunks`, a grunt worker executes a whole chunk of calls in a tight loop, and returns all
+their results in a single message along with the time it took.
+
+The `"auto"` chunk size is tuned from that time: each client keeps an exponentially weighted
+moving average (EWMA) of the execution time per call of each task, and sizes the chunks so that
+each one takes about `AIOTASKQ_CHUNK_TARGET_S` seconds to execute.
+"""
+
+import asyncio
+import inspect
+import time
+import typing as t
+
+from .config import Config
+
+if t.TYPE_CHECKING:
+    from .task import Task
+
+# The arguments of an individual call in a chunk, as a pair of positional & keyword arguments
+ChunkItem = tuple[tuple[t.Any, ...], dict[str, t.Any]] | list
+
+# The size of the first chunk of a task whose execution time is not known yet
+_PROBE_SIZE = 16
+_MAX_SIZE = 10000
+# The weight of the latest observation in the EWMA
+_ALPHA = 0.3
+
+
+class ChunkResult(t.TypedDict):
+    """Define the result of a chunk of calls, as returned by a grunt worker."""
+
+    results: list[t.Any]
+    elapsed_s: float
+
+
+class ChunkSizer:
+    """Tune the size of the chunks of each task from the observed execution time per call."""
+
+    # The EWMA of the execution time per call, by task name
+    _per_item_s: dict[str, float] = {}
+
+    @classmethod
+    def is_tuned(cls, task_name: str) -> bool:
+        """Return whether the execution time of the task has been observed yet."""
+        return task_name in cls._per_item_s
+
+    @classmethod
+    def get_size(cls, task_name: str) -> int:
+        """Return the number of calls per chunk for them to take about the target time each."""
+        per_item_s: t.Optional[float] = cls._per_item_s.get(task_name)
+        if per_item_s is None:
+            return _PROBE_SIZE
+        if per_item_s <= 0:
+            return _MAX_SIZE
+        return max(1, min(_MAX_SIZE, int(Config.chunk_target_s() / per_item_s)))
+
+    @classmethod
+    def observe(cls, task_name: str, elapsed_s: float, num_items: int) -> None:
+        """Account for a chunk of `num_items` calls that took `elapsed_s` seconds to execute."""
+        per_item_s: float = elapsed_s / num_items
+        previous: t.Optional[float] = cls._per_item_s.get(task_name)
+        if previous is not None:
+            per_item_s = _ALPHA * per_item_s + (1 - _ALPHA) * previous
+        cls._per_item_s[task_name] = per_item_s
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget all the observed execution times."""
+        cls._per_item_s = {}
+
+
+async def execute_chunk(task: "Task", items: t.Sequence[ChunkItem]) -> ChunkResult:
+    """
+    Execute every call in the chunk, and return their results in order along with the time taken.
+
+    Coroutine functions are executed concurrently, other functions in a tight loop. Raise the
+    first error, if any.
+    """
+    t_0 = time.perf_counter()
+    if inspect.iscoroutinefunction(task.func):
+        results = await asyncio.gather(*[task(*args, **kwargs) for args, kwargs in items])
+    else:
+        results = [task(*args, **kwargs) for args, kwargs in items]
+    return {"results": list(results), "elapsed_s": time.perf_counter() - t_0}
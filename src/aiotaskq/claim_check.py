@@ -0,0 +1,161 @@
+"""
+Define the claim-check offloading of big messages.
+
+Instead of sending a big serialized task or result through the broker, where it would be buffered
+per subscriber and copied again when the WorkerManager passes it to a GruntWorker, its body is
+stored once in a blob store and only a reference to it, like `claim|claim:<id>`, is sent. The
+receiver fetches the body right before it needs it. The reference to a task also carries its
+envelope, like `claim|claim:<id>|<envelope as JSON>`, so that its caller can still be told if the
+body is lost, e.g. expired.
+
+Offloading is enabled by providing the url of the blob store via env var AIOTASKQ_CLAIM_CHECK_URL.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+import typing as t
+import uuid
+
+from .config import Config
+from .constants import Constants
+from .exceptions import BlobNotFound, UrlNotSupported
+from .interfaces import IBlobStore, TaskEnvelope
+from .pubsub import RedisConnectionPools
+
+_CLAIM_HEADER = b"claim|"
+
+
+class ClaimCheck:
+    """Expose the offloading of big messages to a blob store, and their retrieval."""
+
+    @classmethod
+    async def offload(
+        cls,
+        message: bytes,
+        envelope: t.Optional[TaskEnvelope] = None,
+        eta: t.Optional[float] = None,
+    ) -> bytes:
+        """
+        Store the message in the blob store and return a reference to it, if it's big enough,
+        carrying the envelope of the task in the message, if given.
+
+        Otherwise, or if no blob store is configured, return the message as is. The body of a
+        message scheduled for `eta` is kept until then on top of its time-to-live.
+        """
+        url: t.Optional[str] = Config.claim_check_url()
+        if url is None or len(message) < Config.claim_check_min_size():
+            return message
+        key: str = Constants.claim_key_template().format(claim_id=uuid.uuid4().hex)
+        ttl_s: int = Config.claim_check_ttl_s()
+        if eta is not None:
+            ttl_s += max(0, math.ceil(eta - time.time()))
+        await BlobStore.get(url).put(key=key, data=message, ttl_s=ttl_s)
+        reference: bytes = _CLAIM_HEADER + key.encode("utf-8")
+        if envelope is not None:
+            reference += b"|" + json.dumps(envelope).encode("utf-8")
+        return reference
+
+    @classmethod
+    async def resolve(cls, message: bytes) -> bytes:
+        """
+        Return the original message given a reference returned by `offload`.
+
+        The body is removed from the blob store since every message is consumed exactly once.
+        """
+        if not message.startswith(_CLAIM_HEADER):
+            return message
+        url: t.Optional[str] = Config.claim_check_url()
+        if url is None:
+            raise UrlNotSupported("Env var AIOTASKQ_CLAIM_CHECK_URL is required to resolve claims.")
+        key: str = message[len(_CLAIM_HEADER) :].split(b"|", 1)[0].decode("utf-8")
+        return await BlobStore.get(url).pop(key=key)
+
+    @classmethod
+    def get_envelope(cls, message: bytes) -> t.Optional[TaskEnvelope]:
+        """Return the envelope carried by a reference returned by `offload`, if any."""
+        if not message.startswith(_CLAIM_HEADER):
+            return None
+        _, separator, envelope = message[len(_CLAIM_HEADER) :].partition(b"|")
+        return json.loads(envelope) if separator else None
+
+
+class BlobStore:
+    """Expose the blob store implementation given its url."""
+
+    @classmethod
+    def get(cls, url: str) -> IBlobStore:
+        """
+        Return the blob store given its url.
+
+        Currently supports Redis (url="redis*") and the local filesystem (url="file:///path").
+        """
+        if url.startswith("file://"):
+            return FileBlobStore(directory=url.split("://", 1)[1])
+        if url.startswith("redis"):
+            return RedisBlobStore(url=url)
+        raise UrlNotSupported(f'Url "{url}" is currently not supported.')
+
+
+class RedisBlobStore:
+    """Store blobs in Redis, each in its own key expiring after its ttl."""
+
+    def __init__(self, url: str) -> None:
+        self._url = url
+
+    async def put(self, key: str, data: bytes, ttl_s: int) -> None:
+        """Store the data under the given key, for at most `ttl_s` seconds."""
+        await RedisConnectionPools.get_client(url=self._url).set(key, data, ex=ttl_s)
+
+    async def pop(self, key: str) -> bytes:
+        """Remove the data stored under the given key and return it."""
+        async with RedisConnectionPools.get_client(url=self._url).pipeline() as pipeline:
+            data, _ = await pipeline.get(key).delete(key).execute()
+        if data is None:
+            raise BlobNotFound(f'Blob "{key}" is not found, it may have expired.')
+        return data
+
+
+class FileBlobStore:
+    """
+    Store blobs as files in a local directory.
+
+    Only works if all the clients and workers share the directory, e.g. on a single host.
+    The ttl is not enforced, but blobs are removed once consumed.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+
+    async def put(self, key: str, data: bytes, ttl_s: int) -> None:
+        """Store the data under the given key."""
+        # pylint: disable=unused-argument
+        await asyncio.to_thread(self._write, self._get_path(key), data)
+
+    async def pop(self, key: str) -> bytes:
+        """Remove the data stored under the given key and return it."""
+        try:
+            return await asyncio.to_thread(self._read_and_remove, self._get_path(key))
+        except FileNotFoundError as exc:
+            raise BlobNotFound(f'Blob "{key}" is not found.') from exc
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self._directory, key.replace(":", "-"))
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so that a reader never sees a partially written blob
+        path_tmp = f"{path}.tmp"
+        with open(path_tmp, "wb") as file:
+            file.write(data)
+        os.replace(path_tmp, path)
+
+    @staticmethod
+    def _read_and_remove(path: str) -> bytes:
+        with open(path, "rb") as file:
+            data = file.read()
+        os.remove(path)
+        return data
@@ -0,0 +1,99 @@
+"""
+Define the compression of serialized messages.
+
+A serialized message looks like `<format>|<body>`, e.g. `json|{"task_id": ...}`. Once compressed,
+the name of the compression is appended to the format in the header, e.g. `json+zlib|<body>`, so
+that the receiving side knows how to decompress it regardless of its own configuration.
+
+zlib is always available. lz4 and zstd are only available if `lz4` and `zstandard` are installed
+respectively.
+"""
+
+import typing as t
+import zlib
+
+from .config import Config
+from .exceptions import CompressionNotSupported
+from .interfaces import CompressionType
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class Compression:
+    """Expose the compression and decompression of serialized messages."""
+
+    @classmethod
+    def validate(cls, compression_type: CompressionType | str) -> CompressionType:
+        """Return the compression type, or raise an error if it's not supported."""
+        try:
+            compression_type = CompressionType(compression_type)
+        except ValueError as exc:
+            raise CompressionNotSupported(
+                f'Compression "{compression_type}" is not supported.'
+            ) from exc
+        if (compression_type == CompressionType.LZ4 and lz4_frame is None) or (
+            compression_type == CompressionType.ZSTD and zstandard is None
+        ):
+            extra: str = compression_type.value
+            raise CompressionNotSupported(
+                f'Compression "{extra}" requires `pip install aiotaskq[{extra}]`.'
+            )
+        return compression_type
+
+    @classmethod
+    def compress_message(
+        cls, message: bytes, compression_type: t.Optional[CompressionType] = None
+    ) -> bytes:
+        """
+        Compress the body of the serialized message if it's big enough.
+
+        Use the globally configured compression type if `compression_type` is not provided.
+        """
+        if compression_type is None:
+            compression_type = Config.compression_type()
+        if compression_type == CompressionType.NONE or len(message) < Config.compression_min_size():
+            return message
+        header, body = message.split(b"|", 1)
+        compressed: bytes = cls._compress(body, compression_type)
+        return b"%s+%s|%s" % (header, compression_type.value.encode("utf-8"), compressed)
+
+    @classmethod
+    def decompress_message(cls, message: bytes) -> bytes:
+        """Return the serialized message as it was before `compress_message`."""
+        header_end: int = message.index(b"|")
+        header: bytes = message[:header_end]
+        if b"+" not in header:
+            return message
+        # Avoid copying the body before decompressing it
+        body = memoryview(message)[header_end + 1 :]
+        format_, compression = header.split(b"+", 1)
+        compression_type: CompressionType = cls.validate(compression.decode("utf-8"))
+        return b"%s|%s" % (format_, cls._decompress(body, compression_type))
+
+    @staticmethod
+    def _compress(data: bytes, compression_type: CompressionType) -> bytes:
+        if compression_type == CompressionType.ZLIB:
+            return zlib.compress(data)
+        if compression_type == CompressionType.LZ4 and lz4_frame is not None:
+            return lz4_frame.compress(data)
+        if compression_type == CompressionType.ZSTD and zstandard is not None:
+            return zstandard.ZstdCompressor().compress(data)
+        raise CompressionNotSupported(f'Compression "{compression_type.value}" is not supported.')
+
+    @staticmethod
+    def _decompress(data: bytes, compression_type: CompressionType) -> bytes:
+        if compression_type == CompressionType.ZLIB:
+            return zlib.decompress(data)
+        if compression_type == CompressionType.LZ4 and lz4_frame is not None:
+            return lz4_frame.decompress(data)
+        if compression_type == CompressionType.ZSTD and zstandard is not None:
+            return zstandard.ZstdDecompressor().decompress(data)
+        raise CompressionNotSupported(f'Compression "{compression_type.value}" is not supported.')
@@ -9,13 +9,14 @@ all the configuration values, which include:
 
 import logging
 from os import environ
+import typing as t
 
-from .interfaces import SerializationType
+from .interfaces import CompressionType, SerializationType
 
 _REDIS_URL = environ.get("REDIS_URL", "redis://127.0.0.1:6379")
 
 
-class Config:
+class Config:  # pylint: disable=too-many-public-methods
     """
     Provide configuration values.
 
@@ -30,6 +31,266 @@ class Config:
         s: str = environ.get("AIOTASKQ_SERIALIZATION", SerializationType.DEFAULT.value)
         return SerializationType[s.upper()]
 
+    @staticmethod
+    def accepted_serialization_types() -> set[SerializationType]:
+        """
+        Return the serialization types of the messages accepted for deserialization as provided
+        via env var AIOTASKQ_ACCEPT_SERIALIZATION, as comma-separated types, e.g. "json,pickle".
+
+        Defaults to "json,msgpack". The type given via AIOTASKQ_SERIALIZATION is always accepted.
+        Only accept pickle from a trusted broker, since unpickling a message can run any code.
+        """
+        s: str = environ.get("AIOTASKQ_ACCEPT_SERIALIZATION", "json,msgpack")
+        accepted: set[SerializationType] = {
+            SerializationType[name.strip().upper()] for name in s.split(",") if name.strip()
+        }
+        return accepted | {Config.serialization_type()}
+
+    @staticmethod
+    def compression_type() -> CompressionType:
+        """
+        Return the compression type as provided via env var AIOTASKQ_COMPRESSION.
+
+        Applies to every task that doesn't specify its own `compression` option. Defaults to
+        "none".
+        """
+        s: str = environ.get("AIOTASKQ_COMPRESSION", CompressionType.DEFAULT.value)
+        return CompressionType[s.upper()]
+
+    @staticmethod
+    def compression_min_size() -> int:
+        """
+        Return the minimum size in bytes of a message to be compressed as provided via env var
+        AIOTASKQ_COMPRESSION_MIN_SIZE.
+
+        Smaller messages are sent as is since compressing them costs more than it saves.
+        Defaults to 1024 bytes.
+        """
+        min_size: int = int(environ.get("AIOTASKQ_COMPRESSION_MIN_SIZE", 1024))
+        return min_size
+
+    @staticmethod
+    def claim_check_url() -> t.Optional[str]:
+        """
+        Return the url of the blob store as provided via env var AIOTASKQ_CLAIM_CHECK_URL.
+
+        Either "redis*" or "file:///path/to/directory". When provided, messages bigger than
+        `claim_check_min_size` are stored there and only a reference to them is sent via the
+        broker. Defaults to None, i.e. every message is sent inline.
+        """
+        return environ.get("AIOTASKQ_CLAIM_CHECK_URL")
+
+    @staticmethod
+    def claim_check_min_size() -> int:
+        """
+        Return the minimum size in bytes of a message to be offloaded to the blob store as
+        provided via env var AIOTASKQ_CLAIM_CHECK_MIN_SIZE.
+
+        Defaults to 256 KiB.
+        """
+        min_size: int = int(environ.get("AIOTASKQ_CLAIM_CHECK_MIN_SIZE", 256 * 1024))
+        return min_size
+
+    @staticmethod
+    def claim_check_ttl_s() -> int:
+        """
+        Return the time-to-live of a message offloaded to the blob store as provided via env var
+        AIOTASKQ_CLAIM_CHECK_TTL_S.
+
+        Only enforced by the Redis blob store. Defaults to 1 day.
+        """
+        ttl_s: int = int(environ.get("AIOTASKQ_CLAIM_CHECK_TTL_S", 60 * 60 * 24))
+        return ttl_s
+
+    @staticmethod
+    def compact_task_names() -> bool:
+        """
+        Return whether tasks are sent with their compact codes instead of their full names as
+        provided via env var AIOTASKQ_COMPACT_TASK_NAMES.
+
+        Disable it while workers still run a version that only understands full names.
+        Defaults to true.
+        """
+        return environ.get("AIOTASKQ_COMPACT_TASK_NAMES", "true").lower() in ("1", "true")
+
+    @staticmethod
+    def result_backend_url() -> t.Optional[str]:
+        """
+        Return the url of the result backend as provided via env var AIOTASKQ_RESULT_BACKEND_URL.
+
+        Currently only "redis*" is supported. Required by `Task.send`. Defaults to None.
+        """
+        return environ.get("AIOTASKQ_RESULT_BACKEND_URL")
+
+    @staticmethod
+    def result_ttl_s() -> int:
+        """
+        Return the time-to-live of a stored result as provided via env var AIOTASKQ_RESULT_TTL_S.
+
+        Defaults to 1 day.
+        """
+        ttl_s: int = int(environ.get("AIOTASKQ_RESULT_TTL_S", 60 * 60 * 24))
+        return ttl_s
+
+    @staticmethod
+    def result_backend_max_size() -> int:
+        """
+        Return the maximum number of results stored at once as provided via env var
+        AIOTASKQ_RESULT_BACKEND_MAX_SIZE.
+
+        The oldest results are removed first. Defaults to 100000.
+        """
+        max_size: int = int(environ.get("AIOTASKQ_RESULT_BACKEND_MAX_SIZE", 100000))
+        return max_size
+
+    @staticmethod
+    def cache_url() -> str:
+        """
+        Return the url of the Redis storing cached results as provided via env var
+        AIOTASKQ_CACHE_URL.
+
+        Defaults to the env var REDIS_URL or "redis://127.0.0.1:6379" if env var is not provided.
+        """
+        return environ.get("AIOTASKQ_CACHE_URL", _REDIS_URL)
+
+    @staticmethod
+    def cache_namespace() -> str:
+        """
+        Return the default namespace of cache keys as provided via env var
+        AIOTASKQ_CACHE_NAMESPACE.
+
+        Defaults to "default".
+        """
+        return environ.get("AIOTASKQ_CACHE_NAMESPACE", "default")
+
+    @staticmethod
+    def cache_max_size() -> int:
+        """
+        Return the default maximum size in bytes of a cached result as provided via env var
+        AIOTASKQ_CACHE_MAX_SIZE.
+
+        Defaults to 1 MiB.
+        """
+        max_size: int = int(environ.get("AIOTASKQ_CACHE_MAX_SIZE", 1024 * 1024))
+        return max_size
+
+    @staticmethod
+    def single_flight_timeout_s() -> int:
+        """
+        Return the number of seconds a single-flight leader holds its lock as provided via env
+        var AIOTASKQ_SINGLE_FLIGHT_TIMEOUT_S.
+
+        The followers wait that long for the result of the leader before trying to become the
+        leader themselves, so it should be longer than the task takes. Defaults to 300.
+        """
+        timeout_s: int = int(environ.get("AIOTASKQ_SINGLE_FLIGHT_TIMEOUT_S", 300))
+        return timeout_s
+
+    @staticmethod
+    def chunk_target_s() -> float:
+        """
+        Return the target execution time in seconds of a chunk of calls of size "auto" as
+        provided via env var AIOTASKQ_CHUNK_TARGET_S.
+
+        Defaults to 0.1.
+        """
+        target_s: float = float(environ.get("AIOTASKQ_CHUNK_TARGET_S", 0.1))
+        return target_s
+
+    @staticmethod
+    def stream_window() -> int:
+        """
+        Return the maximum number of items of a stream in flight, i.e. published by the worker
+        but not consumed by the caller yet, as provided via env var AIOTASKQ_STREAM_WINDOW.
+
+        Defaults to 64.
+        """
+        window: int = int(environ.get("AIOTASKQ_STREAM_WINDOW", 64))
+        return window
+
+    @staticmethod
+    def stream_timeout_s() -> float:
+        """
+        Return the number of seconds a worker waits for the caller of a stream to consume its
+        items, before giving up on the stream, as provided via env var AIOTASKQ_STREAM_TIMEOUT_S.
+
+        Defaults to 60.
+        """
+        timeout_s: float = float(environ.get("AIOTASKQ_STREAM_TIMEOUT_S", 60))
+        return timeout_s
+
+    @staticmethod
+    def workflow_url() -> str:
+        """
+        Return the url of the Redis where the results of the groups of a workflow are gathered
+        as provided via env var AIOTASKQ_WORKFLOW_URL.
+
+        Defaults to the env var REDIS_URL or "redis://127.0.0.1:6379" if env var is not provided.
+        """
+        return environ.get("AIOTASKQ_WORKFLOW_URL", _REDIS_URL)
+
+    @staticmethod
+    def schedule_url() -> str:
+        """
+        Return the url of the Redis where delayed tasks are scheduled as provided via env var
+        AIOTASKQ_SCHEDULE_URL.
+
+        Defaults to the env var REDIS_URL or "redis://127.0.0.1:6379" if env var is not provided.
+        """
+        return environ.get("AIOTASKQ_SCHEDULE_URL", _REDIS_URL)
+
+    @staticmethod
+    def schedule_poll_interval_s() -> float:
+        """
+        Return how often in seconds workers check for delayed tasks that are due, as provided via
+        env var AIOTASKQ_SCHEDULE_POLL_INTERVAL_S.
+
+        This is the maximum lateness of a delayed task on idle workers. Defaults to 0.1 second.
+        """
+        poll_interval_s: float = float(environ.get("AIOTASKQ_SCHEDULE_POLL_INTERVAL_S", 0.1))
+        return poll_interval_s
+
+    @staticmethod
+    def beat_url() -> str:
+        """
+        Return the url of the Redis where beat processes elect their leader and track the
+        periodic tasks as provided via env var AIOTASKQ_BEAT_URL.
+
+        Defaults to the env var REDIS_URL or "redis://127.0.0.1:6379" if env var is not provided.
+        """
+        return environ.get("AIOTASKQ_BEAT_URL", _REDIS_URL)
+
+    @staticmethod
+    def beat_lease_s() -> float:
+        """
+        Return the lease of the leader beat process as provided via env var AIOTASKQ_BEAT_LEASE_S.
+
+        The leader renews it every third of the lease, and another beat process takes over at
+        most that long after the leader is gone. Defaults to 10 seconds.
+        """
+        lease_s: float = float(environ.get("AIOTASKQ_BEAT_LEASE_S", 10))
+        return lease_s
+
+    @staticmethod
+    def rate_limit_url() -> str:
+        """
+        Return the url of the Redis where the rate limits of tasks are enforced as provided via env
+        var AIOTASKQ_RATE_LIMIT_URL.
+
+        Defaults to the env var REDIS_URL or "redis://127.0.0.1:6379" if env var is not provided.
+        """
+        return environ.get("AIOTASKQ_RATE_LIMIT_URL", _REDIS_URL)
+
+    @staticmethod
+    def routes() -> str:
+        """
+        Return the rules routing tasks to queues as provided via env var AIOTASKQ_ROUTES, as
+        comma-separated "<pattern>=<queue>" pairs, e.g. "app.reports.*=cpu,app.emails.*=io".
+
+        Patterns are globs matched against the names of the tasks. Defaults to no rules.
+        """
+        return environ.get("AIOTASKQ_ROUTES", "")
+
     @staticmethod
     def log_level() -> int:
         """Return the log level as provided via env var LOG_LEVEL."""
@@ -45,3 +306,59 @@ class Config:
         """
         broker_url: str = environ.get("BROKER_URL", _REDIS_URL)
         return broker_url
+
+    @staticmethod
+    def broker_max_connections() -> int:
+        """
+        Return the max size of each broker connection pool as provided via env var
+        AIOTASKQ_BROKER_MAX_CONNECTIONS.
+
+        Connection pools are shared within the same process and event loop. Defaults to 50.
+        """
+        max_connections: int = int(environ.get("AIOTASKQ_BROKER_MAX_CONNECTIONS", 50))
+        return max_connections
+
+    @staticmethod
+    def ipc_max_pending_size() -> int:
+        """
+        Return the max number of bytes the IPC broker holds for a subscriber which doesn't read
+        them fast enough, as provided via env var AIOTASKQ_IPC_MAX_PENDING_SIZE.
+
+        Past this size, publishing to the subscriber waits until it catches up. Defaults to 32 MiB.
+        """
+        max_size: int = int(environ.get("AIOTASKQ_IPC_MAX_PENDING_SIZE", 32 * 1024 * 1024))
+        return max_size
+
+    @staticmethod
+    def poll_interval_s() -> float:
+        """
+        Return the poll interval as provided via env var AIOTASKQ_POLL_INTERVAL_S.
+
+        This is the maximum time in seconds a blocking read on the broker waits before being
+        re-armed. Messages are received as soon as they arrive regardless. Defaults to 1 second.
+        """
+        poll_interval_s: float = float(environ.get("AIOTASKQ_POLL_INTERVAL_S", 1.0))
+        return poll_interval_s
+
+    @staticmethod
+    def stream_ttl_s() -> int:
+        """
+        Return the time-to-live of an idle stream as provided via env var AIOTASKQ_STREAM_TTL_S.
+
+        Only relevant for the Redis Streams broker (url="redis+streams*"). Defaults to 1 day.
+        """
+        ttl_s: int = int(environ.get("AIOTASKQ_STREAM_TTL_S", 60 * 60 * 24))
+        return ttl_s
+
+    @staticmethod
+    def stream_claim_idle_s() -> float:
+        """
+        Return how long a message of a stream may be left unacknowledged by the consumer which
+        read it, before another consumer claims it, as provided via env var
+        AIOTASKQ_STREAM_CLAIM_IDLE_S.
+
+        Only relevant for the Redis Streams broker (url="redis+streams*"), where a worker only
+        acknowledges a task once it's passed it to a grunt worker. Defaults to 60 seconds.
+        """
+        idle_s: float = float(environ.get("AIOTASKQ_STREAM_CLAIM_IDLE_S", 60))
+        return idle_s
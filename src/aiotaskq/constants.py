@@ -9,6 +9,18 @@ all the constants, which include:
 
 _TASKS_CHANNEL = "channel:tasks"
 _RESULTS_CHANNEL_TEMPLATE = "channel:results:{task_id}"
+_REPLIES_CHANNEL_TEMPLATE = "channel:replies:{inbox_id}"
+_CONSUMER_GROUP = "aiotaskq"
+_CLAIM_KEY_TEMPLATE = "claim:{claim_id}"
+_RESULT_KEY_PREFIX = "result:"
+_RESULT_INDEX_KEY = "results:index"
+_STREAM_CREDITS_CHANNEL_TEMPLATE = "channel:stream-credits:{task_id}"
+_WORKFLOW_KEY_TEMPLATE = "workflow:{workflow_id}"
+_FAN_IN_KEY_TEMPLATE = "workflow:{workflow_id}:{stage}"
+_SCHEDULE_KEY_TEMPLATE = "schedule:{channel}"
+_BEAT_LEADER_KEY = "beat:leader"
+_BEAT_SCHEDULE_KEY = "beat:schedule"
+_RATE_LIMIT_KEY_TEMPLATE = "rate_limit:{task_name}"
 
 
 class Constants:
@@ -28,3 +40,63 @@ class Constants:
     def results_channel_template() -> str:
         """Return the template chnnale name used for transporting task results on the broker."""
         return _RESULTS_CHANNEL_TEMPLATE
+
+    @staticmethod
+    def replies_channel_template() -> str:
+        """Return the template channel name on which a client process receives all its results."""
+        return _REPLIES_CHANNEL_TEMPLATE
+
+    @staticmethod
+    def consumer_group() -> str:
+        """Return the consumer group name used when consuming channels backed by streams."""
+        return _CONSUMER_GROUP
+
+    @staticmethod
+    def claim_key_template() -> str:
+        """Return the template key under which the body of an offloaded message is stored."""
+        return _CLAIM_KEY_TEMPLATE
+
+    @staticmethod
+    def result_key_prefix() -> str:
+        """Return the prefix of the key under which the result of a task is stored."""
+        return _RESULT_KEY_PREFIX
+
+    @staticmethod
+    def result_index_key() -> str:
+        """Return the key listing the ids of the stored results, most recent first."""
+        return _RESULT_INDEX_KEY
+
+    @staticmethod
+    def stream_credits_channel_template() -> str:
+        """Return the template channel name on which the caller of a stream grants credits."""
+        return _STREAM_CREDITS_CHANNEL_TEMPLATE
+
+    @staticmethod
+    def workflow_key_template() -> str:
+        """Return the template key under which the stages of a workflow are stored."""
+        return _WORKFLOW_KEY_TEMPLATE
+
+    @staticmethod
+    def fan_in_key_template() -> str:
+        """Return the template key under which the results of a group of a workflow are gathered."""
+        return _FAN_IN_KEY_TEMPLATE
+
+    @staticmethod
+    def schedule_key_template() -> str:
+        """Return the template key under which the tasks delayed on a channel are scheduled."""
+        return _SCHEDULE_KEY_TEMPLATE
+
+    @staticmethod
+    def beat_leader_key() -> str:
+        """Return the key holding the id of the beat process currently applying periodic tasks."""
+        return _BEAT_LEADER_KEY
+
+    @staticmethod
+    def beat_schedule_key() -> str:
+        """Return the key mapping the name of each periodic task to the next time it's due at."""
+        return _BEAT_SCHEDULE_KEY
+
+    @staticmethod
+    def rate_limit_key_template() -> str:
+        """Return the template key of the token bucket enforcing the rate limit of a task."""
+        return _RATE_LIMIT_KEY_TEMPLATE
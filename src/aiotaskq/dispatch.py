@@ -0,0 +1,211 @@
+"""Define IDispatcher implementations used by WorkerManager to pick a GruntWorker for a task."""
+
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import random
+import typing as t
+
+from .exceptions import DispatchStrategyNotSupported
+from .interfaces import DispatchStrategy, IDispatcher
+
+
+class _ProcessSignal:
+    """
+    Let the processes forked after it's created wake up a coroutine of any of them, via a pipe.
+
+    A signal sent while nobody is waiting wakes up the next wait right away, so none is missed
+    between checking a condition and waiting for it to change. Only one coroutine per process may
+    wait at a time.
+    """
+
+    def __init__(self) -> None:
+        self._read_fd, self._write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+        os.set_blocking(self._write_fd, False)
+
+    def notify(self) -> None:
+        """Wake up the coroutine waiting for a signal, or the next one to wait."""
+        # A full pipe already holds signals enough to wake it up
+        with contextlib.suppress(BlockingIOError):
+            os.write(self._write_fd, b"\0")
+
+    async def wait(self) -> None:
+        """Wait until a signal is sent, and consume every signal sent so far."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        loop.add_reader(self._read_fd, lambda: future.done() or future.set_result(None))
+        try:
+            await future
+        finally:
+            loop.remove_reader(self._read_fd)
+        with contextlib.suppress(BlockingIOError):
+            while os.read(self._read_fd, 4096):
+                pass
+
+
+class GruntWorkerLoads:
+    """
+    Keep track of the load of each GruntWorker, in memory shared across processes.
+
+    Each GruntWorker registers itself on start, claiming a slot and reporting its capacity,
+    i.e. the max number of tasks it executes at the same time. The WorkerManager counts a
+    task as outstanding for a GruntWorker as soon as it passes the task to it, and the
+    GruntWorker reports back once the task is done.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._registered = multiprocessing.Value("i", 0)
+        self._pids = multiprocessing.Array("i", size)
+        self._capacities = multiprocessing.Array("i", size)
+        self._outstanding = multiprocessing.Array("i", size)
+        self._released = _ProcessSignal()
+
+    def register(self, pid: int, capacity: int) -> int:
+        """Claim a slot for the GruntWorker with the given pid and capacity, and return it."""
+        with self._registered.get_lock():
+            index: int = self._registered.value
+            self._pids[index] = pid
+            self._capacities[index] = capacity
+            self._registered.value += 1
+        return index
+
+    def all_registered(self) -> bool:
+        """Return True once every GruntWorker has registered itself."""
+        return self._registered.value == self.size
+
+    def pid(self, index: int) -> int:
+        """Return the pid of the GruntWorker in the given slot."""
+        return self._pids[index]
+
+    def add_outstanding(self, index: int) -> None:
+        """Count one more outstanding task for the GruntWorker in the given slot."""
+        with self._outstanding.get_lock():
+            self._outstanding[index] += 1
+
+    def remove_outstanding(self, index: int) -> None:
+        """Count one less outstanding task for the GruntWorker in the given slot."""
+        with self._outstanding.get_lock():
+            self._outstanding[index] = max(self._outstanding[index] - 1, 0)
+        self._released.notify()
+
+    def outstanding(self, index: int) -> int:
+        """Return the number of outstanding tasks of the GruntWorker in the given slot."""
+        return self._outstanding[index]
+
+    def total_capacity(self) -> int:
+        """Return the max number of tasks all the GruntWorkers execute at the same time."""
+        return sum(self._capacities[index] for index in range(self.size))
+
+    def has_capacity(self) -> bool:
+        """Return True if any GruntWorker has less outstanding tasks than its capacity."""
+        return any(self._outstanding[index] < self._capacities[index] for index in range(self.size))
+
+    async def wait_for_capacity(self) -> None:
+        """Wait until any GruntWorker has less outstanding tasks than its capacity."""
+        while not self.has_capacity():
+            await self._released.wait()
+
+    def load(self, index: int) -> float:
+        """
+        Return the load of the GruntWorker in the given slot.
+
+        The load is the number of outstanding tasks relative to the GruntWorker capacity.
+        """
+        capacity: int = self._capacities[index]
+        outstanding: int = self._outstanding[index]
+        return outstanding / capacity if capacity > 0 else float(outstanding)
+
+
+class QueueLoads:
+    """
+    Keep track of the number of outstanding tasks of each queue consumed by a WorkerManager, in
+    memory shared across processes, to enforce the concurrency limit of each queue.
+    """
+
+    def __init__(self, limits: t.Sequence[t.Optional[int]]) -> None:
+        self._limits: list[t.Optional[int]] = list(limits)
+        self._outstanding = multiprocessing.Array("i", len(self._limits))
+        self._released = _ProcessSignal()
+
+    def add_outstanding(self, index: int) -> None:
+        """Count one more outstanding task for the queue at the given index."""
+        with self._outstanding.get_lock():
+            self._outstanding[index] += 1
+
+    def remove_outstanding(self, index: int) -> None:
+        """Count one less outstanding task for the queue at the given index."""
+        with self._outstanding.get_lock():
+            self._outstanding[index] = max(self._outstanding[index] - 1, 0)
+        self._released.notify()
+
+    def has_capacity(self, index: int) -> bool:
+        """Return True if the queue at the given index has less outstanding tasks than its limit."""
+        limit: t.Optional[int] = self._limits[index]
+        return limit is None or self._outstanding[index] < limit
+
+    async def wait_for_release(self) -> None:
+        """Wait until a task of any queue is done, e.g. to check again which queues have room."""
+        await self._released.wait()
+
+
+class Dispatcher:
+    """The user-facing facade for creating the right dispatcher implementation."""
+
+    @classmethod
+    def get(cls, strategy: str, loads: GruntWorkerLoads) -> IDispatcher:
+        """Return the correct dispatcher implementation instance based on the strategy."""
+        if strategy == DispatchStrategy.ROUND_ROBIN:
+            return RoundRobinDispatcher(loads=loads)
+        if strategy == DispatchStrategy.LEAST_OUTSTANDING:
+            return LeastOutstandingDispatcher(loads=loads)
+        if strategy == DispatchStrategy.POWER_OF_TWO_CHOICES:
+            return PowerOfTwoChoicesDispatcher(loads=loads)
+        raise DispatchStrategyNotSupported(f'Dispatch strategy "{strategy}" is not yet supported.')
+
+
+class RoundRobinDispatcher:
+    """Pick each GruntWorker in turn, regardless of their load."""
+
+    def __init__(self, loads: GruntWorkerLoads) -> None:
+        self._loads = loads
+        self._counter = -1
+
+    def select(self) -> int:
+        """Return the slot of the GruntWorker to pass the next task to."""
+        self._counter = (self._counter + 1) % self._loads.size
+        return self._counter
+
+
+class LeastOutstandingDispatcher:
+    """Pick the GruntWorker with the least load, starting after the last one picked on ties."""
+
+    def __init__(self, loads: GruntWorkerLoads) -> None:
+        self._loads = loads
+        self._counter = -1
+
+    def select(self) -> int:
+        """Return the slot of the GruntWorker to pass the next task to."""
+        size = self._loads.size
+        # Rotate the starting point so that ties don't always go to the first GruntWorker
+        candidates: t.Iterable[int] = (
+            (self._counter + 1 + offset) % size for offset in range(size)
+        )
+        self._counter = min(candidates, key=self._loads.load)
+        return self._counter
+
+
+class PowerOfTwoChoicesDispatcher:
+    """Pick the least loaded of two GruntWorkers chosen at random."""
+
+    def __init__(self, loads: GruntWorkerLoads) -> None:
+        self._loads = loads
+
+    def select(self) -> int:
+        """Return the slot of the GruntWorker to pass the next task to."""
+        if self._loads.size == 1:
+            return 0
+        first, second = random.sample(range(self._loads.size), 2)
+        return min((first, second), key=self._loads.load)
@@ -17,9 +17,41 @@ class ConcurrencyTypeNotSupported(Exception):
     """This concurrency type is currently not supported."""
 
 
+class DispatchStrategyNotSupported(Exception):
+    """This dispatch strategy is currently not supported."""
+
+
+class SerializationTypeNotSupported(Exception):
+    """This serialization type is currently not supported, or its library is not installed."""
+
+
+class CompressionNotSupported(Exception):
+    """This compression type is currently not supported, or its library is not installed."""
+
+
+class BlobNotFound(Exception):
+    """The body of an offloaded message is not found in the blob store, e.g. it has expired."""
+
+
+class TaskNotRegistered(Exception):
+    """The task is not registered in the worker, e.g. it's not defined in the worker's app."""
+
+
+class ResultBackendNotConfigured(Exception):
+    """A result is requested to be stored but no result backend is configured."""
+
+
 class InvalidArgument(Exception):
     """A task is applied with invalid arguments."""
 
 
 class InvalidRetryOptions(Exception):
     """A task is defined with invalid retry options."""
+
+
+class InvalidScheduleOptions(Exception):
+    """A task is defined with invalid schedule options."""
+
+
+class WorkflowNotFound(Exception):
+    """The definition of a workflow is not found in Redis, e.g. it has expired."""
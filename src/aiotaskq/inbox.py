@@ -0,0 +1,150 @@
+"""
+Define the result inbox used by a client process to receive the results of its tasks.
+
+Instead of subscribing to one results channel per task, each client process (per event
+loop) subscribes once to its own long-lived reply channel. The reply channel is carried in
+every task message, so the worker knows where to publish the result. The inbox then
+demultiplexes the incoming results into one `asyncio.Future` per task, or one `asyncio.Queue`
+per stream of results, see `aiotaskq.streaming`.
+"""
+
+import asyncio
+from functools import cached_property
+import logging
+import os
+import typing as t
+import uuid
+import weakref
+
+from .claim_check import ClaimCheck
+from .config import Config
+from .constants import Constants
+from .exceptions import BlobNotFound
+from .pubsub import PubSub
+
+if t.TYPE_CHECKING:
+    from .task import AsyncResult
+
+
+class ResultInbox:
+    """Receive the results of all tasks applied from the same process and event loop."""
+
+    _pid: t.Optional[int] = None
+    _inboxes: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ResultInbox]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def __init__(self) -> None:
+        inbox_id = uuid.uuid4().hex
+        self.channel: str = Constants.replies_channel_template().format(inbox_id=inbox_id)
+        self._futures: dict[str, "asyncio.Future[AsyncResult]"] = {}
+        self._streams: dict[str, "asyncio.Queue[AsyncResult]"] = {}
+        self._subscribed: t.Optional["asyncio.Future[None]"] = None
+        self._reader: t.Optional["asyncio.Task[None]"] = None
+
+    @classmethod
+    async def get(cls) -> "ResultInbox":
+        """Return the inbox of the current process and event loop, once it's ready to receive."""
+        if cls._pid != os.getpid():
+            # Never share an inbox with a parent process (e.g. after a fork)
+            cls._pid = os.getpid()
+            cls._inboxes = weakref.WeakKeyDictionary()
+        loop = asyncio.get_running_loop()
+        inbox = cls._inboxes.get(loop)
+        if inbox is None:
+            inbox = cls._inboxes[loop] = ResultInbox()
+        await inbox.start()
+        return inbox
+
+    async def start(self) -> None:
+        """Start receiving results in the background if not yet started, and wait until ready."""
+        if self._reader is None or self._reader.done():
+            self._subscribed = asyncio.get_running_loop().create_future()
+            self._reader = asyncio.create_task(self._receive_forever())
+        assert self._subscribed is not None
+        await asyncio.shield(self._subscribed)
+
+    def expect(self, task_id: str) -> "asyncio.Future[AsyncResult]":
+        """Return the future that will be resolved once the result of the given task arrives."""
+        future: "asyncio.Future[AsyncResult]" = asyncio.get_running_loop().create_future()
+        self._futures[task_id] = future
+        return future
+
+    def expect_stream(self, task_id: str) -> "asyncio.Queue[AsyncResult]":
+        """
+        Return the queue that will receive the frames streamed by the given task as they arrive.
+
+        The stream ends with a ready frame.
+        """
+        queue: "asyncio.Queue[AsyncResult]" = asyncio.Queue()
+        self._streams[task_id] = queue
+        return queue
+
+    def discard(self, task_id: str) -> None:
+        """Stop expecting the result or the stream of the given task."""
+        self._futures.pop(task_id, None)
+        self._streams.pop(task_id, None)
+
+    async def _receive_forever(self) -> None:
+        # pylint: disable=import-outside-toplevel
+        from .serde import Serialization
+        from .task import AsyncResult as AsyncResultClass
+
+        assert self._subscribed is not None
+        try:
+            pubsub_ = PubSub.get(url=Config.broker_url(), poll_interval_s=Config.poll_interval_s())
+            async with pubsub_ as pubsub:  # pylint: disable=not-async-context-manager
+                await pubsub.subscribe(self.channel)
+                self._subscribed.set_result(None)
+                self._logger.debug("Receiving results [channel=%s]", self.channel)
+                while True:
+                    message = await pubsub.poll()
+                    result_serialized: bytes = message["data"]
+                    try:
+                        result_serialized = await ClaimCheck.resolve(result_serialized)
+                        self._receive(
+                            Serialization.deserialize(AsyncResultClass, result_serialized)
+                        )
+                    except BlobNotFound:
+                        self._logger.exception("Ignoring result whose body is not found")
+                    except Exception as exc:  # pylint: disable=broad-except
+                        # Only fail the one waiting for this result, and keep receiving the others
+                        task_id = Serialization.get_result_task_id(result_serialized)
+                        self._logger.exception("Failed to receive result [task_id=%s]", task_id)
+                        if task_id is not None:
+                            self._fail(task_id, exc)
+        except Exception as exc:  # pylint: disable=broad-except
+            # Fail everyone waiting instead of leaving them hanging forever
+            self._logger.exception("Stopped receiving results [channel=%s]", self.channel)
+            if not self._subscribed.done():
+                self._subscribed.set_exception(exc)
+            for task_id in [*self._futures, *self._streams]:
+                self._fail(task_id, exc)
+
+    def _receive(self, async_result: "AsyncResult") -> None:
+        stream = self._streams.get(async_result.task_id)
+        if stream is not None:
+            stream.put_nowait(async_result)
+            if async_result.ready:
+                del self._streams[async_result.task_id]
+            return
+        future = self._futures.pop(async_result.task_id, None)
+        if future is None or future.done():
+            self._logger.debug("Ignoring unexpected result [task_id=%s]", async_result.task_id)
+            return
+        future.set_result(async_result)
+
+    def _fail(self, task_id: str, exc: Exception) -> None:
+        # pylint: disable=import-outside-toplevel
+        from .task import AsyncResult as AsyncResultClass
+
+        stream = self._streams.pop(task_id, None)
+        if stream is not None:
+            stream.put_nowait(AsyncResultClass(task_id=task_id, ready=True, result=None, error=exc))
+        future = self._futures.pop(task_id, None)
+        if future is not None and not future.done():
+            future.set_exception(exc)
+
+    @cached_property
+    def _logger(self):
+        return logging.getLogger(f"[{os.getpid()}] [{self.__class__.__qualname__}]")
@@ -12,15 +12,20 @@ import typing as t
 Message = t.Union[str, bytes]
 
 
-class PollResponse(t.TypedDict):
-    """Define the dictionary returned from a pubsub."""
-
+class _PollResponse(t.TypedDict):
     type: str
     data: Message
     pattern: t.Optional[str]
     channel: bytes
 
 
+class PollResponse(_PollResponse, total=False):
+    """Define the dictionary returned from a pubsub."""
+
+    # The id of the message in the broker, if it's to be acknowledged, see `IPubSub.ack`
+    id: bytes
+
+
 class IProcess(t.Protocol):
     """
     Define the interface for a process used in the library.
@@ -70,6 +75,42 @@ class IConcurrencyManager(t.Protocol):
         """Terminate each process under management."""
 
 
+class DispatchStrategy(str, enum.Enum):
+    """Define supported strategies for a worker manager to pass tasks to its grunt workers."""
+
+    ROUND_ROBIN = "round-robin"
+    LEAST_OUTSTANDING = "least-outstanding"
+    POWER_OF_TWO_CHOICES = "power-of-two-choices"
+
+
+class PriorityMode(str, enum.Enum):
+    """Define supported modes for workers to pick the next task among tasks of any priority."""
+
+    STRICT = "strict"
+    WEIGHTED = "weighted"
+
+
+class IDispatcher(t.Protocol):
+    """
+    Define the interface of a dispatcher.
+
+    It should be able to pick the grunt worker that the next task should be passed to.
+    """
+
+    def select(self) -> int:
+        """Return the index of the grunt worker to pass the next task to."""
+
+
+class IBlobStore(t.Protocol):
+    """Define the interface of a store for the bodies of messages too big to be sent inline."""
+
+    async def put(self, key: str, data: bytes, ttl_s: int) -> None:
+        """Store the data under the given key, for at most `ttl_s` seconds."""
+
+    async def pop(self, key: str) -> bytes:
+        """Remove the data stored under the given key and return it."""
+
+
 class IPubSub(t.Protocol):
     """
     Define the interface of Publisher-Subscriber.
@@ -94,6 +135,10 @@ class IPubSub(t.Protocol):
     ```
     """
 
+    # Whether the broker keeps the messages until they're polled, so that subscribers should only
+    # poll as many as they can handle and leave the others to the other subscribers
+    retains_messages: bool
+
     def __init__(self, url: str, poll_interval_s: float, *args, **kwargs):
         """Initialize the pubsub class."""
 
@@ -106,12 +151,23 @@ class IPubSub(t.Protocol):
     async def publish(self, channel: str, message: Message) -> None:
         """Publish the given messaage to the given channel."""
 
-    async def subscribe(self, channel: str) -> None:
-        """Start subscribing to the given channel."""
+    async def publish_many(self, channel: str, messages: t.Sequence[Message]) -> None:
+        """Publish the given messages to the given channel, in as few round-trips as possible."""
+
+    async def subscribe(self, channel: str, ack_late: bool = False) -> None:
+        """
+        Start subscribing to the given channel.
+
+        With `ack_late`, a broker which retains messages keeps each message polled until it's
+        acknowledged via `ack`, and passes it to another subscriber if this one dies before that.
+        """
 
     async def poll(self) -> PollResponse:
         """Poll for new message from the subscribed channel, and return it."""
 
+    async def ack(self, message: PollResponse) -> None:
+        """Acknowledge a message polled from a channel subscribed to with `ack_late`, once handled."""
+
 
 class IWorker(t.Protocol):
     """
@@ -143,9 +199,21 @@ class SerializationType(str, enum.Enum):
     """Specify the types of serialization supported."""
 
     JSON = "json"
+    PICKLE = "pickle"
+    MSGPACK = "msgpack"
     DEFAULT = JSON
 
 
+class CompressionType(str, enum.Enum):
+    """Specify the types of compression supported for serialized messages."""
+
+    NONE = "none"
+    ZLIB = "zlib"
+    LZ4 = "lz4"
+    ZSTD = "zstd"
+    DEFAULT = NONE
+
+
 T = t.TypeVar("T")
 
 
@@ -161,7 +229,11 @@ class ISerialization(t.Protocol, t.Generic[T]):
         """Deserialize bytes into any object."""
 
 
-class RetryOptions(t.TypedDict):
+class _RetryDelayOptions(t.TypedDict, total=False):
+    countdown_s: float
+
+
+class RetryOptions(_RetryDelayOptions):
     """
     Specify the available retry options.
 
@@ -185,13 +257,123 @@ class RetryOptions(t.TypedDict):
 
                                         If `on=tuple()` then during task definition aiotaskq will raise
                                         `InvalidRetryOptions`
+    countdown_s float: Optional. The number of seconds to wait before each retry. Retried right
+                       away if not provided.
     """
 
     max_retries: int | None
     on: tuple[type[Exception], ...]
 
 
+class CacheOptions(t.TypedDict, total=False):
+    """
+    Specify the memoization options of a task.
+
+    ttl_s int | None: The number of seconds a result is cached for. Cached forever if None.
+    namespace str: The namespace of the cache keys, e.g. bump it to invalidate all results.
+                   Defaults to the env var AIOTASKQ_CACHE_NAMESPACE.
+    max_size int: The maximum size in bytes of a serialized result to be cached.
+                  Defaults to the env var AIOTASKQ_CACHE_MAX_SIZE.
+    client_lookup bool: Whether the client looks the result up before publishing the task.
+    """
+
+    ttl_s: int | None
+    namespace: str
+    max_size: int
+    client_lookup: bool
+
+
+class WorkflowStep(t.TypedDict):
+    """
+    Define a step of a workflow, i.e. a call to a task, as stored in the definition of the workflow.
+
+    Unless `immutable`, the step is called with the result of the previous stage prepended to its
+    arguments.
+    """
+
+    module: str
+    qualname: str
+    args: list[t.Any]
+    kwargs: dict[str, t.Any]
+    immutable: bool
+
+
+class WorkflowStage(t.TypedDict):
+    """
+    Define a stage of a workflow, as stored in the definition of the workflow.
+
+    steps list[WorkflowStep]: The steps of the stage, executed in parallel.
+    group bool: Whether the stage is a group, whose result is the list of the results of its
+                steps, or a single step, whose result is its own.
+    """
+
+    steps: list[WorkflowStep]
+    group: bool
+
+
+class WorkflowState(t.TypedDict):
+    """
+    Define the state of a workflow, as carried in the messages of its tasks.
+
+    The stages themselves are stored once in Redis rather than carried in every message, see
+    `aiotaskq.workflow`.
+
+    id str: The id of the workflow, which its final result is delivered with.
+    stage int: The stage of the task carrying the state.
+    index int: The index of the task carrying the state in its stage.
+    size int: The number of steps of the stage.
+    group bool: Whether the stage is a group, see `WorkflowStage`.
+    stages int: The number of stages of the workflow.
+    """
+
+    id: str
+    stage: int
+    index: int
+    size: int
+    group: bool
+    stages: int
+
+
+class TaskEnvelope(t.TypedDict):
+    """
+    Define where the result of a task is delivered, which is decoded from its message even if the
+    task itself can't be, e.g. to report the error to its caller.
+
+    task_id str: The id the caller waits for the result with, i.e. the id of the workflow if any.
+    reply_to str | None: The channel the caller waits for the result on, if any.
+    store_result bool: Whether the result is stored in the result backend.
+    """
+
+    task_id: str
+    reply_to: t.Optional[str]
+    store_result: bool
+
+
+class ScheduleOptions(t.TypedDict, total=False):
+    """
+    Specify the schedule a task is applied on by `aiotaskq beat`, see `aiotaskq.schedule`.
+
+    every_s float: Apply the task every `every_s` seconds.
+    cron str: Apply the task per the cron expression, in UTC, e.g. "30 8 * * 1-5".
+    args list: The positional arguments to apply the task with.
+    kwargs dict: The keyword arguments to apply the task with.
+    """
+
+    every_s: float
+    cron: str
+    args: list
+    kwargs: dict[str, t.Any]
+
+
 class TaskOptions(t.TypedDict):
     """Specify the options available for a task."""
 
     retry: RetryOptions | None
+    compression: CompressionType | None
+    shared_memory: bool
+    cache: CacheOptions | None
+    single_flight: bool
+    priority: int
+    queue: str | None
+    rate_limit: str | None
+    schedule: ScheduleOptions | None
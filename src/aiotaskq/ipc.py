@@ -0,0 +1,139 @@
+"""
+Define the broker used for inter-process communication (IPC) within a single host.
+
+The broker is a tiny publish/subscribe server listening on a Unix domain socket. It's
+hosted by the WorkerManager, and its GruntWorkers as well as any client on the same host
+connect to it via `PubSubIpc` (url="ipc:///path/to/socket"). No external server like
+Redis is needed.
+
+Every frame exchanged on the socket has the following layout:
+
+    | size (4 bytes) | op (1 byte) | channel size (2 bytes) | channel | data |
+
+where size is the number of bytes that follow it.
+"""
+
+import asyncio
+from functools import cached_property
+import logging
+import os
+import struct
+import typing as t
+
+from .config import Config
+
+OP_PUBLISH = b"P"
+OP_SUBSCRIBE = b"S"
+OP_SUBSCRIBED = b"A"
+OP_MESSAGE = b"M"
+
+_SIZE = struct.Struct(">I")
+_CHANNEL_SIZE = struct.Struct(">H")
+
+
+class Frame(t.NamedTuple):
+    """Define a frame exchanged between the IPC broker and its clients."""
+
+    op: bytes
+    channel: str
+    data: bytes
+
+
+def get_ipc_path(url: str) -> str:
+    """Return the path to the Unix domain socket given a url like "ipc:///tmp/aiotaskq.sock"."""
+    return url.split("://", 1)[1]
+
+
+def encode_frame(operation: bytes, channel: str, data: bytes = b"") -> bytes:
+    """Encode a frame into bytes ready to be written to the socket."""
+    channel_bytes = channel.encode("utf-8")
+    size = len(operation) + _CHANNEL_SIZE.size + len(channel_bytes) + len(data)
+    return b"".join(
+        (_SIZE.pack(size), operation, _CHANNEL_SIZE.pack(len(channel_bytes)), channel_bytes, data)
+    )
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Frame:
+    """Read the next frame from the socket."""
+    (size,) = _SIZE.unpack(await reader.readexactly(_SIZE.size))
+    body = await reader.readexactly(size)
+    (channel_size,) = _CHANNEL_SIZE.unpack_from(body, 1)
+    channel_end = 1 + _CHANNEL_SIZE.size + channel_size
+    channel = body[1 + _CHANNEL_SIZE.size : channel_end].decode("utf-8")
+    return Frame(op=body[:1], channel=channel, data=body[channel_end:])
+
+
+class IpcBroker:
+    """
+    Relay messages published on a channel to all the clients subscribed to that channel.
+
+    Like Redis PUBLISH/SUBSCRIBE, a message published while nobody is subscribed is dropped.
+    Once more than `Config.ipc_max_pending_size()` bytes are waiting for a subscriber which
+    doesn't keep up, its publishers stop being read from until it catches up, so that they wait
+    to publish rather than the broker buffering messages without bound.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._server: t.Optional[asyncio.AbstractServer] = None
+        self._subscribers: dict[str, set[asyncio.StreamWriter]] = {}
+
+    async def start(self) -> None:
+        """Start listening on the Unix domain socket."""
+        if os.path.exists(self._path):
+            # Left behind by a previous broker that didn't exit cleanly
+            os.remove(self._path)
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self._path)
+        self._logger.info("Listening [path=%s]", self._path)
+
+    async def close(self) -> None:
+        """Stop listening and remove the Unix domain socket."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        channels: set[str] = set()
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame.op == OP_PUBLISH:
+                    message = encode_frame(OP_MESSAGE, frame.channel, frame.data)
+                    subscribers = tuple(self._subscribers.get(frame.channel, ()))
+                    for subscriber in subscribers:
+                        subscriber.write(message)
+                    # Don't read the next message of the publisher until every subscriber has
+                    # room for it
+                    await asyncio.gather(*(self._drain(s, frame.channel) for s in subscribers))
+                elif frame.op == OP_SUBSCRIBE:
+                    if not channels:
+                        writer.transport.set_write_buffer_limits(high=Config.ipc_max_pending_size())
+                    self._subscribers.setdefault(frame.channel, set()).add(writer)
+                    channels.add(frame.channel)
+                    writer.write(encode_frame(OP_SUBSCRIBED, frame.channel))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for channel in channels:
+                subscribers = self._subscribers.get(channel, set())
+                subscribers.discard(writer)
+                if not subscribers:
+                    self._subscribers.pop(channel, None)
+            writer.close()
+
+    async def _drain(self, subscriber: asyncio.StreamWriter, channel: str) -> None:
+        if subscriber.transport.get_write_buffer_size() > Config.ipc_max_pending_size():
+            self._logger.debug("Waiting for a slow subscriber to catch up [channel=%s]", channel)
+        try:
+            await subscriber.drain()
+        except ConnectionError:
+            # It has disconnected, which its own handler takes care of
+            pass
+
+    @cached_property
+    def _logger(self):
+        return logging.getLogger(f"[{os.getpid()}] [{self.__class__.__qualname__}]")
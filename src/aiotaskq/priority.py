@@ -0,0 +1,105 @@
+"""
+Define the priorities of tasks, from 0 (the default) to 9 (the most urgent).
+
+Tasks of each priority are published on their own channel, so that the WorkerManager knows the
+priority of a task without deserializing it, and buffers them in a `PriorityBuffer`. It only
+passes the next task to a GruntWorker once one has room for it, so that the tasks of higher
+priority published in the meantime are passed first. GruntWorkers buffer the tasks passed to
+them the same way, on a channel per priority too.
+"""
+
+import asyncio
+import collections
+import typing as t
+
+from .exceptions import InvalidArgument
+from .interfaces import IPubSub, PriorityMode
+
+MIN_PRIORITY = 0
+MAX_PRIORITY = 9
+
+T = t.TypeVar("T")
+
+
+def validate_priority(priority: int) -> int:
+    """Return the priority if it's valid, or raise `InvalidArgument`."""
+    if not isinstance(priority, int) or not MIN_PRIORITY <= priority <= MAX_PRIORITY:
+        raise InvalidArgument(
+            f"Priority should be an int from {MIN_PRIORITY} to {MAX_PRIORITY}, got {priority}"
+        )
+    return priority
+
+
+def get_priority_channel(channel: str, priority: int) -> str:
+    """Return the channel carrying the messages of the given channel with the given priority."""
+    return channel if priority == MIN_PRIORITY else f"{channel}:priority:{priority}"
+
+
+class PriorityBuffer(t.Generic[T]):
+    """
+    Buffer the messages received on the channels of each priority of a channel, and return the
+    most urgent one first.
+
+    In the "strict" mode, a message is returned only once there's none of higher priority left.
+    In the "weighted" mode, each priority instead gets a share of the messages returned
+    proportional to its weight, i.e. `priority + 1`, so that low priorities are never starved.
+    """
+
+    def __init__(self, channel: str, mode: PriorityMode) -> None:
+        """Initialize an empty buffer for the given channel."""
+        self._mode = mode
+        self._priorities: dict[bytes, int] = {
+            get_priority_channel(channel, priority).encode(): priority
+            for priority in range(MIN_PRIORITY, MAX_PRIORITY + 1)
+        }
+        self._queues: list[collections.deque[T]] = [
+            collections.deque() for _ in range(MIN_PRIORITY, MAX_PRIORITY + 1)
+        ]
+        self._size = 0
+        self._not_empty = asyncio.Event()
+        # The credits of each priority in the weighted mode, see `_select_weighted`
+        self._current_weights: list[int] = [0] * (MAX_PRIORITY + 1)
+
+    def __len__(self) -> int:
+        """Return the number of messages buffered."""
+        return self._size
+
+    async def subscribe(self, pubsub: IPubSub, ack_late: bool = False) -> None:
+        """Subscribe to the channels of every priority, see `IPubSub.subscribe`."""
+        for channel in self._priorities:
+            await pubsub.subscribe(channel.decode(), ack_late=ack_late)
+
+    def put(self, priority: int, data: T) -> None:
+        """Buffer the message with the given priority."""
+        self._queues[priority].append(data)
+        self._size += 1
+        self._not_empty.set()
+
+    async def get(self) -> tuple[int, T]:
+        """Wait until a message is buffered, and return the most urgent one with its priority."""
+        while self._size == 0:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        non_empty: list[int] = [p for p, queue in enumerate(self._queues) if queue]
+        if self._mode == PriorityMode.WEIGHTED:
+            priority = self._select_weighted(non_empty)
+        else:
+            priority = non_empty[-1]
+        self._size -= 1
+        return priority, self._queues[priority].popleft()
+
+    def _select_weighted(self, non_empty: list[int]) -> int:
+        """
+        Select the priority to return a message of, with a smooth weighted round-robin.
+
+        Each priority with messages earns its weight in credits, and the richest one is selected
+        and pays back the total weight, so that selections are proportional to the weights and
+        evenly spread.
+        """
+        total_weight: int = 0
+        for priority in non_empty:
+            self._current_weights[priority] += priority + 1
+            total_weight += priority + 1
+        selected: int = max(non_empty, key=lambda p: (self._current_weights[p], p))
+        self._current_weights[selected] -= total_weight
+        return selected
@@ -1,12 +1,95 @@
 """Define IPubSub implementations."""
 
 import asyncio
+import collections
+import os
+import socket
+import time
 import typing as t
+import weakref
 
 import aioredis as redis
 
+from .config import Config
+from .constants import Constants
 from .exceptions import UrlNotSupported
 from .interfaces import IPubSub, Message, PollResponse
+from .ipc import OP_MESSAGE, OP_PUBLISH, OP_SUBSCRIBE, encode_frame, get_ipc_path, read_frame
+
+# Max number of commands sent to redis in one pipeline when publishing many messages at once
+_PIPELINE_BATCH_SIZE = 1000
+
+
+def get_redis_url(url: str) -> str:
+    """
+    Return the url understood by the redis client given a broker url.
+
+    For example, "redis+streams://127.0.0.1:6379" becomes "redis://127.0.0.1:6379".
+    """
+    scheme, rest = url.split("://", 1)
+    return f"{scheme.split('+', 1)[0]}://{rest}"
+
+
+class RedisConnectionPools:
+    """
+    Registry of redis connection pools shared by everything within the same process.
+
+    Pools are kept per process, per event loop and per url, so that any publisher or
+    subscriber created on the same event loop reuses already-open connections instead of
+    opening new ones. Each pool holds at most `Config.broker_max_connections()` connections
+    and waits for a connection to be released once exhausted.
+
+    There are two kinds of pool: one for regular commands which hold a connection only for
+    the duration of one command, and one for subscriptions and blocking reads which hold a
+    connection for as long as they're listening. Keeping them apart means that exhausting
+    the latter never prevents anyone from publishing. Uses of blocking reads which may pile up
+    regardless of the broker, e.g. clients waiting for results, are given their own named pool
+    too, so that they never starve the subscriptions of the broker on the same url either.
+    """
+
+    _pid: t.Optional[int] = None
+    _pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, t.Any]]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    @classmethod
+    def get_client(
+        cls, url: str, blocking: bool = False, pool: str = "default", **kwargs
+    ) -> redis.Redis:
+        """
+        Return a redis client backed by the pool shared within the current event loop.
+
+        Set `blocking` to True for subscriptions and blocking reads, and `pool` to the name of
+        a dedicated pool for blocking reads which must not compete with the others.
+        """
+        return redis.Redis(
+            connection_pool=cls.get_pool(url=url, blocking=blocking, pool=pool, **kwargs)
+        )
+
+    @classmethod
+    def get_pool(
+        cls, url: str, blocking: bool = False, pool: str = "default", **kwargs
+    ) -> redis.ConnectionPool:
+        """Return the connection pool shared within the current event loop."""
+        if cls._pid != os.getpid():
+            # Connections must never be shared with a parent process (e.g. after a fork)
+            cls.reset()
+        pools = cls._pools.setdefault(asyncio.get_running_loop(), {})
+        key = (url, blocking, pool, tuple(sorted(kwargs.items())))
+        if key not in pools:
+            pools[key] = redis.BlockingConnectionPool.from_url(
+                url=get_redis_url(url),
+                max_connections=Config.broker_max_connections(),
+                timeout=None,
+                **kwargs,
+            )
+        return pools[key]
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget all connection pools."""
+        cls._pid = os.getpid()
+        cls._pools = weakref.WeakKeyDictionary()
 
 
 class PubSub:
@@ -19,8 +102,15 @@ class PubSub:
         """
         Return the correct pubsub implementation instance based on url.
 
-        Currently supports only Redis (url="redis*").
+        Currently supports Redis Streams (url="redis+streams*" or "rediss+streams*"),
+        Redis PUBLISH/SUBSCRIBE (url="redis*") and the single-host IPC broker (url="ipc://*").
         """
+        if url.startswith("ipc://"):
+            cls._instance = PubSubIpc(url=url, poll_interval_s=poll_interval_s, **kwargs)
+            return cls._instance
+        if url.startswith(("redis+streams://", "rediss+streams://")):
+            cls._instance = PubSubRedisStreams(url=url, poll_interval_s=poll_interval_s, **kwargs)
+            return cls._instance
         if url.startswith("redis"):
             cls._instance = PubSubRedis(url=url, poll_interval_s=poll_interval_s, **kwargs)
             return cls._instance
@@ -30,14 +120,21 @@ class PubSub:
 class PubSubRedis:
     """Redis implementation of a pubsub."""
 
+    retains_messages = False
+
     def __init__(self, url: str, poll_interval_s: float, **kwargs) -> None:
         self._url = url
         self._poll_interval_s = poll_interval_s
-        self._redis_client = redis.Redis.from_url(url=self._url, **kwargs)
-        self._redis_pubsub = self._redis_client.pubsub()
+        self._kwargs = kwargs
+        self._redis_client: redis.Redis
+        self._redis_pubsub: redis.client.PubSub
 
     async def __aenter__(self) -> "PubSubRedis":
         """Initialize redis client and redis pubsub client on entering the async context."""
+        self._redis_client = RedisConnectionPools.get_client(url=self._url, **self._kwargs)
+        self._redis_pubsub = RedisConnectionPools.get_client(
+            url=self._url, blocking=True, **self._kwargs
+        ).pubsub()
         await self._redis_client.__aenter__()
         await self._redis_pubsub.__aenter__()
         return self
@@ -51,16 +148,321 @@ class PubSubRedis:
         """Publish the given message to the given channel."""
         await self._redis_client.publish(channel=channel, message=message)
 
-    async def subscribe(self, channel: str) -> None:
-        """Start subscribing to the given channel."""
+    async def publish_many(self, channel: str, messages: t.Sequence[Message]) -> None:
+        """Publish the given messages to the given channel, in pipelined batches."""
+        for i in range(0, len(messages), _PIPELINE_BATCH_SIZE):
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                for message in messages[i : i + _PIPELINE_BATCH_SIZE]:
+                    pipe.publish(channel=channel, message=message)
+                await pipe.execute()
+
+    async def subscribe(self, channel: str, ack_late: bool = False) -> None:
+        """Start subscribing to the given channel, messages are never kept for redelivery."""
+        # pylint: disable=unused-argument
         await self._redis_pubsub.subscribe(channel)
 
     async def poll(self) -> PollResponse:
-        """Keep requesting for a new message on some interval, and return one only if available."""
+        """
+        Block until a new message is available, and return it.
+
+        The read wakes up as soon as a message arrives. `poll_interval_s` only bounds how long
+        a single blocking read may wait before it is re-armed, so it is not a latency floor.
+        """
         message: t.Optional[Message]
         while True:
-            message = await self._redis_pubsub.get_message(ignore_subscribe_messages=True)
+            message = await self._redis_pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=self._poll_interval_s,
+            )
             if message is not None:
                 break
-            await asyncio.sleep(self._poll_interval_s)
         return message
+
+    async def ack(self, message: PollResponse) -> None:
+        """Do nothing, messages are never kept for redelivery."""
+
+
+class PubSubRedisStreams:  # pylint: disable=too-many-instance-attributes
+    """
+    Redis Streams implementation of a pubsub.
+
+    Unlike `PubSubRedis`, messages are appended to a stream (XADD) and consumed via a
+    consumer group (XREADGROUP), so a message published while nobody is subscribed is
+    kept until a consumer reads it instead of being dropped. Consumers sharing the same
+    channel compete for messages, and each consumer pulls at its own pace.
+
+    A message is acknowledged (XACK) and removed from the stream (XDEL) as soon as it's read,
+    unless its channel is subscribed to with `ack_late`, in which case it's only once the
+    consumer calls `ack`. Until then the consumer keeps claiming it (XCLAIM) every now and then,
+    so that it's never idle for `Config.stream_claim_idle_s()`. Past that, the consumer is
+    assumed dead, and the message is claimed (XAUTOCLAIM) and returned by another consumer of
+    the channel instead.
+    """
+
+    retains_messages = True
+
+    def __init__(self, url: str, poll_interval_s: float, **kwargs) -> None:
+        self._url = url
+        self._poll_interval_s = poll_interval_s
+        self._kwargs = kwargs
+        self._redis_client: redis.Redis
+        self._redis_blocking_client: redis.Redis
+        self._group = Constants.consumer_group()
+        self._consumer = f"{socket.gethostname()}:{os.getpid()}"
+        self._streams: dict[str, str] = {}
+        # The messages read but not returned yet, since a read returns up to one per stream
+        self._pending: collections.deque[PollResponse] = collections.deque()
+        # The ids of the messages returned but not acknowledged yet, per `ack_late` channel
+        self._unacked: dict[bytes, set[bytes]] = {}
+        # Where to resume looking for the messages of dead consumers, per `ack_late` channel
+        self._claim_cursors: dict[bytes, bytes] = {}
+        self._claim_at: float = 0.0
+        self._keeping_claimed: t.Optional["asyncio.Task[None]"] = None
+
+    async def __aenter__(self) -> "PubSubRedisStreams":
+        """Initialize redis clients on entering the async context."""
+        self._redis_client = RedisConnectionPools.get_client(url=self._url, **self._kwargs)
+        self._redis_blocking_client = RedisConnectionPools.get_client(
+            url=self._url, blocking=True, **self._kwargs
+        )
+        await self._redis_client.__aenter__()
+        await self._redis_blocking_client.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        """Close redis clients on exiting the async context."""
+        if self._keeping_claimed is not None:
+            self._keeping_claimed.cancel()
+            await asyncio.gather(self._keeping_claimed, return_exceptions=True)
+            self._keeping_claimed = None
+        await self._redis_blocking_client.__aexit__(exc_type, exc_value, traceback)
+        await self._redis_client.__aexit__(exc_type, exc_value, traceback)
+
+    async def publish(self, channel: str, message: Message) -> None:
+        """Append the given message to the stream of the given channel."""
+        async with self._redis_client.pipeline(transaction=False) as pipe:
+            pipe.xadd(name=channel, fields={"data": message})
+            pipe.expire(name=channel, time=Config.stream_ttl_s())
+            await pipe.execute()
+
+    async def publish_many(self, channel: str, messages: t.Sequence[Message]) -> None:
+        """Append the given messages to the stream of the given channel, in pipelined batches."""
+        for i in range(0, len(messages), _PIPELINE_BATCH_SIZE):
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                for message in messages[i : i + _PIPELINE_BATCH_SIZE]:
+                    pipe.xadd(name=channel, fields={"data": message})
+                pipe.expire(name=channel, time=Config.stream_ttl_s())
+                await pipe.execute()
+
+    async def subscribe(self, channel: str, ack_late: bool = False) -> None:
+        """Start consuming the stream of the given channel via the consumer group."""
+        await self._create_group(channel)
+        self._streams[channel] = ">"
+        if ack_late:
+            self._unacked.setdefault(channel.encode(), set())
+            self._claim_cursors[channel.encode()] = b"0-0"
+            if self._keeping_claimed is None:
+                self._keeping_claimed = asyncio.create_task(self._keep_claimed_forever())
+
+    async def poll(self) -> PollResponse:
+        """
+        Block until a new message is available on any subscribed stream, and return it.
+
+        A read returns up to one message per stream with messages, the others are kept for the
+        next polls.
+        """
+        block_ms = max(int(self._poll_interval_s * 1000), 1)
+        while not self._pending:
+            if self._claim_cursors and time.monotonic() >= self._claim_at:
+                await self._claim()
+                continue
+            try:
+                response = await self._redis_blocking_client.xreadgroup(
+                    groupname=self._group,
+                    consumername=self._consumer,
+                    streams=self._streams,
+                    count=1,
+                    block=block_ms,
+                )
+            except redis.ResponseError as exc:
+                # The stream (and its group) may have expired while we were idle
+                if "NOGROUP" not in str(exc):
+                    raise
+                for channel in self._streams:
+                    await self._create_group(channel)
+                continue
+            if response:
+                await self._receive(response)
+        return self._pending.popleft()
+
+    async def ack(self, message: PollResponse) -> None:
+        """Acknowledge a message polled from an `ack_late` channel, and remove it."""
+        message_id: t.Optional[bytes] = message.get("id")
+        if message_id is None:
+            return
+        channel: bytes = message["channel"]
+        self._unacked[channel].discard(message_id)
+        async with self._redis_client.pipeline(transaction=False) as pipe:
+            pipe.xack(channel, self._group, message_id)
+            pipe.xdel(channel, message_id)
+            await pipe.execute()
+
+    async def _receive(self, response: list[tuple[bytes, list[tuple[bytes, dict]]]]) -> None:
+        """Keep the messages read from each stream, and remove them unless acknowledged later."""
+        async with self._redis_client.pipeline(transaction=False) as pipe:
+            for channel, entries in response:
+                for message_id, fields in entries:
+                    if channel in self._unacked:
+                        self._keep(channel, message_id, fields)
+                        continue
+                    pipe.xack(channel, self._group, message_id)
+                    pipe.xdel(channel, message_id)
+                    data: Message = fields[b"data"] if b"data" in fields else fields["data"]
+                    self._pending.append(
+                        {"type": "message", "data": data, "pattern": None, "channel": channel}
+                    )
+            await pipe.execute()
+
+    def _keep(self, channel: bytes, message_id: bytes, fields: dict) -> None:
+        """Keep a message of an `ack_late` channel, to be returned and acknowledged later."""
+        self._unacked[channel].add(message_id)
+        data: Message = fields[b"data"] if b"data" in fields else fields["data"]
+        self._pending.append(
+            {"type": "message", "data": data, "pattern": None, "channel": channel, "id": message_id}
+        )
+
+    async def _claim(self) -> None:
+        """
+        Claim a message left pending for too long by a dead consumer on each `ack_late` channel,
+        if any, or look for them again later.
+        """
+        idle_ms: int = int(Config.stream_claim_idle_s() * 1000)
+        for channel, cursor in list(self._claim_cursors.items()):
+            entries: list[t.Optional[tuple[bytes, list[bytes]]]] = []
+            try:
+                cursor, entries, *_ = await self._redis_client.execute_command(
+                    "XAUTOCLAIM", channel, self._group, self._consumer, idle_ms, cursor, "COUNT", 1
+                )
+            except redis.ResponseError as exc:
+                if "NOGROUP" not in str(exc):
+                    raise
+                cursor = b"0-0"
+            self._claim_cursors[channel] = cursor
+            for entry in entries:
+                # Entries removed meanwhile are returned as None
+                if entry is not None:
+                    message_id, fields = entry
+                    self._keep(channel, message_id, dict(zip(fields[::2], fields[1::2])))
+        if not self._pending and all(c == b"0-0" for c in self._claim_cursors.values()):
+            self._claim_at = time.monotonic() + Config.stream_claim_idle_s() / 2
+
+    async def _keep_claimed_forever(self) -> None:
+        """
+        Claim the messages not acknowledged yet again every now and then, so that they're not
+        taken as left by a dead consumer while this one is busy, e.g. not polling.
+        """
+        while True:
+            await asyncio.sleep(Config.stream_claim_idle_s() / 3)
+            for channel, message_ids in list(self._unacked.items()):
+                if not message_ids:
+                    continue
+                try:
+                    await self._redis_client.xclaim(
+                        channel, self._group, self._consumer, 0, list(message_ids), justid=True
+                    )
+                except redis.RedisError:
+                    # Try again next time, they're only claimed by others once idle for long
+                    continue
+
+    async def _create_group(self, channel: str) -> None:
+        try:
+            await self._redis_client.xgroup_create(
+                name=channel,
+                groupname=self._group,
+                id="0",
+                mkstream=True,
+            )
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+
+class PubSubIpc:
+    """
+    Implementation of a pubsub on top of the single-host IPC broker hosted by the WorkerManager.
+
+    See `aiotaskq.ipc` for more details.
+    """
+
+    retains_messages = False
+
+    def __init__(self, url: str, poll_interval_s: float, **kwargs) -> None:
+        # pylint: disable=unused-argument
+        self._url = url
+        self._poll_interval_s = poll_interval_s
+        self._reader: asyncio.StreamReader
+        self._writer: asyncio.StreamWriter
+        self._pending: list[PollResponse] = []
+
+    async def __aenter__(self) -> "PubSubIpc":
+        """Connect to the IPC broker on entering the async context."""
+        self._reader, self._writer = await asyncio.open_unix_connection(
+            path=get_ipc_path(self._url)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        """Disconnect from the IPC broker on exiting the async context."""
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def publish(self, channel: str, message: Message) -> None:
+        """Publish the given message to the given channel."""
+        self._writer.write(encode_frame(OP_PUBLISH, channel, self._to_bytes(message)))
+        await self._writer.drain()
+
+    async def publish_many(self, channel: str, messages: t.Sequence[Message]) -> None:
+        """Publish the given messages to the given channel, in one write."""
+        self._writer.write(
+            b"".join(encode_frame(OP_PUBLISH, channel, self._to_bytes(m)) for m in messages)
+        )
+        await self._writer.drain()
+
+    async def subscribe(self, channel: str, ack_late: bool = False) -> None:
+        """
+        Start subscribing to the given channel, and wait until the broker confirms it.
+
+        Messages are never kept for redelivery.
+        """
+        # pylint: disable=unused-argument
+        self._writer.write(encode_frame(OP_SUBSCRIBE, channel))
+        await self._writer.drain()
+        while True:
+            frame = await read_frame(self._reader)
+            if frame.op != OP_MESSAGE:
+                break
+            # A message from a channel subscribed to earlier, keep it for the next poll
+            self._pending.append(self._to_poll_response(frame.channel, frame.data))
+
+    async def poll(self) -> PollResponse:
+        """Wait until a new message is available, and return it."""
+        if self._pending:
+            return self._pending.pop(0)
+        while True:
+            frame = await read_frame(self._reader)
+            if frame.op == OP_MESSAGE:
+                return self._to_poll_response(frame.channel, frame.data)
+
+    async def ack(self, message: PollResponse) -> None:
+        """Do nothing, messages are never kept for redelivery."""
+
+    @staticmethod
+    def _to_poll_response(channel: str, data: bytes) -> PollResponse:
+        return {"type": "message", "data": data, "pattern": None, "channel": channel.encode()}
+
+    @staticmethod
+    def _to_bytes(message: Message) -> bytes:
+        return message.encode("utf-8") if isinstance(message, str) else message
@@ -0,0 +1,167 @@
+"""
+Define the rate limits of tasks, enforced across all the workers, see the `rate_limit` option.
+
+A task with e.g. `options={"rate_limit": "50/s"}` is executed at most 50 times per second by the
+whole fleet of workers, in bursts of up to 50 calls. The limit is a token bucket in Redis per task,
+refilled continuously at the rate and holding up to the number of calls per period. A Lua script
+refills the bucket and takes tokens from it atomically, on the clock of Redis, so that workers with
+skewed clocks still agree on the rate. A chunk of calls takes a token per call.
+
+To keep Redis off the path of every call, each grunt worker takes the tokens in batches and spends
+them locally. A batch holds as many tokens as the calls of the task needed in the last tenth of a
+second, up to a tenth of a second's worth, so that a lone call only takes its own token. The ones
+a worker hasn't spent within a tenth of a second are returned to the bucket on its next batch,
+so that tokens held by idle workers don't pile up above the limit, nor are they wasted.
+
+When the bucket is empty, the call is not executed, and the worker doesn't wait for a token either.
+The call reserves the next tokens, putting the bucket into debt, and is deferred via the scheduler
+until they're due, see `Task.with_eta`. The calls deferred this way are spread over the next tokens
+rather than all retrying at once, and the worker moves on to its other tasks meanwhile.
+"""
+
+import functools
+import math
+import re
+import time
+import typing as t
+
+from .config import Config
+from .constants import Constants
+from .exceptions import InvalidArgument
+from .pubsub import RedisConnectionPools
+
+if t.TYPE_CHECKING:
+    from .task import Task
+
+_RATE_LIMIT_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*([smh])\s*$")
+
+_PERIODS_S: dict[str, int] = {"s": 1, "m": 60, "h": 3600}
+
+# How long the tokens taken in a batch last, in seconds, which sizes the batches
+_BATCH_WINDOW_S = 0.1
+
+# Refill the bucket along with the tokens returned, then take the tokens needed and up to a batch
+# if there are enough of them, or reserve the tokens needed otherwise, and return the number of
+# tokens taken and how many milliseconds until the reserved ones are due
+# KEYS: bucket key
+# ARGV: rate in tokens per second, capacity, tokens needed, batch size, tokens returned
+_ACQUIRE_SCRIPT = """
+local rate, capacity = tonumber(ARGV[1]), tonumber(ARGV[2])
+local needed, batch = tonumber(ARGV[3]), tonumber(ARGV[4])
+local returned = tonumber(ARGV[5])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate + returned)
+local taken, wait_ms = 0, 0
+if tokens >= needed then
+    taken = math.min(batch, math.floor(tokens))
+    tokens = tokens - taken
+else
+    tokens = tokens - needed
+    wait_ms = math.ceil(-tokens / rate * 1000)
+end
+redis.call(
+    "HSET", KEYS[1],
+    "tokens", string.format("%.17g", tokens),
+    "updated_at", string.format("%.17g", now)
+)
+-- A full bucket is the same as no bucket
+redis.call("PEXPIRE", KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {taken, wait_ms}
+"""
+
+
+def validate_rate_limit(rate_limit: str) -> str:
+    """Return the rate limit if it's valid, or raise `InvalidArgument`."""
+    parse_rate_limit(rate_limit)
+    return rate_limit
+
+
+@functools.lru_cache(maxsize=256)
+def parse_rate_limit(rate_limit: str) -> tuple[float, int]:
+    """
+    Return the rate in calls per second and the burst, i.e. the max number of calls at once, of a
+    rate limit given as "<calls>/<s|m|h>", e.g. "100/s" or "30/m".
+    """
+    match = _RATE_LIMIT_PATTERN.match(rate_limit) if isinstance(rate_limit, str) else None
+    if match is None or int(match.group(1)) < 1:
+        raise InvalidArgument(
+            f'Rate limit should be a positive number of calls per "s", "m" or "h", '
+            f'e.g. "100/s", got "{rate_limit}"'
+        )
+    calls, period = int(match.group(1)), match.group(2)
+    return calls / _PERIODS_S[period], calls
+
+
+class RateLimiter:
+    """Take the tokens of the rate limits of tasks, in batches, for the current process."""
+
+    # The number of tokens taken but not spent yet per task name, and until when they last
+    _tokens: dict[str, tuple[int, float]] = {}
+    # The number of tokens not spent in time per task name, returned to the bucket on next batch
+    _unspent: dict[str, int] = {}
+    # The start of the current window, and the tokens needed in it and in the previous one, per
+    # task name
+    _demand: dict[str, tuple[float, int, int]] = {}
+
+    @classmethod
+    async def acquire(cls, task: "Task") -> float:
+        """
+        Take the tokens needed to execute the task now and return 0, or reserve them and return
+        the number of seconds until they're due, which the task should be deferred by.
+        """
+        assert task.rate_limit is not None
+        needed: int = len(task.args or ()) if task.chunked else 1
+        demand: int = cls._count_demand(task.name, needed)
+        cls._expire(task.name)
+        tokens, expires_at = cls._tokens.get(task.name, (0, 0.0))
+        if tokens >= needed:
+            cls._tokens[task.name] = (tokens - needed, expires_at)
+            return 0.0
+
+        rate, capacity = parse_rate_limit(task.rate_limit)
+        batch: int = max(needed, min(capacity, math.ceil(rate * _BATCH_WINDOW_S), demand))
+        returned: int = cls._unspent.pop(task.name, 0)
+        client = RedisConnectionPools.get_client(url=Config.rate_limit_url())
+        taken, wait_ms = await client.register_script(_ACQUIRE_SCRIPT)(
+            keys=[Constants.rate_limit_key_template().format(task_name=task.name)],
+            args=[rate, capacity, needed, batch, returned],
+        )
+        if not taken:
+            return wait_ms / 1000
+
+        # Other calls may have taken tokens meanwhile
+        cls._expire(task.name)
+        tokens, _ = cls._tokens.get(task.name, (0, 0.0))
+        cls._tokens[task.name] = (tokens + taken - needed, time.monotonic() + _BATCH_WINDOW_S)
+        return 0.0
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop the tokens taken but not spent yet."""
+        cls._tokens = {}
+        cls._unspent = {}
+        cls._demand = {}
+
+    @classmethod
+    def _count_demand(cls, task_name: str, needed: int) -> int:
+        """Count the tokens needed by a call, and return how many are needed about per window."""
+        now: float = time.monotonic()
+        started_at, current, previous = cls._demand.get(task_name, (now, 0, 0))
+        if now - started_at >= _BATCH_WINDOW_S:
+            previous = current if now - started_at < 2 * _BATCH_WINDOW_S else 0
+            started_at, current = now, 0
+        current += needed
+        cls._demand[task_name] = (started_at, current, previous)
+        return max(current, previous)
+
+    @classmethod
+    def _expire(cls, task_name: str) -> None:
+        """Set the tokens not spent in time aside, to return them to the bucket on next batch."""
+        tokens, expires_at = cls._tokens.get(task_name, (0, 0.0))
+        if tokens and time.monotonic() >= expires_at:
+            cls._unspent[task_name] = cls._unspent.get(task_name, 0) + tokens
+            cls._tokens[task_name] = (0, 0.0)
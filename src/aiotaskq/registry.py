@@ -0,0 +1,105 @@
+"""
+Define the registry of all tasks known to the current process.
+
+Every task defined with the `task()` decorator registers itself here when its module is imported.
+A worker freezes the registry once its app is imported, so that each incoming task is resolved
+with a single dict lookup, and a task that is not part of the app is rejected instead of
+importing arbitrary modules.
+
+Each task also gets a compact code, hashed from its name, which is sent on the wire in place of
+its full name. Since the code only depends on the name, clients and workers agree on it without
+any coordination. A task falls back to its full name if its code collides with another task's.
+The code is 64-bit, so that a task unknown to a worker is rejected rather than resolved to
+another task whose code happens to be the same, a collision only detected within one process.
+"""
+
+import hashlib
+import importlib
+import typing as t
+
+from .exceptions import TaskNotRegistered
+
+if t.TYPE_CHECKING:
+    from .task import Task
+
+
+def get_task_code(name: str) -> str:
+    """Return the compact code of the task with the given name."""
+    return hashlib.blake2b(name.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class TaskRegistry:
+    """Map the name of each task, i.e. "<module>.<qualname>", and its code to the task itself."""
+
+    _tasks: dict[str, "Task"] = {}
+    _tasks_by_code: dict[str, "Task"] = {}
+    _ambiguous_codes: set[str] = set()
+    _frozen: bool = False
+
+    @classmethod
+    def register(cls, task: "Task") -> None:
+        """Register the task under its name and code."""
+        cls._tasks[task.name] = task
+        code = get_task_code(task.name)
+        existing: t.Optional["Task"] = cls._tasks_by_code.get(code)
+        if existing is not None and existing.name != task.name:
+            # Both tasks will be sent with their full names
+            cls._ambiguous_codes.add(code)
+        cls._tasks_by_code[code] = task
+
+    @classmethod
+    def freeze(cls) -> None:
+        """
+        Stop resolving tasks that are not registered yet.
+
+        Meant to be called once by a worker, after importing its app.
+        """
+        cls._frozen = True
+
+    @classmethod
+    def get(cls, module_path: str, qualname: str) -> "Task":
+        """
+        Return the task given the module it's defined in and its qualname.
+
+        Once the registry is frozen, raise `TaskNotRegistered` if the task is not registered.
+        Otherwise, e.g. in a client process, import the task and register it.
+        """
+        name = f"{module_path}.{qualname}"
+        task: t.Optional["Task"] = cls._tasks.get(name)
+        if task is not None:
+            return task
+        if cls._frozen:
+            raise TaskNotRegistered(f'Task "{name}" is not registered in the worker app.')
+        task = getattr(importlib.import_module(module_path), qualname)
+        cls.register(task)
+        return task
+
+    @classmethod
+    def get_by_code(cls, code: str) -> "Task":
+        """Return the task given its code, or raise `TaskNotRegistered` if it's unknown."""
+        task: t.Optional["Task"] = cls._tasks_by_code.get(code)
+        if task is None or code in cls._ambiguous_codes:
+            raise TaskNotRegistered(f'Task with code "{code}" is not registered.')
+        return task
+
+    @classmethod
+    def get_code(cls, task: "Task") -> t.Optional[str]:
+        """Return the code to send on the wire for the task, or None to send its full name."""
+        code = get_task_code(task.name)
+        registered: t.Optional["Task"] = cls._tasks.get(task.name)
+        if registered is None or code in cls._ambiguous_codes:
+            return None
+        return code
+
+    @classmethod
+    def all(cls) -> list["Task"]:
+        """Return all the registered tasks."""
+        return list(cls._tasks.values())
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget all registered tasks."""
+        cls._tasks = {}
+        cls._tasks_by_code = {}
+        cls._ambiguous_codes = set()
+        cls._frozen = False
@@ -0,0 +1,175 @@
+"""
+Define the result backend, which stores the results of tasks for them to be fetched later.
+
+Unlike results published on the reply channel of a client, a stored result survives the client
+disconnecting or restarting, and can be fetched any number of times until it expires.
+
+Each result is stored in its own Redis list holding a single element, so that a client can wait
+for it with a blocking BRPOPLPUSH from and to the same list, which leaves the result in place.
+"""
+
+import asyncio
+import typing as t
+
+from .config import Config
+from .constants import Constants
+from .exceptions import ResultBackendNotConfigured, UrlNotSupported
+from .pubsub import RedisConnectionPools
+
+if t.TYPE_CHECKING:
+    from .task import AsyncResult
+
+RT = t.TypeVar("RT")
+
+# Store the result, and remove the oldest results if there are too many of them
+# KEYS: result key, index key
+# ARGV: result, ttl in seconds, max number of results, task id, result key prefix
+_STORE_SCRIPT = """
+redis.call("DEL", KEYS[1])
+redis.call("RPUSH", KEYS[1], ARGV[1])
+redis.call("EXPIRE", KEYS[1], ARGV[2])
+redis.call("LPUSH", KEYS[2], ARGV[4])
+redis.call("EXPIRE", KEYS[2], ARGV[2])
+while redis.call("LLEN", KEYS[2]) > tonumber(ARGV[3]) do
+    redis.call("DEL", ARGV[5] .. redis.call("RPOP", KEYS[2]))
+end
+"""
+
+
+class ResultBackend:
+    """Expose the result backend configured via env var AIOTASKQ_RESULT_BACKEND_URL."""
+
+    @classmethod
+    def get(cls) -> "RedisResultBackend":
+        """Return the result backend, or raise an error if none is configured."""
+        url: t.Optional[str] = Config.result_backend_url()
+        if url is None:
+            raise ResultBackendNotConfigured(
+                "Env var AIOTASKQ_RESULT_BACKEND_URL is required to store results."
+            )
+        if not url.startswith("redis"):
+            raise UrlNotSupported(f'Url "{url}" is currently not supported.')
+        return RedisResultBackend(url=url)
+
+
+class RedisResultBackend:
+    """Store results in Redis, each in its own list expiring after its ttl."""
+
+    def __init__(self, url: str) -> None:
+        self._url = url
+
+    async def store(self, task_id: str, message: bytes) -> None:
+        """Store the serialized result of the given task."""
+        client = RedisConnectionPools.get_client(url=self._url)
+        await client.register_script(_STORE_SCRIPT)(
+            keys=[self._get_key(task_id), Constants.result_index_key()],
+            args=[
+                message,
+                Config.result_ttl_s(),
+                Config.result_backend_max_size(),
+                task_id,
+                Constants.result_key_prefix(),
+            ],
+        )
+
+    async def fetch(self, task_id: str) -> t.Optional[bytes]:
+        """Return the serialized result of the given task, or None if it's not stored (yet)."""
+        client = RedisConnectionPools.get_client(url=self._url)
+        return await client.lindex(self._get_key(task_id), -1)
+
+    async def fetch_many(self, task_ids: t.Sequence[str]) -> list[t.Optional[bytes]]:
+        """Return the serialized results of the given tasks in one round-trip, like `fetch`."""
+        client = RedisConnectionPools.get_client(url=self._url)
+        async with client.pipeline(transaction=False) as pipeline:
+            for task_id in task_ids:
+                pipeline.lindex(self._get_key(task_id), -1)
+            return await pipeline.execute()
+
+    async def wait(self, task_id: str, timeout: t.Optional[float]) -> t.Optional[bytes]:
+        """
+        Wait until the result of the given task is stored, and return it.
+
+        Return None if it's still not stored after `timeout` seconds.
+        """
+        key = self._get_key(task_id)
+        # Waiting clients hold a connection each for as long as they wait, e.g. up to the timeout
+        # of single-flight followers, so they must not hold the ones of the broker
+        client = RedisConnectionPools.get_client(url=self._url, blocking=True, pool="results")
+        # Pop the result and push it straight back, so that it can be fetched again
+        return await client.brpoplpush(key, key, timeout=timeout or 0)
+
+    @staticmethod
+    def _get_key(task_id: str) -> str:
+        return f"{Constants.result_key_prefix()}{task_id}"
+
+
+class AsyncResultHandle(t.Generic[RT]):
+    """
+    Define the handle to the stored result of a task, as returned by `Task.send`.
+
+    Example:
+    ```python
+    handle = await some_task.send(1, 2)
+    ...
+    if await handle.ready():
+        result = await handle.get()
+    # Or wait for it
+    result = await handle.get(timeout=10)
+    ```
+    """
+
+    task_id: str
+
+    def __init__(self, task_id: str) -> None:
+        """Store the id of the task whose result is handled."""
+        self.task_id = task_id
+
+    async def ready(self) -> bool:
+        """Return whether the task is done and its result available."""
+        return await ResultBackend.get().fetch(self.task_id) is not None
+
+    async def get(self, timeout: t.Optional[float] = None) -> RT:
+        """
+        Wait for the task to be done, and return its result or raise its error.
+
+        Raise `asyncio.TimeoutError` if the task is not done after `timeout` seconds.
+        """
+        message: t.Optional[bytes] = await ResultBackend.get().wait(self.task_id, timeout)
+        if message is None:
+            raise asyncio.TimeoutError(f"Result of task {self.task_id} is not ready yet.")
+        return self._get_result(message)
+
+    @classmethod
+    async def get_many(
+        cls, handles: t.Sequence["AsyncResultHandle[RT]"], timeout: t.Optional[float] = None
+    ) -> list[RT]:
+        """
+        Wait for all the tasks to be done, and return their results in order.
+
+        Raise the first error, or `asyncio.TimeoutError` if the tasks are not all done after
+        `timeout` seconds.
+        """
+        backend = ResultBackend.get()
+        loop = asyncio.get_running_loop()
+        deadline: t.Optional[float] = None if timeout is None else loop.time() + timeout
+        # Fetch the results that are already available in one go, then wait for the others
+        messages = await backend.fetch_many([handle.task_id for handle in handles])
+        results: list[RT] = []
+        for handle, message in zip(handles, messages):
+            if message is None:
+                remaining_s = None if deadline is None else max(deadline - loop.time(), 0.01)
+                message = await backend.wait(handle.task_id, remaining_s)
+            if message is None:
+                raise asyncio.TimeoutError(f"Result of task {handle.task_id} is not ready yet.")
+            results.append(handle._get_result(message))  # pylint: disable=protected-access
+        return results
+
+    def _get_result(self, message: bytes) -> RT:
+        # pylint: disable=import-outside-toplevel
+        from .serde import Serialization
+        from .task import AsyncResult as AsyncResultClass
+
+        async_result: AsyncResult[RT] = Serialization.deserialize(AsyncResultClass, message)
+        if async_result.error is not None:
+            raise async_result.error
+        return t.cast(RT, async_result.result)
@@ -0,0 +1,232 @@
+"""
+Define the named queues tasks are published to, and the routing of tasks to them.
+
+Each queue has its own channels, so that workers only receive the tasks of the queues they
+consume, e.g. `aiotaskq worker app --queues cpu:4,default` on the boxes dedicated to heavy CPU
+tasks. The queue of a task is, in order of precedence:
+
+* its `queue` option, or the queue given via `Task.with_queue`,
+* the first routing rule matching its name, added via `Router.add_route`,
+* the first routing rule matching its name, given via env var AIOTASKQ_ROUTES,
+* the default queue.
+
+A worker keeps the tasks it receives in a buffer per queue, and passes them to its grunt workers
+from each queue with room for more in turn. A queue has room for more while it has less tasks
+outstanding, i.e. passed to a grunt worker and not done yet, than its concurrency limit, if any.
+Priorities apply within each queue.
+"""
+
+import asyncio
+import collections
+import fnmatch
+import functools
+import re
+import typing as t
+
+from .claim_check import ClaimCheck
+from .config import Config
+from .constants import Constants
+from .exceptions import InvalidArgument
+from .interfaces import IPubSub, PollResponse, PriorityMode
+from .priority import MAX_PRIORITY, MIN_PRIORITY, PriorityBuffer, get_priority_channel
+from .pubsub import PubSub
+
+if t.TYPE_CHECKING:
+    from .task import Task
+
+DEFAULT_QUEUE = "default"
+
+_QUEUE_NAME_PATTERN = re.compile(r"^[\w.-]+$")
+
+
+def validate_queue(queue: str) -> str:
+    """Return the name of the queue if it's valid, or raise `InvalidArgument`."""
+    if not isinstance(queue, str) or not _QUEUE_NAME_PATTERN.match(queue):
+        raise InvalidArgument(
+            f'Queue name should only have letters, digits, "_", "." or "-", got "{queue}"'
+        )
+    return queue
+
+
+def parse_queues(queues: str) -> dict[str, t.Optional[int]]:
+    """
+    Return the concurrency limit of each queue, by queue name, given as e.g. "cpu:4,default".
+
+    A queue without a limit is only limited by the capacity of the grunt workers.
+    """
+    limits: dict[str, t.Optional[int]] = {}
+    for item in queues.split(","):
+        name, _, limit = item.strip().partition(":")
+        try:
+            limits[validate_queue(name)] = int(limit) if limit else None
+        except ValueError as exc:
+            raise InvalidArgument(f'Queue concurrency should be an int, got "{item}"') from exc
+        if limits[name] is not None and limits[name] < 1:
+            raise InvalidArgument(f'Queue concurrency should be positive, got "{item}"')
+    return limits
+
+
+def get_queue_channel(queue: str, channel: t.Optional[str] = None) -> str:
+    """
+    Return the channel carrying the tasks of the queue among the tasks of the given channel, i.e.
+    the tasks channel by default.
+    """
+    channel = channel or Constants.tasks_channel()
+    return channel if queue == DEFAULT_QUEUE else f"{channel}:queue:{queue}"
+
+
+def get_task_channel(task: "Task") -> str:
+    """Return the channel to publish the task on, given its queue, which must be resolved."""
+    assert task.queue is not None
+    return get_priority_channel(get_queue_channel(task.queue), task.priority)
+
+
+async def publish_tasks(tasks: t.Iterable["Task"]) -> None:
+    """Publish the calls held by the tasks to the channels of their queues, in bulk."""
+    from .serde import Serialization  # pylint: disable=import-outside-toplevel
+
+    messages: dict[str, list[bytes]] = collections.defaultdict(list)
+    for task in tasks:
+        # The queue travels with the task, so that its retries are published to the same queue
+        task.queue = Router.get_queue(task)
+        serialized: bytes = Serialization.serialize(task, compression_type=task.compression)
+        message: bytes = await ClaimCheck.offload(serialized, envelope=task.envelope, eta=task.eta)
+        messages[get_task_channel(task)].append(message)
+
+    pubsub_ = PubSub.get(url=Config.broker_url(), poll_interval_s=Config.poll_interval_s())
+    async with pubsub_ as pubsub:  # pylint: disable=not-async-context-manager
+        for channel, channel_messages in messages.items():
+            await pubsub.publish_many(channel, messages=channel_messages)
+
+
+class Router:
+    """Route tasks to queues, according to their options and the routing rules."""
+
+    _routes: list[tuple[str, str]] = []
+
+    @classmethod
+    def add_route(cls, pattern: str, queue: str) -> None:
+        """
+        Route the tasks whose names, i.e. "<module>.<qualname>", match the glob pattern to the
+        queue, unless they have a `queue` option, e.g. `Router.add_route("app.reports.*", "cpu")`.
+        """
+        cls._routes.append((pattern, validate_queue(queue)))
+
+    @classmethod
+    def get_queue(cls, task: "Task") -> str:
+        """Return the queue to publish the task to."""
+        if task.queue is not None:
+            return task.queue
+        for pattern, queue in [*cls._routes, *_parse_routes(Config.routes())]:
+            if fnmatch.fnmatchcase(task.name, pattern):
+                return queue
+        return DEFAULT_QUEUE
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget the routing rules added so far."""
+        cls._routes = []
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_routes(routes: str) -> list[tuple[str, str]]:
+    parsed: list[tuple[str, str]] = []
+    for route in filter(None, (route.strip() for route in routes.split(","))):
+        pattern, separator, queue = route.rpartition("=")
+        if not separator or not pattern:
+            raise InvalidArgument(f'Route should be given as "<pattern>=<queue>", got "{route}"')
+        parsed.append((pattern, validate_queue(queue)))
+    return parsed
+
+
+class QueueBuffer:
+    """
+    Buffer the tasks received on the channels of each of the given queues, in a `PriorityBuffer`
+    per queue, and return them from each queue with room for more in turn.
+    """
+
+    def __init__(self, channel: str, queues: t.Sequence[str], mode: PriorityMode) -> None:
+        """Initialize an empty buffer for the queues of the given channel."""
+        self._buffers: list[PriorityBuffer[PollResponse]] = [
+            PriorityBuffer(channel=get_queue_channel(queue, channel=channel), mode=mode)
+            for queue in queues
+        ]
+        # The queue index and priority of each channel
+        self._channels: dict[bytes, tuple[int, int]] = {}
+        for index, queue in enumerate(queues):
+            for priority in range(MIN_PRIORITY, MAX_PRIORITY + 1):
+                queue_channel: str = get_queue_channel(queue, channel=channel)
+                self._channels[get_priority_channel(queue_channel, priority).encode()] = (
+                    index,
+                    priority,
+                )
+        self._received = asyncio.Event()
+        self._taken = asyncio.Event()
+        self._next_index = 0
+
+    def __len__(self) -> int:
+        """Return the number of messages buffered in all the queues."""
+        return sum(len(buffer) for buffer in self._buffers)
+
+    async def subscribe(self, pubsub: IPubSub, ack_late: bool = False) -> None:
+        """Subscribe to the channels of every priority of every queue, see `IPubSub.subscribe`."""
+        for buffer in self._buffers:
+            await buffer.subscribe(pubsub, ack_late=ack_late)
+
+    async def receive_forever(self, pubsub: IPubSub, max_size: t.Optional[int] = None) -> None:
+        """
+        Buffer the messages received on the subscribed channels, forever.
+
+        Stop polling while `max_size` messages are buffered, if given, so that the others are left
+        in the broker for the other subscribers, and are not lost if this one dies.
+        """
+        while True:
+            while max_size is not None and len(self) >= max_size:
+                self._taken.clear()
+                await self._taken.wait()
+            message = await pubsub.poll()
+            channel: bytes | str = message["channel"]
+            if isinstance(channel, str):
+                channel = channel.encode()
+            index, priority = self._channels[channel]
+            self._buffers[index].put(priority=priority, data=message)
+            self._received.set()
+
+    async def get(
+        self,
+        has_capacity: t.Callable[[int], bool] = lambda _: True,
+        released: t.Optional[t.Callable[[], t.Awaitable[None]]] = None,
+    ) -> tuple[int, int, PollResponse]:
+        """
+        Wait until a message is buffered in a queue with room for it, according to
+        `has_capacity(queue index)`, and return the queue index, priority and message as polled.
+
+        `released()` should wait until a queue may have room again, e.g.
+        `QueueLoads.wait_for_release`, if any queue may have none.
+        """
+        while True:
+            for offset in range(len(self._buffers)):
+                index: int = (self._next_index + offset) % len(self._buffers)
+                buffer: PriorityBuffer[PollResponse] = self._buffers[index]
+                if len(buffer) > 0 and has_capacity(index):
+                    # Serve the next queue first next time
+                    self._next_index = index + 1
+                    priority, data = await buffer.get()
+                    self._taken.set()
+                    return index, priority, data
+            self._received.clear()
+            if released is not None and any(len(buffer) > 0 for buffer in self._buffers):
+                # Wait for a queue with messages to have room for them, or for messages of others
+                waiters = [
+                    asyncio.ensure_future(released()),
+                    asyncio.ensure_future(self._received.wait()),
+                ]
+                try:
+                    await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for waiter in waiters:
+                        waiter.cancel()
+                    # Let the waiters clean up before waiting again
+                    await asyncio.gather(*waiters, return_exceptions=True)
+            else:
+                await self._received.wait()
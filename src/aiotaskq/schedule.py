@@ -0,0 +1,160 @@
+"""
+Define the schedules of periodic tasks, which are applied by `aiotaskq beat`.
+
+A task is scheduled via its `schedule` option, either every `every_s` seconds or per a cron
+expression, e.g.:
+
+```python
+@aiotaskq.task(options={"schedule": {"every_s": 60}})
+def refresh_rates() -> None:
+    ...
+
+
+@aiotaskq.task(options={"schedule": {"cron": "30 8 * * 1-5", "kwargs": {"team": "ops"}}})
+def send_digest(team: str) -> None:
+    ...
+```
+
+Both kinds of schedules are absolute: the times a task is due at only depend on its schedule,
+not on when it was last applied, so they don't drift and every beat process agrees on them.
+Intervals are aligned on the UNIX epoch, and cron expressions are evaluated in UTC.
+"""
+
+import datetime
+import typing as t
+
+from .exceptions import InvalidScheduleOptions
+from .interfaces import ScheduleOptions
+
+_CRON_MACROS: dict[str, str] = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# The range of values of each field of a cron expression, where 7 is Sunday like 0
+_CRON_FIELDS: list[tuple[str, int, int]] = [
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 7),
+]
+
+# Give up looking for the next time a cron expression matches after that many years, e.g. for
+# "0 0 30 2 *" which never does
+_CRON_MAX_YEARS = 10
+
+
+class IntervalSchedule:
+    """Schedule a task every `every_s` seconds, at the multiples of `every_s` since the epoch."""
+
+    def __init__(self, every_s: float) -> None:
+        """Store the interval, raising `InvalidScheduleOptions` if it's not positive."""
+        if isinstance(every_s, bool) or not isinstance(every_s, (int, float)) or every_s <= 0:
+            raise InvalidScheduleOptions(f"every_s should be a positive number, got {every_s}")
+        self.every_s = every_s
+
+    def get_next(self, after: float) -> float:
+        """Return the first time the task is due at, strictly after the UNIX timestamp `after`."""
+        return (after // self.every_s + 1) * self.every_s
+
+
+class CronSchedule:
+    """
+    Schedule a task per a cron expression, evaluated in UTC.
+
+    Supports the five standard fields with `*`, values, ranges `a-b`, steps `*/n` or `a-b/n`,
+    lists of those separated by commas, and the macros like `@hourly` or `@daily`. Like cron, a
+    time matches if either the day of month or the day of week matches when both are restricted.
+    """
+
+    def __init__(self, expression: str) -> None:
+        """Parse the expression, raising `InvalidScheduleOptions` if it's invalid."""
+        if not isinstance(expression, str):
+            raise InvalidScheduleOptions(f"cron should be a string, got {expression}")
+        self.expression = expression
+        fields: list[str] = _CRON_MACROS.get(expression.strip(), expression).split()
+        if len(fields) != len(_CRON_FIELDS):
+            raise InvalidScheduleOptions(
+                f'cron should have {len(_CRON_FIELDS)} fields, got "{expression}"'
+            )
+        values: list[set[int]] = [
+            _parse_cron_field(field, *spec) for field, spec in zip(fields, _CRON_FIELDS)
+        ]
+        self.minutes, self.hours, self.days, self.months, days_of_week = values
+        # Sunday is either 0 or 7
+        self.days_of_week: set[int] = {day % 7 for day in days_of_week}
+        self._any_day: bool = fields[2] == "*"
+        self._any_day_of_week: bool = fields[4] == "*"
+        # Fail early, at task definition, if the expression never matches
+        self.get_next(0)
+
+    def get_next(self, after: float) -> float:
+        """Return the first time the task is due at, strictly after the UNIX timestamp `after`."""
+        time_ = datetime.datetime.fromtimestamp(after, tz=datetime.timezone.utc)
+        time_ = time_.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        max_year: int = time_.year + _CRON_MAX_YEARS
+        while time_.year <= max_year:
+            if time_.month not in self.months:
+                year, month = divmod(time_.month, 12)
+                time_ = time_.replace(
+                    year=time_.year + year, month=month + 1, day=1, hour=0, minute=0
+                )
+            elif not self._matches_day(time_):
+                time_ = time_.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif time_.hour not in self.hours:
+                time_ = time_.replace(minute=0) + datetime.timedelta(hours=1)
+            elif time_.minute not in self.minutes:
+                time_ += datetime.timedelta(minutes=1)
+            else:
+                return time_.timestamp()
+        raise InvalidScheduleOptions(f'cron "{self.expression}" never matches')
+
+    def _matches_day(self, time_: datetime.datetime) -> bool:
+        day_matches: bool = time_.day in self.days
+        # Python counts the days of the week from Monday, cron from Sunday
+        day_of_week_matches: bool = (time_.weekday() + 1) % 7 in self.days_of_week
+        if self._any_day or self._any_day_of_week:
+            return day_matches and day_of_week_matches
+        return day_matches or day_of_week_matches
+
+
+def get_schedule(options: ScheduleOptions) -> IntervalSchedule | CronSchedule:
+    """Return the schedule defined by the options, raising `InvalidScheduleOptions` if invalid."""
+    if ("every_s" in options) == ("cron" in options):
+        raise InvalidScheduleOptions("A schedule should have either every_s or cron")
+    if "every_s" in options:
+        return IntervalSchedule(options["every_s"])
+    return CronSchedule(options["cron"])
+
+
+def get_schedule_arguments(options: ScheduleOptions) -> tuple[tuple[t.Any, ...], dict[str, t.Any]]:
+    """Return the positional and keyword arguments the task is applied with on schedule."""
+    return tuple(options.get("args", ())), dict(options.get("kwargs", {}))
+
+
+def _parse_cron_field(field: str, name: str, minimum: int, maximum: int) -> set[int]:
+    values: set[int] = set()
+    for part in field.split(","):
+        range_, _, step = part.partition("/")
+        try:
+            if range_ == "*":
+                start, end = minimum, maximum
+            elif "-" in range_:
+                start, end = (int(value) for value in range_.split("-", 1))
+            else:
+                start = int(range_)
+                # "a/n" means from a to the maximum
+                end = maximum if step else start
+            step_: int = int(step) if step else 1
+        except ValueError as exc:
+            raise InvalidScheduleOptions(f'Invalid cron {name} "{field}"') from exc
+        if not minimum <= start <= end <= maximum or step_ < 1:
+            raise InvalidScheduleOptions(f'Invalid cron {name} "{field}"')
+        values.update(range(start, end + 1, step_))
+    return values
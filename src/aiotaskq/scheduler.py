@@ -0,0 +1,109 @@
+"""
+Define the scheduling of tasks to be executed later, see `Task.with_countdown` and `Task.with_eta`.
+
+A delayed task is not published right away, but added to a Redis sorted set per tasks channel,
+scored by the time it's due at. Each worker manager runs a promoter, which regularly claims the
+tasks that are due in batches with a Lua script, and publishes them to their channel in bulk.
+
+Claiming M tasks due among N scheduled takes O(log(N) + M), so it doesn't depend on the number of
+tasks scheduled later, and is atomic, so that each task is promoted by a single worker manager
+even when many of them are running.
+"""
+
+import asyncio
+import logging
+import time
+import typing as t
+
+from .config import Config
+from .constants import Constants
+from .priority import MAX_PRIORITY, MIN_PRIORITY, get_priority_channel
+from .pubsub import PubSub, RedisConnectionPools
+from .routing import DEFAULT_QUEUE, get_queue_channel
+
+# The maximum number of tasks claimed per channel at once
+_BATCH_SIZE = 1000
+
+# The maximum time between two attempts to promote tasks while the schedule store is unreachable
+_MAX_BACKOFF_S = 30.0
+
+# Claim the tasks due on each channel, up to a batch per channel
+# KEYS: the schedule key of each channel
+# ARGV: current time, batch size
+_CLAIM_SCRIPT = """
+local claimed = {}
+for i, key in ipairs(KEYS) do
+    local due = redis.call("ZRANGEBYSCORE", key, "-inf", ARGV[1], "LIMIT", 0, ARGV[2])
+    if #due > 0 then
+        redis.call("ZREM", key, unpack(due))
+    end
+    claimed[i] = due
+end
+return claimed
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Expose the scheduling of delayed tasks, and their promotion once due."""
+
+    @classmethod
+    async def schedule(cls, channel: str, messages: list[bytes], eta: float) -> None:
+        """Schedule the tasks serialized in `messages` to be published on `channel` at `eta`."""
+        client = RedisConnectionPools.get_client(url=Config.schedule_url())
+        key: str = Constants.schedule_key_template().format(channel=channel)
+        await client.zadd(key, {message: eta for message in messages})
+
+    @classmethod
+    async def promote(cls, queues: t.Sequence[str] = (DEFAULT_QUEUE,)) -> int:
+        """
+        Publish the tasks of the given queues that are due, up to a batch per channel, and return
+        their number.
+        """
+        channels: list[str] = [
+            get_priority_channel(get_queue_channel(queue), priority)
+            for queue in queues
+            for priority in range(MIN_PRIORITY, MAX_PRIORITY + 1)
+        ]
+        client = RedisConnectionPools.get_client(url=Config.schedule_url())
+        claimed: list[list[bytes]] = await client.register_script(_CLAIM_SCRIPT)(
+            keys=[Constants.schedule_key_template().format(channel=c) for c in channels],
+            args=[time.time(), _BATCH_SIZE],
+        )
+        if not any(claimed):
+            return 0
+        pubsub_ = PubSub.get(url=Config.broker_url(), poll_interval_s=Config.poll_interval_s())
+        async with pubsub_ as pubsub:  # pylint: disable=not-async-context-manager
+            for channel, messages in zip(channels, claimed):
+                if messages:
+                    logger.debug("Promoting %s due tasks [channel=%s]", len(messages), channel)
+                    await pubsub.publish_many(channel, messages=messages)
+        return sum(len(messages) for messages in claimed)
+
+    @classmethod
+    async def promote_forever(cls, queues: t.Sequence[str] = (DEFAULT_QUEUE,)) -> None:
+        """
+        Publish the tasks of the given queues as they become due, forever.
+
+        While the schedule store is unreachable, e.g. while Redis restarts, the attempts are backed
+        off exponentially up to `_MAX_BACKOFF_S`.
+        """
+        failures: int = 0
+        while True:
+            try:
+                promoted: int = await cls.promote(queues)
+            except Exception:  # pylint: disable=broad-except
+                # Keep promoting once Redis is reachable again, the tasks are still scheduled
+                if failures == 0:
+                    logger.exception("Failed to promote due tasks, backing off")
+                failures += 1
+                backoff_s: float = Config.schedule_poll_interval_s() * 2**failures
+                await asyncio.sleep(min(backoff_s, _MAX_BACKOFF_S))
+                continue
+            if failures:
+                logger.info("Promoting due tasks again after %s failed attempts", failures)
+                failures = 0
+            # Claim the next batch right away if there may be more tasks due
+            if promoted < _BATCH_SIZE:
+                await asyncio.sleep(Config.schedule_poll_interval_s())
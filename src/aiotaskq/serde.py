@@ -1,47 +1,211 @@
 """
 Define serialization and deserialization utilities.
+
+Every serialized message starts with a header naming its serialization type, e.g. `json|...`,
+`pickle|...` or `msgpack|...`. Messages are serialized with the type configured via env var
+AIOTASKQ_SERIALIZATION, but deserialized with the type named in their header, provided it's one of
+the types accepted via env var AIOTASKQ_ACCEPT_SERIALIZATION, since unpickling a message can run
+arbitrary code. Both env vars are read once per process, on first use.
 """
 
-import importlib
+import functools
 import json
+import os
+import pickle
+import struct
 import types
 import typing as t
 
 import jsonpickle
 
+from .compression import Compression
 from .config import Config
-from .interfaces import ISerialization, SerializationType, T
+from .exceptions import SerializationTypeNotSupported
+from .interfaces import (
+    CacheOptions,
+    CompressionType,
+    ISerialization,
+    SerializationType,
+    T,
+    TaskEnvelope,
+    WorkflowState,
+)
+from .registry import TaskRegistry
 from .task import AsyncResult, Task
 
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
 
 class Serialization(t.Generic[T]):
-    """Expose the JSON serialization and deserialization logic for any object behined a simple abstraction."""
+    """Expose the serialization and deserialization logic for any object behind a simple abstraction."""
+
+    # The configured serialization types, read once per process on first use
+    _pid: t.Optional[int] = None
+    _serialization_type: SerializationType = SerializationType.DEFAULT
+    _accepted_serialization_types: set[SerializationType] = set()
 
     @classmethod
-    def serialize(cls, obj: "T") -> bytes:
-        """Serialize an object of type T into bytes via an appropriate serialization logic."""
-        s_klass = _get_serde_class(obj.__class__)
-        return s_klass.serialize(obj)
+    def serialize(cls, obj: "T", compression_type: t.Optional[CompressionType] = None) -> bytes:
+        """
+        Serialize an object of type T into bytes via an appropriate serialization logic.
+
+        The result is compressed if it's big enough, see `aiotaskq.compression`.
+        """
+        s_klass = _get_serde_class(obj.__class__, cls._get_serialization_type())
+        return Compression.compress_message(s_klass.serialize(obj), compression_type)
 
     @classmethod
     def deserialize(cls, klass: type["T"], s: bytes) -> "T":
-        """Deserialize bytes into an object of type T via an appropriate deserialization logic."""
-        s_klass = _get_serde_class(klass)
+        """
+        Deserialize bytes into an object of type T via an appropriate deserialization logic.
+
+        Raise `SerializationTypeNotSupported` if the serialization type in the header of the
+        message is not accepted, see `Config.accepted_serialization_types`.
+        """
+        s = Compression.decompress_message(s)
+        s_klass = _get_serde_class(klass, cls._get_accepted_serialization_type(s))
         return s_klass.deserialize(klass, s)
 
+    @classmethod
+    def get_envelope(cls, s: bytes) -> t.Optional[TaskEnvelope]:
+        """
+        Return the envelope of a serialized task without resolving the task itself, e.g. to report
+        to its caller that it's not registered, or None if even the envelope can't be decoded.
+        """
+        try:
+            s = Compression.decompress_message(s)
+            serialization_type: SerializationType = cls._get_accepted_serialization_type(s)
+            if serialization_type == SerializationType.PICKLE:
+                d_obj: dict[str, t.Any] = _pickle_loads(s)
+                options: dict[str, t.Any] = d_obj
+            else:
+                body = memoryview(s)[s.index(b"|") + 1 :]
+                d_obj = (
+                    json.loads(bytes(body))
+                    if serialization_type == SerializationType.JSON
+                    else _get_msgpack().unpackb(body, raw=False)
+                )
+                options = d_obj["options"]
+            # Same as `Task.envelope`
+            workflow: t.Optional[WorkflowState] = options.get("workflow")
+            return {
+                "task_id": d_obj["task_id"] if workflow is None else workflow["id"],
+                "reply_to": d_obj.get("reply_to"),
+                "store_result": bool(options.get("store_result", False)),
+            }
+        except Exception:  # pylint: disable=broad-except
+            return None
 
-def _get_serde_class(klass: type["T"]) -> type[ISerialization["T"]]:
+    @classmethod
+    def get_result_task_id(cls, s: bytes) -> t.Optional[str]:
+        """
+        Return the task id of a serialized AsyncResult which can't be deserialized, e.g. to fail
+        only the caller waiting for it, or None if even the task id can't be decoded.
+
+        Pickled results are never unpickled here, since they may not be accepted.
+        """
+        try:
+            s = Compression.decompress_message(s)
+            header, _, _ = s.partition(b"|")
+            body = memoryview(s)[len(header) + 1 :]
+            if header == SerializationType.JSON.value.encode("utf-8"):
+                d_obj: dict[str, t.Any] = json.loads(bytes(body))
+            elif header == SerializationType.MSGPACK.value.encode("utf-8"):
+                d_obj = _get_msgpack().unpackb(body, raw=False)
+            else:
+                return None
+            task_id: str = d_obj["task_id"]
+            return task_id
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget the configured serialization types, so that they're read again on next use."""
+        cls._pid = None
+
+    @classmethod
+    def _load_config(cls) -> None:
+        if cls._pid != os.getpid():
+            # Also read again after a fork, e.g. in a worker process configured otherwise
+            cls._pid = os.getpid()
+            cls._serialization_type = Config.serialization_type()
+            cls._accepted_serialization_types = Config.accepted_serialization_types()
+
+    @classmethod
+    def _get_serialization_type(cls) -> SerializationType:
+        cls._load_config()
+        return cls._serialization_type
+
+    @classmethod
+    def _get_accepted_serialization_type(cls, s: bytes) -> SerializationType:
+        """
+        Return the serialization type in the header of the message, or raise
+        `SerializationTypeNotSupported` if it's not accepted, see
+        `Config.accepted_serialization_types`.
+        """
+        header: bytes = s.partition(b"|")[0]
+        try:
+            serialization_type = SerializationType(header.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError) as exc:
+            raise SerializationTypeNotSupported(f"Unknown serialization type {header!r}") from exc
+        cls._load_config()
+        if serialization_type not in cls._accepted_serialization_types:
+            raise SerializationTypeNotSupported(
+                f'Serialization type "{serialization_type.value}" is not accepted, see env var '
+                "AIOTASKQ_ACCEPT_SERIALIZATION"
+            )
+        return serialization_type
+
+
+def _get_serde_class(
+    klass: type["T"], serialization_type: SerializationType
+) -> type[ISerialization["T"]]:
     """Get the Serializer-Deserializer class that implements `serialize` and `deserialize`."""
-    map_ = {
-        (Task, SerializationType.JSON): JsonTaskSerialization,
-        (AsyncResult, SerializationType.JSON): JsonAsyncResultSerialization,
-    }
-    if (klass, Config.serialization_type()) not in map_:
+    if (klass, serialization_type) not in _SERDE_CLASSES:
         assert False, "Should not reach here"  # pragma: no cover
-    return map_[klass, Config.serialization_type()]
+    return _SERDE_CLASSES[klass, serialization_type]
+
+
+# The same few retry options are encoded and decoded over and over again
+_encode_retry_on: t.Callable[[tuple[type[Exception], ...]], str] = functools.lru_cache(
+    jsonpickle.encode
+)
+_decode_retry_on: t.Callable[[str], tuple[type[Exception], ...]] = functools.lru_cache(
+    jsonpickle.decode
+)
+
 
+class TaskFuncDict(t.TypedDict):
+    """Define the structure of the full name of a task, sent when it has no compact code."""
 
-class JsonTaskSerialization(Serialization):
+    module: str
+    qualname: str
+
+
+def _get_task_ref(obj: "Task") -> str | TaskFuncDict:
+    """Return the reference to the task sent on the wire: its compact code, or its full name."""
+    code: t.Optional[str] = TaskRegistry.get_code(obj) if Config.compact_task_names() else None
+    if code is not None:
+        return code
+    return {"module": obj.__module__, "qualname": obj.__qualname__}
+
+
+def _get_task_func(ref: str | TaskFuncDict) -> types.FunctionType:
+    """Return the underlying function of the task given the reference returned by `_get_task_ref`."""
+    if isinstance(ref, str):
+        task = TaskRegistry.get_by_code(ref)
+    else:
+        task = TaskRegistry.get(ref["module"], ref["qualname"])
+    func: types.FunctionType = task.func
+    assert func is not None
+    return func
+
+
+class JsonTaskSerialization(ISerialization[Task]):
     """Define the JSON serialization and deserialization logic for Task."""
 
     class TaskOptionsRetryOnDict(t.TypedDict):
@@ -49,79 +213,137 @@ class JsonTaskSerialization(Serialization):
 
         max_retries: int | None
         on: str
+        countdown_s: float
 
     class TaskOptionsDict(t.TypedDict):
         """Define the JSON structure of the options of a serialized Task object."""
 
         retry: "JsonTaskSerialization.TaskOptionsRetryOnDict | None"
+        compression: str
+        shared_memory: bool
+        store_result: bool
+        cache: CacheOptions
+        cache_key: str
+        chunked: bool
+        stream_window: int
+        workflow: WorkflowState
+        priority: int
+        queue: str
+        rate_limit: str
+        rate_limit_reserved: bool
 
     class TaskDict(t.TypedDict):
         """Define the JSON structure of a serialized Task object."""
 
-        func: str
+        func: str | TaskFuncDict
         task_id: str
         args: tuple[t.Any, ...]
         kwargs: dict
         options: "JsonTaskSerialization.TaskOptionsDict"
+        reply_to: str | None
+        retries: int
 
     @classmethod
     def serialize(cls, obj: "Task") -> bytes:
         """Serialize a Task object to JSON bytes."""
+        s = f"json|{json.dumps(cls.to_dict(obj))}"
+        return s.encode("utf-8")
+
+    @classmethod
+    def deserialize(cls, klass: type["Task"], s: bytes) -> "Task":
+        """Deserialize JSON bytes to a Task object."""
+        s_type, s_obj = s.decode("utf-8").split("|", 1)
+        assert s_type == "json"
+        return cls.from_dict(klass, json.loads(s_obj))
+
+    @classmethod
+    def to_dict(cls, obj: "Task") -> "JsonTaskSerialization.TaskDict":
+        """Convert a Task object to a JSON-compatible dict."""
         options: JsonTaskSerialization.TaskOptionsDict = {}
         retry: JsonTaskSerialization.TaskOptionsRetryOnDict | None = None
         if obj.retry is not None:
             retry = {
                 "max_retries": obj.retry["max_retries"],
-                "on": jsonpickle.encode(obj.retry["on"]),
+                "on": _encode_retry_on(tuple(obj.retry["on"])),
             }
+            if "countdown_s" in obj.retry:
+                retry["countdown_s"] = obj.retry["countdown_s"]
             options["retry"] = retry
+        if obj.compression is not None:
+            options["compression"] = obj.compression.value
+        if obj.shared_memory:
+            options["shared_memory"] = True
+        if obj.store_result:
+            options["store_result"] = True
+        if obj.cache is not None:
+            options["cache"] = obj.cache
+            options["cache_key"] = obj.cache_key
+        if obj.chunked:
+            options["chunked"] = True
+        if obj.stream_window is not None:
+            options["stream_window"] = obj.stream_window
+        if obj.workflow is not None:
+            options["workflow"] = obj.workflow
+        if obj.priority:
+            options["priority"] = obj.priority
+        if obj.queue is not None:
+            options["queue"] = obj.queue
+        if obj.rate_limit is not None:
+            options["rate_limit"] = obj.rate_limit
+        if obj.rate_limit_reserved:
+            options["rate_limit_reserved"] = True
         d_obj: JsonTaskSerialization.TaskDict = {
-            "func": {
-                "module": obj.__module__,
-                "qualname": obj.__qualname__,
-            },
+            "func": _get_task_ref(obj),
             "task_id": obj.id,
             "args": obj.args,
             "kwargs": obj.kwargs,
             "options": options,
+            "reply_to": obj.reply_to,
+            "retries": obj.retries,
         }
-        s = f"json|{json.dumps(d_obj)}"
-        return s.encode("utf-8")
+        return d_obj
 
     @classmethod
-    def deserialize(cls, klass: type["Task"], s: bytes) -> "Task":
-        """Deserialize JSON bytes to a Task object."""
-        s_type, s_obj = s.decode("utf-8").split("|", 1)
-        assert s_type == "json"
-        d_obj: JsonTaskSerialization.TaskDict = json.loads(s_obj)
-
+    def from_dict(cls, klass: type["Task"], d_obj: "JsonTaskSerialization.TaskDict") -> "Task":
+        """Convert a dict returned by `to_dict` back to a Task object."""
         d_options: JsonTaskSerialization.TaskOptionsDict = d_obj["options"]
         retry: JsonTaskSerialization.TaskOptionsRetryOnDict | None = None
         if d_options.get("retry") is not None:
             s_retry: "JsonTaskSerialization.TaskOptionsRetryOnDict" = d_obj["options"]["retry"]
             max_retries: int | None = s_retry["max_retries"]
-            retry_on: tuple[type[Exception], ...] = jsonpickle.decode(s_retry["on"])
+            retry_on: tuple[type[Exception], ...] = _decode_retry_on(s_retry["on"])
             retry = {
                 "max_retries": max_retries,
                 "on": retry_on,
             }
-
-        func_module_path, func_qualname = d_obj["func"]["module"], d_obj["func"]["qualname"]
-        func_module: types.ModuleType = importlib.import_module(func_module_path)
-        func: types.FunctionType = getattr(func_module, func_qualname).func
-        assert func is not None
+            if "countdown_s" in s_retry:
+                retry["countdown_s"] = s_retry["countdown_s"]
 
         obj: "Task" = klass(
-            func=func,
+            func=_get_task_func(d_obj["func"]),
             task_id=d_obj["task_id"],
             args=d_obj["args"],
             kwargs=d_obj["kwargs"],
             retry=retry,
+            compression=d_options.get("compression"),
+            shared_memory=d_options.get("shared_memory", False),
+            store_result=d_options.get("store_result", False),
+            cache=d_options.get("cache"),
+            cache_key=d_options.get("cache_key"),
+            chunked=d_options.get("chunked", False),
+            stream_window=d_options.get("stream_window"),
+            workflow=d_options.get("workflow"),
+            priority=d_options.get("priority", 0),
+            queue=d_options.get("queue"),
+            rate_limit=d_options.get("rate_limit"),
+            rate_limit_reserved=d_options.get("rate_limit_reserved", False),
+            reply_to=d_obj.get("reply_to"),
+            retries=d_obj.get("retries", 0),
         )
         return obj
 
 
-class JsonAsyncResultSerialization(Serialization):
+class JsonAsyncResultSerialization(ISerialization[AsyncResult]):
     """Define the JSON serialization and deserialization logic for AsyncResult."""
 
     class AsyncResultDict(t.TypedDict):
@@ -135,6 +357,19 @@ class JsonAsyncResultSerialization(Serialization):
     @classmethod
     def serialize(cls, obj: "AsyncResult") -> bytes:
         """Serialize AsyncResult object to JSON bytes."""
+        return f"json|{json.dumps(cls.to_dict(obj))}".encode("utf-8")
+
+    @classmethod
+    def deserialize(cls, klass: type["AsyncResult"], s: bytes) -> "AsyncResult":
+        """Deserialize JSON bytes to a AsyncResult object."""
+        s: str = s.decode("utf-8")
+        s_type, s_obj = s.split("|", 1)
+        assert s_type == "json"
+        return cls.from_dict(klass, json.loads(s_obj))
+
+    @classmethod
+    def to_dict(cls, obj: "AsyncResult") -> "JsonAsyncResultSerialization.AsyncResultDict":
+        """Convert an AsyncResult object to a JSON-compatible dict."""
         error_s: str = jsonpickle.encode(obj.error)
         result_json: JsonAsyncResultSerialization.AsyncResultDict = {
             "task_id": obj.task_id,
@@ -142,15 +377,13 @@ class JsonAsyncResultSerialization(Serialization):
             "result": obj.result,
             "error": error_s,
         }
-        return f"json|{json.dumps(result_json)}".encode("utf-8")
+        return result_json
 
     @classmethod
-    def deserialize(cls, klass: type["AsyncResult"], s: bytes) -> "AsyncResult":
-        """Deserialize JSON bytes to a AsyncResult object."""
-        s: str = s.decode("utf-8")
-        s_type, s_obj = s.split("|", 1)
-        assert s_type == "json"
-        obj_d: JsonAsyncResultSerialization.AsyncResultDict = json.loads(s_obj)
+    def from_dict(
+        cls, klass: type["AsyncResult"], obj_d: "JsonAsyncResultSerialization.AsyncResultDict"
+    ) -> "AsyncResult":
+        """Convert a dict returned by `to_dict` back to an AsyncResult object."""
         result: "AsyncResult" = klass(
             task_id=obj_d["task_id"],
             ready=obj_d["ready"],
@@ -158,3 +391,179 @@ class JsonAsyncResultSerialization(Serialization):
             error=jsonpickle.decode(obj_d["error"]),
         )
         return result
+
+
+_PICKLE_HEADER = b"pickle|"
+_PICKLE_COUNT = struct.Struct(">I")
+_PICKLE_SIZE = struct.Struct(">Q")
+
+
+def _pickle_dumps(obj: t.Any) -> bytes:
+    """
+    Pickle the object with protocol 5, placing its big buffers out-of-band.
+
+    The layout is `pickle|<buffer count><buffer sizes><buffers><pickle>`, so that on unpickling
+    objects like bytearrays or numpy arrays can be rebuilt straight from the message.
+    """
+    buffers: list[pickle.PickleBuffer] = []
+    payload: bytes = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    raws: list[memoryview] = [buffer.raw() for buffer in buffers]
+    sizes: bytes = b"".join(_PICKLE_SIZE.pack(raw.nbytes) for raw in raws)
+    return b"".join((_PICKLE_HEADER, _PICKLE_COUNT.pack(len(raws)), sizes, *raws, payload))
+
+
+def _pickle_loads(s: bytes) -> t.Any:
+    """Unpickle the object pickled by `_pickle_dumps`, without copying its buffers."""
+    assert s.startswith(_PICKLE_HEADER)
+    view = memoryview(s)
+    offset: int = len(_PICKLE_HEADER)
+    (count,) = _PICKLE_COUNT.unpack_from(view, offset)
+    offset += _PICKLE_COUNT.size
+    sizes: list[int] = [
+        _PICKLE_SIZE.unpack_from(view, offset + i * _PICKLE_SIZE.size)[0] for i in range(count)
+    ]
+    offset += count * _PICKLE_SIZE.size
+    buffers: list[memoryview] = []
+    for size in sizes:
+        buffers.append(view[offset : offset + size])
+        offset += size
+    return pickle.loads(view[offset:], buffers=buffers)
+
+
+class PickleTaskSerialization(ISerialization[Task]):
+    """
+    Define the pickle serialization and deserialization logic for Task.
+
+    Unlike JSON, tuples, sets, bytes, datetimes, etc. are preserved. Only use it if the broker
+    is trusted, since unpickling a message can execute arbitrary code.
+    """
+
+    @classmethod
+    def serialize(cls, obj: "Task") -> bytes:
+        """Serialize a Task object to pickle bytes."""
+        return _pickle_dumps(
+            {
+                "func": _get_task_ref(obj),
+                "task_id": obj.id,
+                "args": obj.args,
+                "kwargs": obj.kwargs,
+                "retry": obj.retry,
+                "compression": obj.compression,
+                "shared_memory": obj.shared_memory,
+                "store_result": obj.store_result,
+                "cache": obj.cache,
+                "cache_key": obj.cache_key,
+                "chunked": obj.chunked,
+                "stream_window": obj.stream_window,
+                "workflow": obj.workflow,
+                "priority": obj.priority,
+                "queue": obj.queue,
+                "rate_limit": obj.rate_limit,
+                "rate_limit_reserved": obj.rate_limit_reserved,
+                "reply_to": obj.reply_to,
+                "retries": obj.retries,
+            }
+        )
+
+    @classmethod
+    def deserialize(cls, klass: type["Task"], s: bytes) -> "Task":
+        """Deserialize pickle bytes to a Task object."""
+        d_obj: dict[str, t.Any] = _pickle_loads(s)
+        obj: "Task" = klass(
+            func=_get_task_func(d_obj["func"]),
+            task_id=d_obj["task_id"],
+            args=d_obj["args"],
+            kwargs=d_obj["kwargs"],
+            retry=d_obj["retry"],
+            compression=d_obj["compression"],
+            shared_memory=d_obj["shared_memory"],
+            store_result=d_obj["store_result"],
+            cache=d_obj["cache"],
+            cache_key=d_obj["cache_key"],
+            chunked=d_obj["chunked"],
+            stream_window=d_obj["stream_window"],
+            workflow=d_obj["workflow"],
+            priority=d_obj["priority"],
+            queue=d_obj["queue"],
+            rate_limit=d_obj["rate_limit"],
+            rate_limit_reserved=d_obj["rate_limit_reserved"],
+            reply_to=d_obj["reply_to"],
+            retries=d_obj["retries"],
+        )
+        return obj
+
+
+class PickleAsyncResultSerialization(ISerialization[AsyncResult]):
+    """Define the pickle serialization and deserialization logic for AsyncResult."""
+
+    @classmethod
+    def serialize(cls, obj: "AsyncResult") -> bytes:
+        """Serialize AsyncResult object to pickle bytes."""
+        return _pickle_dumps((obj.task_id, obj.ready, obj.result, obj.error))
+
+    @classmethod
+    def deserialize(cls, klass: type["AsyncResult"], s: bytes) -> "AsyncResult":
+        """Deserialize pickle bytes to a AsyncResult object."""
+        task_id, ready, result, error = _pickle_loads(s)
+        return klass(task_id=task_id, ready=ready, result=result, error=error)
+
+
+_MSGPACK_HEADER = b"msgpack|"
+
+
+def _get_msgpack() -> types.ModuleType:
+    if msgpack is None:
+        raise SerializationTypeNotSupported(
+            'Serialization "msgpack" requires `pip install aiotaskq[msgpack]`.'
+        )
+    return msgpack
+
+
+class MsgpackTaskSerialization(ISerialization[Task]):
+    """
+    Define the msgpack serialization and deserialization logic for Task.
+
+    The structure is the same as JSON, only more compact and with bytes supported natively.
+    """
+
+    @classmethod
+    def serialize(cls, obj: "Task") -> bytes:
+        """Serialize a Task object to msgpack bytes."""
+        d_obj = JsonTaskSerialization.to_dict(obj)
+        return _MSGPACK_HEADER + _get_msgpack().packb(d_obj, use_bin_type=True)
+
+    @classmethod
+    def deserialize(cls, klass: type["Task"], s: bytes) -> "Task":
+        """Deserialize msgpack bytes to a Task object."""
+        assert s.startswith(_MSGPACK_HEADER)
+        body = memoryview(s)[len(_MSGPACK_HEADER) :]
+        return JsonTaskSerialization.from_dict(klass, _get_msgpack().unpackb(body, raw=False))
+
+
+class MsgpackAsyncResultSerialization(ISerialization[AsyncResult]):
+    """Define the msgpack serialization and deserialization logic for AsyncResult."""
+
+    @classmethod
+    def serialize(cls, obj: "AsyncResult") -> bytes:
+        """Serialize AsyncResult object to msgpack bytes."""
+        obj_d = JsonAsyncResultSerialization.to_dict(obj)
+        return _MSGPACK_HEADER + _get_msgpack().packb(obj_d, use_bin_type=True)
+
+    @classmethod
+    def deserialize(cls, klass: type["AsyncResult"], s: bytes) -> "AsyncResult":
+        """Deserialize msgpack bytes to a AsyncResult object."""
+        assert s.startswith(_MSGPACK_HEADER)
+        body = memoryview(s)[len(_MSGPACK_HEADER) :]
+        return JsonAsyncResultSerialization.from_dict(
+            klass, _get_msgpack().unpackb(body, raw=False)
+        )
+
+
+_SERDE_CLASSES: dict[tuple[type, SerializationType], type[ISerialization]] = {
+    (Task, SerializationType.JSON): JsonTaskSerialization,
+    (AsyncResult, SerializationType.JSON): JsonAsyncResultSerialization,
+    (Task, SerializationType.PICKLE): PickleTaskSerialization,
+    (AsyncResult, SerializationType.PICKLE): PickleAsyncResultSerialization,
+    (Task, SerializationType.MSGPACK): MsgpackTaskSerialization,
+    (AsyncResult, SerializationType.MSGPACK): MsgpackAsyncResultSerialization,
+}
@@ -0,0 +1,125 @@
+"""
+Define the passing of big buffers as task arguments via shared memory.
+
+Opt in per task with the task option `shared_memory`. Then, when the task is applied
+asynchronously, every `bytes`, `bytearray`, `memoryview` or any other object supporting the buffer
+protocol passed directly as an argument is copied once into a `multiprocessing.shared_memory`
+segment, and only a small handle to it is sent to the worker. The grunt worker maps the segment
+and passes a read-write `memoryview` of it (with the original format and shape) to the task,
+without any further copy.
+
+The client process owns the segments and removes them once the result is received, so the
+worker must be running on the same host, and the task must not keep a reference to the
+`memoryview` after returning.
+"""
+
+import logging
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import typing as t
+
+_HANDLE_KEY = "__aiotaskq_shm__"
+
+logger = logging.getLogger(__name__)
+
+AttachedSegments = list[tuple[SharedMemory, list[memoryview]]]
+
+
+class SharedMemoryHandle(t.TypedDict):
+    """Define the JSON structure of the handle sent in place of a buffer argument."""
+
+    __aiotaskq_shm__: str
+    nbytes: int
+    format: str
+    shape: list[int]
+
+
+class SharedMemoryArgs:
+    """Expose the swapping of buffer arguments to and from shared memory handles."""
+
+    @classmethod
+    def share(
+        cls, args: tuple[t.Any, ...], kwargs: dict[str, t.Any]
+    ) -> tuple[tuple[t.Any, ...], dict[str, t.Any], list[SharedMemory]]:
+        """
+        Copy the buffer arguments into shared memory and replace them with handles.
+
+        Return the new arguments and the created segments, which the caller must `unlink` once
+        the task is done.
+        """
+        segments: list[SharedMemory] = []
+        args = tuple(cls._share(arg, segments) for arg in args)
+        kwargs = {key: cls._share(value, segments) for key, value in kwargs.items()}
+        return args, kwargs, segments
+
+    @classmethod
+    def attach(
+        cls, args: tuple[t.Any, ...], kwargs: dict[str, t.Any]
+    ) -> tuple[tuple[t.Any, ...], dict[str, t.Any], AttachedSegments]:
+        """
+        Replace the handles in the arguments with views of their shared memory segments.
+
+        Return the new arguments and the attached segments, which the caller must `detach`
+        once the task is done.
+        """
+        attached: AttachedSegments = []
+        args = tuple(cls._attach(arg, attached) for arg in args)
+        kwargs = {key: cls._attach(value, attached) for key, value in kwargs.items()}
+        return args, kwargs, attached
+
+    @staticmethod
+    def detach(attached: AttachedSegments) -> None:
+        """Release the views and unmap the segments attached by `attach`."""
+        for segment, views in attached:
+            try:
+                for view in views:
+                    view.release()
+                segment.close()
+            except BufferError:
+                # The task kept a view of its own, the segment is unmapped once that is gone
+                logger.warning("Shared memory %s is still in use by the task", segment.name)
+
+    @staticmethod
+    def unlink(segments: list[SharedMemory]) -> None:
+        """Remove the segments created by `share`."""
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    @staticmethod
+    def _share(obj: t.Any, segments: list[SharedMemory]) -> t.Any:
+        if isinstance(obj, (str, int, float, bool, list, tuple, dict)) or obj is None:
+            return obj
+        try:
+            view = memoryview(obj)
+        except TypeError:
+            return obj
+        # Segments can't be empty
+        segment = SharedMemory(create=True, size=max(view.nbytes, 1))
+        segments.append(segment)
+        if view.c_contiguous:  # pylint: disable=using-constant-test
+            segment.buf[: view.nbytes] = view.cast("B")
+        else:
+            segment.buf[: view.nbytes] = view.tobytes()
+        handle: SharedMemoryHandle = {
+            _HANDLE_KEY: segment.name,
+            "nbytes": view.nbytes,
+            "format": view.format,
+            "shape": list(view.shape or ()),
+        }
+        return handle
+
+    @staticmethod
+    def _attach(obj: t.Any, attached: AttachedSegments) -> t.Any:
+        if not isinstance(obj, dict) or _HANDLE_KEY not in obj:
+            return obj
+        handle = t.cast(SharedMemoryHandle, obj)
+        segment = SharedMemory(name=handle[_HANDLE_KEY])
+        # The client owns the segment, so we must not let our resource tracker remove it
+        name: str = segment._name  # pylint: disable=protected-access
+        resource_tracker.unregister(name, "shared_memory")
+        view_bytes = segment.buf[: handle["nbytes"]]
+        view = view_bytes.cast(handle["format"], handle["shape"])
+        # Views must be released from the last one derived, before the segment can be unmapped
+        attached.append((segment, [view, view_bytes]))
+        return view
@@ -0,0 +1,106 @@
+"""
+Define the coalescing of identical concurrent calls to a task into a single execution.
+
+Opt in per task with the task option `single_flight`. Identical calls, i.e. to the same task with
+the same canonicalized arguments, that are in flight at the same time are coalesced:
+
+* Within a client process, the calls after the first one just await the same future.
+* Across processes, the first call to acquire a Redis lock holding its task id becomes the
+  leader, and publishes the task as usual with its result stored in the result backend. The
+  other calls, the followers, wait for the result of the leader in the result backend instead of
+  publishing the task themselves.
+"""
+
+import asyncio
+import typing as t
+
+from .cache import get_call_digest
+from .config import Config
+from .pubsub import RedisConnectionPools
+from .result_backend import AsyncResultHandle, ResultBackend
+
+if t.TYPE_CHECKING:
+    from .task import Task
+
+RT = t.TypeVar("RT")
+
+_LOCK_KEY_TEMPLATE = "single_flight:{task_name}:{digest}"
+
+# Release the lock, unless it expired and was acquired by another leader in the meantime
+# KEYS: lock key
+# ARGV: task id of the leader
+_RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Expose the coalescing of identical concurrent calls to a task."""
+
+    # The futures of the calls in flight in this process, by lock key
+    _in_flight: dict[str, "asyncio.Future"] = {}
+
+    @classmethod
+    async def call(cls, task: "Task[t.Any, RT]", execute: t.Callable[[], t.Awaitable[RT]]) -> RT:
+        """
+        Return the result of the call held by the task, calling `execute` only if it's the leader.
+
+        Raise the error of the leader, if any, in every coalesced call.
+        """
+        # Raise error if no result backend is configured, before publishing anything
+        ResultBackend.get()
+        digest: t.Optional[str] = get_call_digest(task)
+        if digest is None:
+            # The arguments can't be told apart from those of other calls
+            return await execute()
+        key = _LOCK_KEY_TEMPLATE.format(task_name=task.name, digest=digest)
+        future: t.Optional["asyncio.Future[RT]"] = cls._in_flight.get(key)
+        if future is not None:
+            # Don't cancel the shared call if only this caller is cancelled
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        cls._in_flight[key] = future
+        try:
+            result: RT = await cls._call_once(key=key, task=task, execute=execute)
+            future.set_result(result)
+            return result
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the error as retrieved, in case no other caller awaits it
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del cls._in_flight[key]
+
+    @classmethod
+    async def _call_once(
+        cls, key: str, task: "Task[t.Any, RT]", execute: t.Callable[[], t.Awaitable[RT]]
+    ) -> RT:
+        client = RedisConnectionPools.get_client(url=Config.result_backend_url())
+        timeout_s: int = Config.single_flight_timeout_s()
+        while True:
+            if await client.set(key, task.id, nx=True, ex=timeout_s):
+                # Leader: store the result for the followers to fetch it
+                task.store_result = True
+                try:
+                    return await execute()
+                finally:
+                    await client.register_script(_RELEASE_SCRIPT)(keys=[key], args=[task.id])
+
+            leader_task_id: t.Optional[bytes] = await client.get(key)
+            if leader_task_id is None:
+                # The leader just released the lock, try to become the leader again
+                continue
+            try:
+                return await AsyncResultHandle[RT](task_id=leader_task_id.decode()).get(
+                    timeout=timeout_s
+                )
+            except asyncio.TimeoutError:
+                # The leader is gone without a result, and its lock has expired by now
+                continue
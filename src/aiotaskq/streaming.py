@@ -0,0 +1,120 @@
+"""
+Define the streaming of the items yielded by generator tasks back to their caller.
+
+A generator or async generator task called via `Task.stream` publishes each item it yields as a
+separate frame on the reply channel of the caller, i.e. an `AsyncResult` that is not ready, and
+finally an end frame, i.e. a ready `AsyncResult` with the error of the task, if any.
+
+The stream is flow-controlled with credits: the worker publishes at most `window` items ahead
+of the caller, then waits for the caller to grant it more credits on the credits channel of the
+task as it consumes the items. A caller that stops consuming early cancels the stream instead,
+which closes the generator on the worker.
+"""
+
+import asyncio
+import contextlib
+import inspect
+import logging
+import typing as t
+
+from .config import Config
+from .constants import Constants
+from .interfaces import IPubSub
+from .pubsub import PubSub
+
+# The credits granted to cancel the stream
+_CANCEL = -1
+
+logger = logging.getLogger(__name__)
+
+
+def is_generator_function(func: t.Callable) -> bool:
+    """Return whether the function is a generator or async generator function."""
+    return inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(func)
+
+
+async def iterate(items: t.Iterator | t.AsyncIterator) -> t.AsyncIterator:
+    """Iterate over the items of a generator or async generator, and close it once done."""
+    if inspect.isasyncgen(items):
+        async with contextlib.aclosing(items):
+            async for item in items:
+                yield item
+    else:
+        with contextlib.closing(items):
+            for item in items:
+                yield item
+
+
+class _StreamCreditsBase:
+    def __init__(self, task_id: str, window: int) -> None:
+        self._channel = Constants.stream_credits_channel_template().format(task_id=task_id)
+        self._window = window
+        self._pubsub: IPubSub = PubSub.get(
+            url=Config.broker_url(), poll_interval_s=Config.poll_interval_s()
+        )
+
+    async def __aenter__(self):
+        await self._pubsub.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self._pubsub.__aexit__(exc_type, exc_value, traceback)
+
+
+class StreamCredits(_StreamCreditsBase):
+    """Track the credits granted to the worker producing a stream, used as an async context."""
+
+    def __init__(self, task_id: str, window: int) -> None:
+        super().__init__(task_id=task_id, window=window)
+        self._credits = window
+
+    async def __aenter__(self) -> "StreamCredits":
+        """Start receiving the credits granted by the caller."""
+        await super().__aenter__()
+        await self._pubsub.subscribe(self._channel)
+        return self
+
+    async def acquire(self) -> bool:
+        """
+        Take a credit to publish an item, waiting for the caller to grant more if there's none.
+
+        Return False if the caller cancelled the stream, or doesn't grant credits anymore.
+        """
+        while self._credits <= 0:
+            try:
+                message = await asyncio.wait_for(self._pubsub.poll(), Config.stream_timeout_s())
+            except asyncio.TimeoutError:
+                logger.warning("Giving up on stream not consumed [channel=%s]", self._channel)
+                return False
+            granted = int(message["data"])
+            if granted == _CANCEL:
+                return False
+            self._credits += granted
+        self._credits -= 1
+        return True
+
+
+class StreamCreditGrants(_StreamCreditsBase):
+    """
+    Grant credits to the worker producing a stream as its items are consumed, used as an async
+    context which cancels the stream if exited with an error, e.g. `GeneratorExit`.
+    """
+
+    def __init__(self, task_id: str, window: int) -> None:
+        super().__init__(task_id=task_id, window=window)
+        self._consumed = 0
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        """Cancel the stream if it was not consumed until the end."""
+        try:
+            if exc_type is not None:
+                await self._pubsub.publish(self._channel, str(_CANCEL))
+        finally:
+            await super().__aexit__(exc_type, exc_value, traceback)
+
+    async def consumed(self) -> None:
+        """Account for an item consumed, granting credits back to the worker every half window."""
+        self._consumed += 1
+        if self._consumed >= max(self._window // 2, 1):
+            await self._pubsub.publish(self._channel, str(self._consumed))
+            self._consumed = 0
@@ -1,22 +1,43 @@
 """Module to define the main logic of the library."""
 # pylint: disable=cyclic-import
 
-import copy
-
+import asyncio
+import base64
+import datetime
+from functools import cached_property
 import inspect
 import logging
+import time
 from types import ModuleType
 import typing as t
 import uuid
 
+from .app import App
+from .cache import ResultCache
+from .chunks import ChunkItem, ChunkResult, ChunkSizer
+from .claim_check import ClaimCheck
+from .compression import Compression
 from .config import Config
-from .constants import Constants
 from .exceptions import InvalidArgument, InvalidRetryOptions, ModuleInvalidForTask
-from .interfaces import PollResponse, TaskOptions
+from .inbox import ResultInbox
+from .interfaces import CompressionType, TaskEnvelope, TaskOptions
+from .priority import MIN_PRIORITY, validate_priority
 from .pubsub import PubSub
+from .registry import TaskRegistry
+from .result_backend import AsyncResultHandle, ResultBackend
+from .rate_limit import validate_rate_limit
+from .routing import Router, get_task_channel, validate_queue
+from .schedule import get_schedule, get_schedule_arguments
+from .scheduler import Scheduler
+from .shm import SharedMemoryArgs
+from .single_flight import SingleFlight
+from .streaming import StreamCreditGrants
+from .workflow import Signature
 
 if t.TYPE_CHECKING:
-    from .interfaces import RetryOptions
+    from multiprocessing.shared_memory import SharedMemory
+
+    from .interfaces import CacheOptions, RetryOptions, ScheduleOptions, WorkflowState
 
 RT = t.TypeVar("RT")
 P = t.ParamSpec("P")
@@ -52,7 +73,7 @@ class AsyncResult(t.Generic[RT]):
         return self.result
 
 
-class Task(t.Generic[P, RT]):
+class Task(t.Generic[P, RT]):  # pylint: disable=too-many-instance-attributes
     """
     A callable can be applied asyncronously and executed on an aiotaskq worker process.
 
@@ -81,17 +102,50 @@ class Task(t.Generic[P, RT]):
     id: str
     func: t.Callable[P, RT]
     retry: "RetryOptions | None"
+    compression: CompressionType | None
+    shared_memory: bool
+    store_result: bool
+    cache: "CacheOptions | None"
+    cache_key: t.Optional[str]
+    single_flight: bool
+    chunked: bool
+    stream_window: t.Optional[int]
+    workflow: t.Optional["WorkflowState"]
+    priority: int
+    queue: t.Optional[str]
+    rate_limit: t.Optional[str]
+    rate_limit_reserved: bool
+    schedule: "ScheduleOptions | None"
     args: t.Optional[tuple[t.Any, ...]]
     kwargs: t.Optional[dict]
+    reply_to: t.Optional[str]
+    retries: int
+    eta: t.Optional[float]
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-locals
         self,
         func: t.Callable[P, RT],
         *,
         retry: "RetryOptions | None" = None,
+        compression: CompressionType | str | None = None,
+        shared_memory: bool = False,
+        store_result: bool = False,
+        cache: "CacheOptions | None" = None,
+        cache_key: t.Optional[str] = None,
+        single_flight: bool = False,
+        chunked: bool = False,
+        stream_window: t.Optional[int] = None,
+        workflow: t.Optional["WorkflowState"] = None,
+        priority: int = MIN_PRIORITY,
+        queue: t.Optional[str] = None,
+        rate_limit: t.Optional[str] = None,
+        rate_limit_reserved: bool = False,
+        schedule: "ScheduleOptions | None" = None,
         task_id: t.Optional[str] = None,
         args: t.Optional[tuple[t.Any, ...]] = None,
         kwargs: t.Optional[dict] = None,
+        reply_to: t.Optional[str] = None,
+        retries: int = 0,
     ) -> None:
         """
         Store the underlying function and an automatically generated task_id in the Task instance.
@@ -102,9 +156,41 @@ class Task(t.Generic[P, RT]):
             raise InvalidRetryOptions('retry.on should not be empty')
         self.retry = retry
 
+        # Fail early, at task definition, if the compression library is not installed
+        self.compression = None if compression is None else Compression.validate(compression)
+        self.shared_memory = shared_memory
+        self.store_result = store_result
+        self.cache = cache
+        self.cache_key = cache_key
+        self.single_flight = single_flight
+        # Whether the args are the arguments of a chunk of calls, see `Task.chunks`
+        self.chunked = chunked
+        # The flow control window of the stream of items of the task, see `Task.stream`
+        self.stream_window = stream_window
+        # The state of the workflow the task is a step of, see `aiotaskq.workflow`
+        self.workflow = workflow
+        self.priority = validate_priority(priority)
+        # The queue the task is published to, if not routed, see `aiotaskq.routing`
+        self.queue = None if queue is None else validate_queue(queue)
+        # The max rate of calls across all the workers, see `aiotaskq.rate_limit`
+        self.rate_limit = None if rate_limit is None else validate_rate_limit(rate_limit)
+        # Whether the call reserved its rate limit tokens when it was deferred for lack of them
+        self.rate_limit_reserved = rate_limit_reserved
+        # The schedule `aiotaskq beat` applies the task on, see `aiotaskq.schedule`
+        self.schedule = schedule
+
         self.args = args
         self.kwargs = kwargs
         self.id = task_id
+        self.reply_to = reply_to
+        self.retries = retries
+        # The time the call is due at, as a UNIX timestamp, see `Task.with_eta`
+        self.eta = None
+
+        if schedule is not None:
+            # Fail early, at task definition, if the task can't be applied on schedule
+            get_schedule(schedule)
+            self._validate_arguments(*get_schedule_arguments(schedule))
 
         # Copy metadata from the function to simulate as close as possible
 
@@ -116,23 +202,106 @@ class Task(t.Generic[P, RT]):
         """Call the task synchronously, by directly executing the underlying function."""
         return self.func(*args, **kwargs)
 
-    def with_retry(self, max_retries: int, on: tuple[type[Exception], ...]) -> "Task":
+    def with_retry(
+        self,
+        max_retries: int,
+        on: tuple[type[Exception], ...],
+        countdown_s: t.Optional[float] = None,
+    ) -> "Task":
         """
         Return a **copy** of self with the provided retry options.
 
         We return a copy so that we don't overwrite the original task definition.
         """
-        task_: Task = copy.deepcopy(self)
+        task_: Task = self._copy()
         if len(on) == 0:
             raise InvalidRetryOptions
         retry: RetryOptions = {"max_retries": max_retries, "on": on}
+        if countdown_s is not None:
+            retry["countdown_s"] = countdown_s
         task_.retry = retry
         return task_
 
+    def with_priority(self, priority: int) -> "Task":
+        """
+        Return a **copy** of self with the provided priority, from 0 (the default) to 9 (the most
+        urgent), e.g. `await some_task.with_priority(9).apply_async(1, 2)`.
+        """
+        task_: Task = self._copy()
+        task_.priority = validate_priority(priority)
+        return task_
+
+    def with_queue(self, queue: str) -> "Task":
+        """
+        Return a **copy** of self published to the provided queue rather than the queue it's
+        routed to, e.g. `await some_task.with_queue("cpu").apply_async(1, 2)`.
+        """
+        task_: Task = self._copy()
+        task_.queue = validate_queue(queue)
+        return task_
+
+    def with_rate_limit(self, rate_limit: t.Optional[str]) -> "Task":
+        """
+        Return a **copy** of self with the provided rate limit, enforced across all the workers, as
+        "<calls>/<s|m|h>", or None for no limit, e.g. `some_task.with_rate_limit("50/s")`.
+        """
+        task_: Task = self._copy()
+        task_.rate_limit = None if rate_limit is None else validate_rate_limit(rate_limit)
+        return task_
+
+    def with_countdown(self, countdown_s: float) -> "Task":
+        """
+        Return a **copy** of self whose calls are executed in `countdown_s` seconds at the
+        earliest, e.g. `await some_task.with_countdown(30).apply_async(1, 2)`.
+        """
+        if not isinstance(countdown_s, (int, float)) or countdown_s < 0:
+            raise InvalidArgument(f"Countdown should be a non-negative number, got {countdown_s}")
+        return self.with_eta(time.time() + countdown_s)
+
+    def with_eta(self, eta: datetime.datetime | float) -> "Task":
+        """
+        Return a **copy** of self whose calls are executed at `eta` at the earliest, given as a
+        datetime (naive ones are in local time) or a UNIX timestamp.
+        """
+        task_: Task = self._copy()
+        if isinstance(eta, datetime.datetime):
+            eta = eta.timestamp()
+        if not isinstance(eta, (int, float)):
+            raise InvalidArgument(f"ETA should be a datetime or a UNIX timestamp, got {eta}")
+        task_.eta = eta
+        return task_
+
+    @property
+    def envelope(self) -> TaskEnvelope:
+        """Return where the result of the call is delivered, see `TaskEnvelope`."""
+        assert self.id is not None
+        return {
+            "task_id": self.id if self.workflow is None else self.workflow["id"],
+            "reply_to": self.reply_to,
+            "store_result": self.store_result,
+        }
+
+    def s(self, *args, **kwargs) -> "Signature[RT]":
+        """
+        Return the call to the task with the given arguments as a step of a workflow, see
+        `aiotaskq.workflow`.
+
+        The step is called with the result of the previous step prepended to the arguments.
+        """
+        return Signature(task=self, args=args, kwargs=kwargs)
+
+    def si(self, *args, **kwargs) -> "Signature[RT]":  # pylint: disable=invalid-name
+        """Like `Task.s`, but the step is called with the given arguments only."""
+        return Signature(task=self, args=args, kwargs=kwargs, immutable=True)
+
+    @cached_property
+    def name(self) -> str:
+        """Return the name identifying the task across processes."""
+        return f"{self.__module__}.{self.__qualname__}"
+
     def generate_task_id(self) -> str:
-        """Generate a unique id for an individual call to a task."""
-        id_ = uuid.uuid4()
-        return f"{self.__module__}.{self.__qualname__}:{id_}"
+        """Generate a unique id for an individual call to a task, as 22 url-safe characters."""
+        return base64.urlsafe_b64encode(uuid.uuid4().bytes).rstrip(b"=").decode("ascii")
 
     async def apply_async(self, *args: P.args, **kwargs: P.kwargs) -> RT:
         """
@@ -140,23 +309,148 @@ class Task(t.Generic[P, RT]):
 
         Execution is done by the following steps:
         1. Serialize the task (just the task id and its arguments)
-        2. Publish it to a Tasks Channel, and wait for the results on a Results Channel
+        2. Publish it to a Tasks Channel, and wait for the results on the Reply Channel of the
+           current process
         3. A worker process will pick up the taskand de-serialize it
         4. The worker process find in its memory the task by the task id and execute it as a regular
            function
-        5. The worker process will publish the result of the task to Results Channel
+        5. The worker process will publish the result of the task to the Reply Channel
         6. The main process (the caller) will pick up the result and return the result. DONE
         """
         # Raise error if arguments provided are invalid, before enything
-        self._validate_arguments(task_args=args, task_kwargs=kwargs)
-        task_ = copy.deepcopy(self)
-        task_.args = args
-        task_.kwargs = kwargs
+        task_ = self._bind_call(args, kwargs)
         if task_.id is None:
             task_.id = task_.generate_task_id()
+        if task_.cache is not None and task_.cache.get("client_lookup"):
+            # The worker counts the miss, if any, when it looks the result up again
+            cached: AsyncResult[RT] | None = await ResultCache.lookup(task_, count_miss=False)
+            if cached is not None:
+                logger.debug("Returning cached result [task_id=%s]", task_.id)
+                # Only successful results are cached
+                return cached.result
         # pylint: disable=protected-access
+        if task_.single_flight:
+            return await SingleFlight.call(task=task_, execute=task_._apply)
+        return await task_._apply()
+
+    async def send(self, *args: P.args, **kwargs: P.kwargs) -> AsyncResultHandle[RT]:
+        """
+        Call the task asyncronously, and return a handle to its result without waiting for it.
+
+        The result is stored in the result backend configured via env var
+        AIOTASKQ_RESULT_BACKEND_URL, so it can be fetched later even from another process,
+        e.g. `AsyncResultHandle(task_id).get()`, until it expires.
+        """
+        task_ = self._bind_call(args, kwargs)
+        # Raise error if no result backend is configured, before publishing anything
+        ResultBackend.get()
+        task_.id = task_.id or task_.generate_task_id()
+        task_.store_result = True
         await task_.publish()
-        return await task_._get_result()
+        return AsyncResultHandle[RT](task_id=task_.id)
+
+    async def apply_many(
+        self, arguments: t.Iterable[tuple[t.Any, ...] | dict[str, t.Any]]
+    ) -> list[RT]:
+        """
+        Call the task asyncronously once per item in `arguments`, and return the results in order.
+
+        Each item is either a tuple of positional arguments or a dict of keyword arguments, e.g.
+        `await add.apply_many([(1, 2), (3, 4), {"x": 5, "y": 6}])` returns `[3, 7, 11]`.
+
+        All the calls are serialized in one pass and published in a few pipelined batches, which
+        is much cheaper than `asyncio.gather`-ing as many `apply_async`.
+        """
+        tasks: list[Task[P, RT]] = []
+        segments: list["SharedMemory"] = []
+        for item in arguments:
+            args, kwargs = (tuple(), item) if isinstance(item, dict) else (tuple(item), {})
+            # Raise error if arguments provided are invalid, before publishing anything
+            task_ = self._bind_call(args, kwargs)
+            if task_.shared_memory:
+                task_.args, task_.kwargs, task_segments = SharedMemoryArgs.share(args, kwargs)
+                segments.extend(task_segments)
+            task_.id = task_.generate_task_id()
+            tasks.append(task_)
+
+        try:
+            return await self._apply_batch(tasks)
+        finally:
+            SharedMemoryArgs.unlink(segments)
+
+    async def chunks(
+        self,
+        arguments: t.Iterable[tuple[t.Any, ...] | dict[str, t.Any]],
+        size: int | t.Literal["auto"] = "auto",
+    ) -> list[RT]:
+        """
+        Call the task asyncronously once per item in `arguments` like `apply_many`, but send the
+        calls in chunks of `size` calls per message, and return the results in order.
+
+        A grunt worker executes all the calls of a chunk in a row, which amortizes the cost of
+        messaging for tiny tasks. With `size="auto"`, the size is tuned from the observed execution
+        time of the task, see `aiotaskq.chunks`. If a call raises, the whole chunk fails with its
+        error.
+        """
+        if size != "auto" and (not isinstance(size, int) or size < 1):
+            raise InvalidArgument(f'Chunk size should be a positive int or "auto", got {size}')
+        items: list[ChunkItem] = []
+        for item in arguments:
+            args, kwargs = (tuple(), item) if isinstance(item, dict) else (tuple(item), {})
+            # Raise error if arguments provided are invalid, before publishing anything
+            self._validate_arguments(task_args=args, task_kwargs=kwargs)
+            items.append((args, kwargs))
+
+        if not items:
+            return []
+        results: list[RT] = []
+        if size == "auto" and not ChunkSizer.is_tuned(self.name):
+            # Probe the execution time with a first small chunk
+            probe_size: int = ChunkSizer.get_size(self.name)
+            results.extend(await self._apply_chunks([items[:probe_size]]))
+            items = items[probe_size:]
+        chunk_size: int = ChunkSizer.get_size(self.name) if size == "auto" else size
+        results.extend(
+            await self._apply_chunks(
+                [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+            )
+        )
+        return results
+
+    async def stream(self, *args: P.args, **kwargs: P.kwargs) -> t.AsyncIterator[t.Any]:
+        """
+        Call a generator or async generator task asyncronously, and iterate over the items it
+        yields as they arrive, e.g. `async for row in scan_table.stream("users"): ...`.
+
+        The worker publishes at most `AIOTASKQ_STREAM_WINDOW` items ahead of the caller, so that
+        neither of them buffers the whole stream. Breaking out of the loop stops the generator on
+        the worker. If the task raises, its error is raised after the items yielded so far.
+        """
+        task_ = self._bind_call(args, kwargs)
+        task_.id = task_.generate_task_id()
+        task_.stream_window = Config.stream_window()
+        # The stream is not a result to cache
+        task_.cache = None
+        segments: list["SharedMemory"] = []
+        if task_.shared_memory:
+            task_.args, task_.kwargs, segments = SharedMemoryArgs.share(args, kwargs)
+        inbox: ResultInbox = await ResultInbox.get()
+        task_.reply_to = inbox.channel
+        frames: "asyncio.Queue[AsyncResult]" = inbox.expect_stream(task_.id)
+        try:
+            async with StreamCreditGrants(task_id=task_.id, window=task_.stream_window) as grants:
+                await task_.publish()
+                while True:
+                    frame: AsyncResult = await frames.get()
+                    if frame.ready:
+                        if frame.error is not None:
+                            raise frame.error
+                        return
+                    yield frame.result
+                    await grants.consumed()
+        finally:
+            inbox.discard(task_.id)
+            SharedMemoryArgs.unlink(segments)
 
     async def publish(self) -> None:
         """
@@ -168,41 +462,143 @@ class Task(t.Generic[P, RT]):
 
         assert hasattr(self, "args") and hasattr(self, "kwargs") and self.id is not None
 
-        message: bytes = Serialization.serialize(self)
-
-        pubsub_ = PubSub.get(
-            url=Config.broker_url(),
-            poll_interval_s=0.01,
-            max_connections=10,
-            decode_responses=True,
+        # The queue travels with the task, so that its retries are published to the same queue
+        self.queue = Router.get_queue(self)
+        message: bytes = await ClaimCheck.offload(
+            Serialization.serialize(self, compression_type=self.compression),
+            envelope=self.envelope,
+            eta=self.eta,
         )
+
+        channel: str = get_task_channel(self)
+        if self.eta is not None and self.eta > time.time():
+            logger.debug("Scheduling task [task_id=%s, eta=%s]", self.id, self.eta)
+            await Scheduler.schedule(channel, messages=[message], eta=self.eta)
+            return
+        pubsub_ = PubSub.get(url=Config.broker_url(), poll_interval_s=Config.poll_interval_s())
         async with pubsub_ as pubsub:  # pylint: disable=not-async-context-manager
             logger.debug("Publishing task [task_id=%s, message=%s]", self.id, message)
-            await pubsub.publish(Constants.tasks_channel(), message=message)
-
-    async def _get_result(self) -> RT:
+            await pubsub.publish(channel, message=message)
+
+    async def _apply(self) -> RT:
+        """Publish the call held by self, and wait for its result on the inbox."""
+        assert self.args is not None and self.kwargs is not None and self.id is not None
+        segments: list["SharedMemory"] = []
+        if self.shared_memory:
+            self.args, self.kwargs, segments = SharedMemoryArgs.share(self.args, self.kwargs)
+        # The inbox is already listening on its reply channel, so the result can't be missed
+        # even if a fast worker publishes it before we start waiting for it
+        inbox: ResultInbox = await ResultInbox.get()
+        self.reply_to = inbox.channel
+        future: "asyncio.Future[AsyncResult[RT]]" = inbox.expect(self.id)
+        try:
+            await self.publish()
+            return await self._get_result(future=future)
+        finally:
+            inbox.discard(self.id)
+            SharedMemoryArgs.unlink(segments)
+
+    async def _apply_batch(self, tasks: list["Task"]) -> list[t.Any]:
+        """Publish the given calls in a few pipelined batches, and return their results in order."""
         from aiotaskq.serde import Serialization  # pylint: disable=import-outside-toplevel
 
+        if not tasks:
+            return []
+        inbox: ResultInbox = await ResultInbox.get()
+        queue: str = Router.get_queue(self)
+        for task_ in tasks:
+            task_.reply_to = inbox.channel
+            task_.queue = queue
+        futures: list["asyncio.Future[AsyncResult]"] = [inbox.expect(t_.id) for t_ in tasks]
+        try:
+            messages: list[bytes] = await asyncio.gather(
+                *[
+                    ClaimCheck.offload(
+                        Serialization.serialize(task_, compression_type=self.compression),
+                        envelope=task_.envelope,
+                        eta=self.eta,
+                    )
+                    for task_ in tasks
+                ]
+            )
+            channel: str = get_task_channel(tasks[0])
+            if self.eta is not None and self.eta > time.time():
+                logger.debug("Scheduling %s tasks [task=%s]", len(messages), self.__qualname__)
+                await Scheduler.schedule(channel, messages=messages, eta=self.eta)
+            else:
+                pubsub_ = PubSub.get(
+                    url=Config.broker_url(), poll_interval_s=Config.poll_interval_s()
+                )
+                async with pubsub_ as pubsub:  # pylint: disable=not-async-context-manager
+                    logger.debug("Publishing %s tasks [task=%s]", len(messages), self.__qualname__)
+                    await pubsub.publish_many(channel, messages=messages)
+            # pylint: disable=protected-access
+            return [
+                await task_._get_result(future=future) for task_, future in zip(tasks, futures)
+            ]
+        finally:
+            for task_ in tasks:
+                inbox.discard(task_.id)
+
+    async def _apply_chunks(self, chunks: list[list[ChunkItem]]) -> list[RT]:
+        """Send each chunk of calls as a single message, and return all their results in order."""
+        tasks: list[Task] = []
+        for items in chunks:
+            task_ = self._copy()
+            task_.args, task_.kwargs = tuple(items), {}
+            task_.id = task_.generate_task_id()
+            task_.chunked = True
+            # Neither caching nor shared memory apply to a chunk as a whole
+            task_.cache, task_.shared_memory = None, False
+            tasks.append(task_)
+
+        results: list[RT] = []
+        chunk_results: list[ChunkResult] = await self._apply_batch(tasks)
+        for items, chunk_result in zip(chunks, chunk_results):
+            ChunkSizer.observe(self.name, chunk_result["elapsed_s"], len(items))
+            results.extend(chunk_result["results"])
+        return results
+
+    async def _get_result(self, future: "asyncio.Future[AsyncResult[RT]]") -> RT:
         logger.debug("Retrieving result for task [task_id=%s]", self.id)
-        pubsub_ = PubSub.get(url=Config.broker_url(), poll_interval_s=0.01)
-        async with pubsub_ as pubsub:  # pylint: disable=not-async-context-manager
-            await pubsub.subscribe(Constants.results_channel_template().format(task_id=self.id))
-            message: PollResponse = await pubsub.poll()
-
-        logger.debug("Message: %s", message)
-
-        result_serialized: bytes = message["data"]
-        async_result: AsyncResult[RT] = Serialization.deserialize(AsyncResult, result_serialized)
+        async_result: AsyncResult[RT] = await future
 
         result: RT | Exception = async_result.get()
         if isinstance(result, Exception):
             raise result
         return result
 
+    def _copy(self) -> "Task[P, RT]":
+        """
+        Return a shallow copy of self, e.g. to hold the arguments of an individual call.
+
+        This is much cheaper than `copy.copy` let alone `copy.deepcopy`, and the copy shares the
+        cached signature of self.
+        """
+        task_ = object.__new__(self.__class__)
+        task_.__dict__.update(self.__dict__)
+        return task_
+
+    def _bind_call(self, args: tuple, kwargs: dict) -> "Task[P, RT]":
+        """Return a copy of self holding the validated arguments of an individual call."""
+        self._validate_arguments(task_args=args, task_kwargs=kwargs)
+        task_ = self._copy()
+        task_.args = args
+        task_.kwargs = kwargs
+        if task_.cache is not None:
+            task_.cache_key = ResultCache.get_key(task_)
+            if task_.cache_key is None:
+                # The arguments can't be told apart from those of other calls
+                task_.cache = None
+        return task_
+
+    @cached_property
+    def _signature(self) -> inspect.Signature:
+        return inspect.signature(self.func)
+
     def _validate_arguments(self, task_args: tuple, task_kwargs: dict):
         try:
-            func_sig: "inspect.Signature" = inspect.signature(self.func)
-            func_sig.bind(*task_args, **task_kwargs)
+            self._signature.bind(*task_args, **task_kwargs)
         except TypeError as exc:
             raise InvalidArgument(
                 f"These arguments are invalid: args={task_args}, kwargs={task_kwargs}"
@@ -229,6 +625,9 @@ def task(*, options: TaskOptions | None = None) -> t.Callable[[t.Callable[P, RT]
             )
 
         task_ = Task[P, RT](func, **options)
+        # Make the task known to both the app and the workers
+        App._task_registry[task_.name] = task_  # pylint: disable=protected-access
+        TaskRegistry.register(task_)
         return task_
 
     return _wrapper
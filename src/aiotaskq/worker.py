@@ -2,6 +2,8 @@
 
 from abc import ABC, abstractmethod
 import asyncio
+import contextlib
+import functools
 from functools import cached_property
 import inspect
 import logging
@@ -9,17 +11,39 @@ import multiprocessing
 import os
 import signal
 import sys
+import time
 import typing as t
 import types
 
-import aioredis as redis
-
+from .cache import ResultCache
+from .chunks import execute_chunk
+from .claim_check import ClaimCheck
 from .concurrency_manager import ConcurrencyManagerSingleton
 from .config import Config
 from .constants import Constants
-from .interfaces import ConcurrencyType, IConcurrencyManager, IPubSub
+from .dispatch import Dispatcher, GruntWorkerLoads, QueueLoads
+from .exceptions import InvalidArgument, ResultBackendNotConfigured
+from .interfaces import (
+    ConcurrencyType,
+    DispatchStrategy,
+    IConcurrencyManager,
+    IDispatcher,
+    IPubSub,
+    PriorityMode,
+    TaskEnvelope,
+)
+from .ipc import IpcBroker, get_ipc_path
+from .priority import get_priority_channel
 from .pubsub import PubSub
+from .rate_limit import RateLimiter
+from .registry import TaskRegistry
+from .result_backend import ResultBackend
+from .routing import DEFAULT_QUEUE, QueueBuffer, get_queue_channel, parse_queues
+from .scheduler import Scheduler
 from .serde import Serialization
+from .shm import AttachedSegments, SharedMemoryArgs
+from .streaming import StreamCredits, is_generator_function, iterate
+from .workflow import advance_workflow
 from .task import AsyncResult, Task
 from .utils import import_from_cwd
 
@@ -50,8 +74,11 @@ class BaseWorker(ABC):
         """
 
         async def _start():
-            await self._pre_run()
-            await self._main_loop()
+            try:
+                await self._pre_run()
+                await self._main_loop()
+            finally:
+                await self._post_run()
 
         asyncio.run(_start())
 
@@ -63,6 +90,9 @@ class BaseWorker(ABC):
     async def _main_loop(self):
         """Define the logic for the main loop."""
 
+    async def _post_run(self):
+        """Define any logic to run once the _main_loop exits, e.g. upon termination."""
+
     @cached_property
     def _logger(self):
         return logging.getLogger(f"[{self._pid}] [{self.__class__.__qualname__}]")
@@ -94,10 +124,25 @@ class Defaults:
         """Default to no worker rate limit."""
         return -1
 
+    @classmethod
+    def dispatch_strategy(cls) -> str:
+        """Return the default strategy to pass tasks to grunt workers ("least-outstanding")."""
+        return DispatchStrategy.LEAST_OUTSTANDING.value
+
+    @classmethod
+    def priority_mode(cls) -> str:
+        """Return the default mode to pick the next task among tasks of any priority ("strict")."""
+        return PriorityMode.STRICT.value
+
+    @classmethod
+    def queues(cls) -> str:
+        """Return the default queues to consume tasks from ("default", without limit)."""
+        return DEFAULT_QUEUE
+
     @classmethod
     def poll_interval_s(cls) -> float:
-        """Return the time in seconds to poll for next task."""
-        return 0.01
+        """Return the maximum time in seconds to block while waiting for the next task."""
+        return Config.poll_interval_s()
 
 
 class WorkerManager(BaseWorker):
@@ -118,23 +163,49 @@ class WorkerManager(BaseWorker):
         concurrency_type: ConcurrencyType,
         worker_rate_limit: int,
         poll_interval_s: float,
+        dispatch_strategy: DispatchStrategy,
+        priority_mode: PriorityMode = Defaults.priority_mode(),
+        queues: t.Optional[dict[str, t.Optional[int]]] = None,
     ) -> None:
         self.pubsub: IPubSub = PubSub.get(url=Config.broker_url(), poll_interval_s=poll_interval_s)
+        # The concurrency limit of each queue to consume tasks from, by queue name
+        self.queues: dict[str, t.Optional[int]] = queues or {DEFAULT_QUEUE: None}
+        self.queue_loads = QueueLoads(limits=list(self.queues.values()))
         self.concurrency_manager: IConcurrencyManager = ConcurrencyManagerSingleton.get(
             concurrency_type=concurrency_type,
             concurrency=concurrency,
         )
+        self.grunt_worker_loads = GruntWorkerLoads(size=self.concurrency_manager.concurrency)
+        self.dispatcher: IDispatcher = Dispatcher.get(
+            strategy=dispatch_strategy,
+            loads=self.grunt_worker_loads,
+        )
         self._worker_rate_limit = worker_rate_limit
         self._poll_interval_s = poll_interval_s
+        self._priority_mode = priority_mode
+        self._ipc_broker: t.Optional[IpcBroker] = None
         super().__init__(app_import_path=app_import_path)
 
     async def _pre_run(self):
+        broker_url = Config.broker_url()
+        if broker_url.startswith("ipc://"):
+            # We host the broker ourselves, so it must be up before any grunt worker connects
+            self._ipc_broker = IpcBroker(path=get_ipc_path(broker_url))
+            await self._ipc_broker.start()
         self._logger.info("Starting %s back workers", self.concurrency_manager.concurrency)
         self._start_grunt_workers()
+        # Only start passing tasks once all grunt workers have reported in
+        while not self.grunt_worker_loads.all_registered():
+            await asyncio.sleep(0.01)
         loop = asyncio.get_event_loop()
         loop.add_signal_handler(signal.SIGTERM, self._sigterm_handler)
         loop.add_signal_handler(signal.SIGINT, self._sigint_handler)
 
+    async def _post_run(self):
+        if self._ipc_broker is not None:
+            # Don't leave the socket file behind
+            await self._ipc_broker.close()
+
     def _sigterm_handler(self):
         # pylint: disable=no-member
         self._logger.debug("Handling signal %s (%s)", signal.SIGTERM.value, signal.SIGTERM.name)
@@ -154,23 +225,60 @@ class WorkerManager(BaseWorker):
     async def _main_loop(self):
         self._logger.info("[%s] Started main loop", self._pid)
 
+        queues: list[str] = list(self.queues)
+        buffer = QueueBuffer(
+            channel=Constants.tasks_channel(), queues=queues, mode=self._priority_mode
+        )
         async with self.pubsub as pubsub:  # pylint: disable=not-async-context-manager
-            counter = -1
-            await pubsub.subscribe(Constants.tasks_channel())
-            while True:
-                self._logger.debug("[%s] Polling for a new task until it's available", self._pid)
-                message = await pubsub.poll()
+            # Keep the tasks in the broker until passed to a grunt worker, if it keeps them
+            await buffer.subscribe(pubsub, ack_late=True)
+            # Leave the tasks the grunt workers have no room for in the broker, if it keeps them
+            max_size: t.Optional[int] = (
+                self.grunt_worker_loads.total_capacity() if pubsub.retains_messages else None
+            )
+            receiving: "asyncio.Task[None]" = asyncio.create_task(
+                buffer.receive_forever(pubsub, max_size=max_size)
+            )
+            # Publish the delayed tasks as they become due, see `aiotaskq.scheduler`, unless
+            # we host the broker, in which case there may be no Redis to schedule them
+            promoting: t.Optional["asyncio.Task[None]"] = (
+                asyncio.create_task(Scheduler.promote_forever(queues))
+                if self._ipc_broker is None
+                else None
+            )
+            while not receiving.done():
+                # Keep the tasks buffered until a grunt worker has room for them, so that the
+                # tasks of higher priority received in the meantime are passed first
+                await self.grunt_worker_loads.wait_for_capacity()
+                self._logger.debug("[%s] Waiting for a new task until it's available", self._pid)
+                queue_index, priority, message = await buffer.get(
+                    has_capacity=self.queue_loads.has_capacity,
+                    released=self.queue_loads.wait_for_release,
+                )
 
                 # A new task is now available
                 # Pass the task to one of the workers worker
-                counter = (counter + 1) % len(self.concurrency_manager.processes)
-                selected_grunt_worker_pid = self.concurrency_manager.processes[counter].pid
-                channel: str = self._get_child_worker_tasks_channel(pid=selected_grunt_worker_pid)
+                index: int = self.dispatcher.select()
+                selected_grunt_worker_pid = self.grunt_worker_loads.pid(index)
+                channel: str = get_priority_channel(
+                    get_queue_channel(
+                        queues[queue_index],
+                        channel=self._get_child_worker_tasks_channel(pid=selected_grunt_worker_pid),
+                    ),
+                    priority,
+                )
                 self._logger.debug(
                     "[%s] Passing task to %sth child worker [message=%s, channel=%s]",
-                    *(self._pid, counter, message, channel),
+                    *(self._pid, index, message["data"], channel),
                 )
+                self.grunt_worker_loads.add_outstanding(index)
+                self.queue_loads.add_outstanding(queue_index)
                 await pubsub.publish(channel=channel, message=message["data"])
+                await pubsub.ack(message)
+            if promoting is not None:
+                promoting.cancel()
+            # Surface the error that stopped receiving tasks
+            receiving.result()
 
     def _start_grunt_workers(self):
         def _run_grunt_worker_forever():
@@ -178,6 +286,10 @@ class WorkerManager(BaseWorker):
                 app_import_path=self.app.__name__,
                 poll_interval_s=self._poll_interval_s,
                 worker_rate_limit=self._worker_rate_limit,
+                loads=self.grunt_worker_loads,
+                priority_mode=self._priority_mode,
+                queues=list(self.queues),
+                queue_loads=self.queue_loads,
             )
             grunt_worker.run_forever()
 
@@ -192,59 +304,103 @@ class GruntWorker(BaseWorker):
     will be published to the user via IPubSub.
     """
 
-    def __init__(self, app_import_path: str, poll_interval_s: float, worker_rate_limit: int):
+    def __init__(
+        self,
+        app_import_path: str,
+        poll_interval_s: float,
+        worker_rate_limit: int,
+        loads: t.Optional[GruntWorkerLoads] = None,
+        priority_mode: PriorityMode = Defaults.priority_mode(),
+        queues: t.Optional[list[str]] = None,
+        queue_loads: t.Optional[QueueLoads] = None,
+    ):
         self.pubsub: IPubSub = PubSub.get(url=Config.broker_url(), poll_interval_s=poll_interval_s)
         self._worker_rate_limit = worker_rate_limit
+        self._loads = loads
+        self._priority_mode = priority_mode
+        self._queues: list[str] = queues or [DEFAULT_QUEUE]
+        self._queue_loads = queue_loads
+        self._loads_index: t.Optional[int] = None
         super().__init__(app_import_path=app_import_path)
 
     async def _pre_run(self):
-        pass
+        # The app has imported, and thus registered, all its tasks by now
+        TaskRegistry.freeze()
+
+    @property
+    def _batch_size(self) -> int:
+        return self._worker_rate_limit if self._worker_rate_limit != -1 else 99
 
     async def _main_loop(self):
         self._logger.debug("[%s] Started main loop", self._pid)
         channel: str = self._get_child_worker_tasks_channel(pid=self._pid)
-        batch_size = self._worker_rate_limit if self._worker_rate_limit != -1 else 99
+        batch_size = self._batch_size
         semaphore: asyncio.Semaphore | None = None
 
         # We only need to rate-limit the incoming tasks with batch size if batch_size is provided
         if batch_size != Defaults.worker_rate_limit():
             semaphore = asyncio.Semaphore(batch_size)
 
+        buffer = QueueBuffer(channel=channel, queues=self._queues, mode=self._priority_mode)
         async with self.pubsub as pubsub:  # pylint: disable=not-async-context-manager
-            await pubsub.subscribe(channel=channel)
-            while True:
+            await buffer.subscribe(pubsub)
+            # Report in only once subscribed, so that no task passed to us can be missed
+            if self._loads is not None:
+                self._loads_index = self._loads.register(pid=self._pid, capacity=batch_size)
+            receiving: "asyncio.Task[None]" = asyncio.create_task(buffer.receive_forever(pubsub))
+            while not receiving.done():
 
                 if semaphore is not None:
                     await semaphore.acquire()
 
                 self._logger.debug(
-                    "[%s] Polling for a new task from manager until it's available [channel=%s]",
+                    "[%s] Waiting for a new task from manager until it's available [channel=%s]",
                     *(self._pid, channel),
                 )
-                message = await pubsub.poll()
+                queue_index, priority, message = await buffer.get()
+                task_serialized = message["data"]
 
                 # A new task is now available
                 self._logger.debug(
-                    "[%s] Received task to from main worker [message=%s, channel=%s]",
-                    *(self._pid, message, channel),
+                    "[%s] Received task to from main worker [message=%s, priority=%s]",
+                    *(self._pid, task_serialized, priority),
                 )
-                task_serialized: str = message["data"]
-                task: "Task" = Serialization.deserialize(Task, task_serialized)
 
                 # Fire and forget: execute the task and publish result
-                task_asyncio: "asyncio.Task" = self._execute_task_and_publish(
-                    pubsub=pubsub,
-                    task=task,
-                    semaphore=semaphore,
+                task_asyncio: "asyncio.Task" = asyncio.create_task(
+                    self._execute_task_and_publish(
+                        pubsub=pubsub,
+                        task_serialized=task_serialized,
+                        semaphore=semaphore,
+                    )
                 )
-                asyncio.create_task(task_asyncio)
+                if self._queue_loads is not None:
+                    task_asyncio.add_done_callback(
+                        functools.partial(self._release_queue, queue_index=queue_index)
+                    )
+            # Surface the error that stopped receiving tasks
+            receiving.result()
 
     async def _execute_task_and_publish(
         self,
         pubsub: IPubSub,
-        task: "Task",
+        task_serialized: bytes,
         semaphore: t.Optional["asyncio.Semaphore"],
     ):
+        task: t.Optional["Task"] = None
+        try:
+            task = await self._get_task(pubsub=pubsub, task_serialized=task_serialized)
+        finally:
+            # Nothing else would give the room taken by a task that can't be decoded back
+            if task is None:
+                self._release(semaphore=semaphore)
+        if task is None:
+            return
+
+        if await self._skip_execution(pubsub=pubsub, task=task):
+            self._release(semaphore=semaphore)
+            return
+
         self._logger.debug(
             "[%s] Executing task %s(*%s, **%s)",
             *(self._pid, task.id, task.args, task.kwargs),
@@ -252,41 +408,41 @@ class GruntWorker(BaseWorker):
 
         retry = False
         error = None
-        retries: int = None
         retry_max: int | None = None
         task_result: t.Any = None
+        args, kwargs = task.args, task.kwargs
+        attached: AttachedSegments = []
+        if task.shared_memory:
+            # Map the big buffer arguments without copying them, keeping the handles in the task
+            # itself in case it's retried
+            args, kwargs, attached = SharedMemoryArgs.attach(task.args, task.kwargs)
         try:
-            if inspect.iscoroutinefunction(task.func):
-                task_result = await task(*task.args, **task.kwargs)
-            else:
-                task_result = task(*task.args, **task.kwargs)
+            task_result = await self._execute(pubsub=pubsub, task=task, args=args, kwargs=kwargs)
         except Exception as e:  # pylint: disable=broad-except
             error = e
-            if task.retry is not None:
+            # The items streamed so far can't be taken back
+            if task.retry is not None and task.stream_window is None:
                 retry_max = task.retry["max_retries"]
-                if isinstance(e, task.retry["on"]):
-                    retry = True
-                    # Set retry to 0 if first time
-                    async with redis.from_url(url=Config.broker_url()) as redis_client:
-                        if await redis_client.get(f"retry:{task.id}") is None:
-                            await redis_client.set(f"retry:{task.id}", 0)
+                retry = isinstance(e, task.retry["on"])
 
         finally:
+            del args, kwargs
+            SharedMemoryArgs.detach(attached)
+
             # Retry if still within retry limit
-            if retry:
-                async with redis.from_url(url=Config.broker_url()) as redis_client:
-                    retries = int(await redis_client.get(f"retry:{task.id}"))
-                    if retry_max is not None and retries < retry_max:
-                        retries += 1
-                        logger.debug(
-                            "Task %s[%s] failed on exception %s, will retry (%s/%s)",
-                            *(task.__qualname__, task.id, error, retries, retry_max),
-                        )
-                        asyncio.create_task(task.publish())
-                        await redis_client.set(f"retry:{task.id}", retries)
-                        if semaphore is not None:
-                            semaphore.release()
-                        return  # pylint: disable=lost-exception
+            if retry and retry_max is not None and task.retries < retry_max:
+                # The number of retries so far travels with the task itself
+                task.retries += 1
+                logger.debug(
+                    "Task %s[%s] failed on exception %s, will retry (%s/%s)",
+                    *(task.__qualname__, task.id, error, task.retries, retry_max),
+                )
+                if task.retry.get("countdown_s"):
+                    # Schedule the retry rather than publishing it right away
+                    task.eta = time.time() + task.retry["countdown_s"]
+                asyncio.create_task(task.publish())
+                self._release(semaphore=semaphore)
+                return  # pylint: disable=lost-exception
 
             if error:
                 # Publish error
@@ -299,12 +455,152 @@ class GruntWorker(BaseWorker):
                     *(self._pid, task.id, task.args, task.kwargs),
                 )
                 result = AsyncResult(task_id=task.id, ready=True, result=task_result, error=None)
-            task_serialized = Serialization.serialize(obj=result)
-            result_channel = Constants.results_channel_template().format(task_id=task.id)
-            await pubsub.publish(channel=result_channel, message=task_serialized)
+                if task.cache is not None:
+                    await ResultCache.store(task=task, result=result)
+            # Report the task done before its caller gets the result, so that its next calls are
+            # not passed to this worker as if it was still busy
+            self._release(semaphore=semaphore)
+            await self._publish_result(pubsub=pubsub, task=task, result=result)
+
+    async def _skip_execution(self, pubsub: IPubSub, task: "Task") -> bool:
+        """
+        Publish the cached result of the task, or defer it over its rate limit, if need be, and
+        return whether it's not to be executed now.
+        """
+        if task.cache is not None:
+            cached: t.Optional[AsyncResult] = await ResultCache.lookup(task)
+            if cached is not None:
+                self._logger.debug("[%s] Publishing cached result of task %s", self._pid, task.id)
+                await self._publish_result(pubsub=pubsub, task=task, result=cached)
+                return True
+        return task.rate_limit is not None and await self._defer_over_rate_limit(task)
+
+    async def _defer_over_rate_limit(self, task: "Task") -> bool:
+        """
+        Take the rate limit tokens needed to execute the task now, or defer it until the tokens it
+        reserved are due, and return whether it's deferred.
+        """
+        if task.rate_limit_reserved:
+            # The tokens were reserved when the task was deferred, and its retries need new ones
+            task.rate_limit_reserved = False
+            return False
+        defer_s: float = await RateLimiter.acquire(task)
+        if defer_s <= 0:
+            return False
+        self._logger.debug(
+            "[%s] Deferring task %s by %ss over its rate limit %s",
+            *(self._pid, task.id, defer_s, task.rate_limit),
+        )
+        task.rate_limit_reserved = True
+        task.eta = time.time() + defer_s
+        await task.publish()
+        return True
+
+    async def _execute(self, pubsub: IPubSub, task: "Task", args: tuple, kwargs: dict) -> t.Any:
+        """Execute the task the way it was called, and return its result."""
+        if task.chunked:
+            return await execute_chunk(task=task, items=args)
+        if task.stream_window is not None:
+            await self._stream_items(pubsub=pubsub, task=task, items=task(*args, **kwargs))
+            return None
+        if is_generator_function(task.func):
+            # Not called via `Task.stream`, so return all the items at once
+            return [item async for item in iterate(task(*args, **kwargs))]
+        if inspect.iscoroutinefunction(task.func):
+            return await task(*args, **kwargs)
+        return task(*args, **kwargs)
+
+    async def _stream_items(
+        self, pubsub: IPubSub, task: "Task", items: t.Iterator | t.AsyncIterator
+    ) -> None:
+        """Publish every item yielded by the task as a frame, as the caller consumes them."""
+        assert task.stream_window is not None
+        credits_ = StreamCredits(task_id=task.id, window=task.stream_window)
+        async with credits_ as stream_credits, contextlib.aclosing(iterate(items)) as items_:
+            async for item in items_:
+                if not await stream_credits.acquire():
+                    self._logger.debug("[%s] Stopping stream of task %s", self._pid, task.id)
+                    break
+                frame = AsyncResult(task_id=task.id, ready=False, result=item, error=None)
+                await self._publish_result(pubsub=pubsub, task=task, result=frame)
+
+    async def _publish_result(self, pubsub: IPubSub, task: "Task", result: AsyncResult) -> None:
+        """Store the result in the result backend and/or publish it to the caller."""
+        if task.workflow is not None and result.ready:
+            # Only the final result of the workflow is delivered to its caller
+            final_result: t.Optional[AsyncResult] = await advance_workflow(task=task, result=result)
+            if final_result is None:
+                return
+            result = final_result
+        # The result is compressed the same way as the task that produced it
+        result_serialized = Serialization.serialize(obj=result, compression_type=task.compression)
+        await self._deliver_result(
+            pubsub=pubsub,
+            envelope=task.envelope,
+            result_serialized=result_serialized,
+        )
 
-            if semaphore is not None:
-                semaphore.release()
+    async def _deliver_result(
+        self, pubsub: IPubSub, envelope: TaskEnvelope, result_serialized: bytes
+    ) -> None:
+        """Store the serialized result and/or publish it to the caller, per the envelope."""
+        if envelope["store_result"]:
+            try:
+                await ResultBackend.get().store(
+                    task_id=envelope["task_id"], message=result_serialized
+                )
+            except ResultBackendNotConfigured:
+                self._logger.exception(
+                    "[%s] Can't store result of task %s", self._pid, envelope["task_id"]
+                )
+            if envelope["reply_to"] is None:
+                # Nobody is waiting for it on a channel
+                return
+        result_channel = envelope["reply_to"] or Constants.results_channel_template().format(
+            task_id=envelope["task_id"]
+        )
+        await pubsub.publish(
+            channel=result_channel, message=await ClaimCheck.offload(result_serialized)
+        )
+
+    async def _get_task(self, pubsub: IPubSub, task_serialized: bytes) -> t.Optional["Task"]:
+        """
+        Return the task, fetching its body from the blob store only now if it was offloaded.
+
+        If the task can't be decoded, e.g. it's not registered or its body has expired, publish the
+        error to its caller if its envelope can be decoded, and return None.
+        """
+        try:
+            return Serialization.deserialize(Task, await ClaimCheck.resolve(task_serialized))
+        except Exception as exc:  # pylint: disable=broad-except
+            envelope: t.Optional[TaskEnvelope] = ClaimCheck.get_envelope(
+                task_serialized
+            ) or Serialization.get_envelope(task_serialized)
+            if envelope is None:
+                self._logger.exception("[%s] Dropping task that can't be decoded", self._pid)
+                return None
+            self._logger.exception(
+                "[%s] Failing task %s that can't be decoded", self._pid, envelope["task_id"]
+            )
+            result = AsyncResult(task_id=envelope["task_id"], ready=True, result=None, error=exc)
+            await self._deliver_result(
+                pubsub=pubsub,
+                envelope=envelope,
+                result_serialized=Serialization.serialize(obj=result),
+            )
+            return None
+
+    def _release_queue(self, _: "asyncio.Task", queue_index: int) -> None:
+        """Report the task of the queue at the given index done to the WorkerManager."""
+        assert self._queue_loads is not None
+        self._queue_loads.remove_outstanding(index=queue_index)
+
+    def _release(self, semaphore: t.Optional["asyncio.Semaphore"]) -> None:
+        """Release the resources held by a task once done, and report it to the WorkerManager."""
+        if semaphore is not None:
+            semaphore.release()
+        if self._loads is not None and self._loads_index is not None:
+            self._loads.remove_outstanding(index=self._loads_index)
 
 
 def validate_input(app_import_path: str) -> t.Optional[str]:
@@ -326,12 +622,20 @@ def run_worker_forever(
     concurrency_type: ConcurrencyType,
     worker_rate_limit: int,
     poll_interval_s: float,
+    dispatch_strategy: DispatchStrategy = Defaults.dispatch_strategy(),
+    priority_mode: PriorityMode = Defaults.priority_mode(),
+    queues: str = Defaults.queues(),
 ) -> None:
     """Run the worker manager in a forever loop, and let it spawn and manage the workers."""
     err_msg: t.Optional[str] = validate_input(app_import_path=app_import_path)
     if err_msg:
         print(err_msg)
         sys.exit(1)
+    try:
+        queue_limits: dict[str, t.Optional[int]] = parse_queues(queues)
+    except InvalidArgument as exc:
+        print(f"Error at argument `--queues {queues}`: {exc}")
+        sys.exit(1)
 
     try:
         worker_manager = WorkerManager(
@@ -340,6 +644,9 @@ def run_worker_forever(
             concurrency_type=concurrency_type,
             worker_rate_limit=worker_rate_limit,
             poll_interval_s=poll_interval_s,
+            dispatch_strategy=dispatch_strategy,
+            priority_mode=priority_mode,
+            queues=queue_limits,
         )
         worker_manager.run_forever()
     except asyncio.CancelledError:
@@ -0,0 +1,308 @@
+"""
+Define workflows of tasks, which are run by the workers without going through the caller.
+
+A workflow is a sequence of stages, each being either a single step, i.e. a call to a task, or a
+group of steps executed in parallel. It's composed with `chain`, `group` and `chord`, e.g.:
+
+```python
+workflow = chain(
+    task_1.s(1),
+    group(*[task_2.s(i) for i in range(5)]),
+    chord([task_3.s(i) for i in range(3)], task_4.s()),
+)
+result = await workflow.apply_async()
+```
+
+The stages of the workflow after the first one are stored once in a Redis hash, and the message
+of each of its tasks only carries the id of the workflow and the position of the task in it. The
+worker executing a step publishes the next stage itself, with the result of the step prepended to
+the arguments of each of the next steps. The results of a group are gathered in a Redis hash, and
+only the worker completing it moves on to the next stage with the list of the results. Only the
+final result of the workflow, or its first error, is delivered back to the caller.
+"""
+
+import typing as t
+
+from .config import Config
+from .constants import Constants
+from .exceptions import InvalidArgument, TaskNotRegistered, WorkflowNotFound
+from .inbox import ResultInbox
+from .interfaces import WorkflowStage, WorkflowState, WorkflowStep
+from .pubsub import RedisConnectionPools
+from .registry import TaskRegistry
+from .result_backend import AsyncResultHandle, ResultBackend
+from .routing import publish_tasks
+
+if t.TYPE_CHECKING:
+    from .task import AsyncResult, Task
+
+RT = t.TypeVar("RT")
+
+# Gather the result of a step of a group, and return all the results once they're all gathered
+# KEYS: fan-in key
+# ARGV: index of the step, result, number of steps, ttl in seconds
+_FAN_IN_SCRIPT = """
+redis.call("HSET", KEYS[1], ARGV[1], ARGV[2])
+redis.call("EXPIRE", KEYS[1], ARGV[4])
+if redis.call("HLEN", KEYS[1]) < tonumber(ARGV[3]) then
+    return nil
+end
+local results = redis.call("HGETALL", KEYS[1])
+redis.call("DEL", KEYS[1])
+return results
+"""
+
+
+class Signature(t.Generic[RT]):
+    """Define a call to a task as a step of a workflow, see `Task.s` and `Task.si`."""
+
+    def __init__(
+        self, task: "Task[t.Any, RT]", args: tuple, kwargs: dict, immutable: bool = False
+    ) -> None:
+        """Store the task and the arguments of the call."""
+        self.task = task
+        self.args = args
+        self.kwargs = kwargs
+        self.immutable = immutable
+
+    def to_step(self) -> WorkflowStep:
+        """Return the step as carried in the task messages."""
+        return {
+            "module": self.task.__module__,
+            "qualname": self.task.__qualname__,
+            "args": list(self.args),
+            "kwargs": self.kwargs,
+            "immutable": self.immutable,
+        }
+
+
+class Workflow:
+    """Define a workflow as a sequence of stages, see `chain`, `group` and `chord`."""
+
+    def __init__(self, stages: list[list[Signature]], groups: list[bool]) -> None:
+        """Store the steps of each stage, and whether each stage is a group."""
+        self.stages = stages
+        self.groups = groups
+
+    async def apply_async(self) -> t.Any:
+        """Run the workflow on the workers, and return its result or raise its first error."""
+        inbox: ResultInbox = await ResultInbox.get()
+        workflow_id: str = self.stages[0][0].task.generate_task_id()
+        future = inbox.expect(workflow_id)
+        try:
+            await self._start(workflow_id, reply_to=inbox.channel)
+            result: AsyncResult = await future
+        finally:
+            inbox.discard(workflow_id)
+        if result.error is not None:
+            raise result.error
+        return result.result
+
+    async def send(self) -> AsyncResultHandle:
+        """Run the workflow on the workers, and return a handle to its result like `Task.send`."""
+        # Raise error if no result backend is configured, before publishing anything
+        ResultBackend.get()
+        workflow_id: str = self.stages[0][0].task.generate_task_id()
+        await self._start(workflow_id, reply_to=None, store_result=True)
+        return AsyncResultHandle(task_id=workflow_id)
+
+    async def _start(
+        self, workflow_id: str, reply_to: t.Optional[str], store_result: bool = False
+    ) -> None:
+        stages: list[WorkflowStage] = [
+            {"steps": [signature.to_step() for signature in stage], "group": is_group}
+            for stage, is_group in zip(self.stages, self.groups)
+        ]
+        if len(stages) > 1:
+            # The workers publish the next stages themselves
+            await _store_stages(workflow_id, stages)
+        await publish_stage(
+            workflow_id,
+            stages[0],
+            stage=0,
+            num_stages=len(stages),
+            previous=None,
+            reply_to=reply_to,
+            store_result=store_result,
+        )
+
+
+def chain(*steps: Signature | Workflow) -> Workflow:
+    """
+    Return the workflow running the given steps, groups or workflows one after the other.
+
+    Each one receives the result of the previous one as its first argument.
+    """
+    if not steps:
+        raise InvalidArgument("A chain needs at least one step")
+    stages: list[list[Signature]] = []
+    groups: list[bool] = []
+    for step in steps:
+        if isinstance(step, Workflow):
+            stages.extend(step.stages)
+            groups.extend(step.groups)
+        else:
+            stages.append([step])
+            groups.append(False)
+    return Workflow(stages=stages, groups=groups)
+
+
+def group(*signatures: Signature) -> Workflow:
+    """Return the workflow running the given steps in parallel, whose result is their results."""
+    if not signatures:
+        raise InvalidArgument("A group needs at least one step")
+    return Workflow(stages=[list(signatures)], groups=[True])
+
+
+def chord(header: t.Iterable[Signature] | Workflow, body: Signature | Workflow) -> Workflow:
+    """Return the workflow running the header steps in parallel, then the body on their results."""
+    if not isinstance(header, Workflow):
+        header = group(*header)
+    return chain(header, body)
+
+
+async def publish_stage(
+    workflow_id: str,
+    stage_: WorkflowStage,
+    stage: int,
+    num_stages: int,
+    previous: t.Any,
+    reply_to: t.Optional[str],
+    store_result: bool = False,
+) -> None:
+    """
+    Publish the tasks of the given stage of the workflow, called with the result of the previous
+    stage unless it's the first one.
+
+    Raise `InvalidArgument` or `TaskNotRegistered` before publishing anything if a step is invalid.
+    """
+    tasks: list["Task"] = []
+    step: WorkflowStep
+    for index, step in enumerate(stage_["steps"]):
+        args: tuple = tuple(step["args"])
+        if stage > 0 and not step["immutable"]:
+            args = (previous, *args)
+        task = TaskRegistry.get(step["module"], step["qualname"])
+        task_ = task._bind_call(args, step["kwargs"])  # pylint: disable=protected-access
+        task_.id = task_.generate_task_id()
+        task_.reply_to = reply_to
+        task_.store_result = store_result
+        task_.workflow = {
+            "id": workflow_id,
+            "stage": stage,
+            "index": index,
+            "size": len(stage_["steps"]),
+            "group": stage_["group"],
+            "stages": num_stages,
+        }
+        tasks.append(task_)
+    await publish_tasks(tasks)
+
+
+async def advance_workflow(task: "Task", result: "AsyncResult") -> t.Optional["AsyncResult"]:
+    """
+    Move the workflow of the task on now that the task is done, with the given result.
+
+    Return the final result of the workflow to deliver to its caller, if it's done or failed.
+    """
+    # pylint: disable=import-outside-toplevel
+    from .task import AsyncResult as AsyncResultClass
+
+    state: t.Optional[WorkflowState] = task.workflow
+    assert state is not None
+    if result.error is not None:
+        await _forget_stages(state)
+        return AsyncResultClass(task_id=state["id"], ready=True, result=None, error=result.error)
+
+    stage_result: t.Any = result.result
+    if state["group"]:
+        gathered: t.Optional[list[t.Any]] = await _fan_in(state=state, result=result)
+        if gathered is None:
+            # Other steps of the group are still running
+            return None
+        stage_result = gathered
+
+    next_stage: int = state["stage"] + 1
+    if next_stage == state["stages"]:
+        await _forget_stages(state)
+        return AsyncResultClass(task_id=state["id"], ready=True, result=stage_result, error=None)
+    try:
+        await publish_stage(
+            state["id"],
+            await _load_stage(state["id"], stage=next_stage),
+            stage=next_stage,
+            num_stages=state["stages"],
+            previous=stage_result,
+            reply_to=task.reply_to,
+            store_result=task.store_result,
+        )
+    except (InvalidArgument, TaskNotRegistered, WorkflowNotFound) as exc:
+        return AsyncResultClass(task_id=state["id"], ready=True, result=None, error=exc)
+    return None
+
+
+async def _store_stages(workflow_id: str, stages: list[WorkflowStage]) -> None:
+    """Store the stages of the workflow but the first one, for the workers to publish them."""
+    # pylint: disable=import-outside-toplevel
+    from .serde import Serialization
+    from .task import AsyncResult as AsyncResultClass
+
+    key: str = Constants.workflow_key_template().format(workflow_id=workflow_id)
+    mapping: dict[str, bytes] = {
+        # Serialized like results, since the arguments of the steps may be of any type
+        str(stage): Serialization.serialize(
+            AsyncResultClass(task_id=workflow_id, ready=True, result=stage_, error=None)
+        )
+        for stage, stage_ in enumerate(stages)
+        if stage > 0
+    }
+    client = RedisConnectionPools.get_client(url=Config.workflow_url())
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, Config.result_ttl_s())
+        await pipe.execute()
+
+
+async def _load_stage(workflow_id: str, stage: int) -> WorkflowStage:
+    """Return the given stage of the workflow, or raise `WorkflowNotFound` if it has expired."""
+    # pylint: disable=import-outside-toplevel
+    from .serde import Serialization
+    from .task import AsyncResult as AsyncResultClass
+
+    key: str = Constants.workflow_key_template().format(workflow_id=workflow_id)
+    client = RedisConnectionPools.get_client(url=Config.workflow_url())
+    message: t.Optional[bytes] = await client.hget(key, str(stage))
+    if message is None:
+        raise WorkflowNotFound(f'Workflow "{workflow_id}" is not found, it may have expired.')
+    stage_: WorkflowStage = Serialization.deserialize(AsyncResultClass, message).result
+    return stage_
+
+
+async def _forget_stages(state: WorkflowState) -> None:
+    """Delete the stages of the workflow once it's done or failed."""
+    if state["stages"] > 1:
+        key: str = Constants.workflow_key_template().format(workflow_id=state["id"])
+        await RedisConnectionPools.get_client(url=Config.workflow_url()).delete(key)
+
+
+async def _fan_in(state: WorkflowState, result: "AsyncResult") -> t.Optional[list[t.Any]]:
+    """Gather the result of a step of a group, and return all the results once all are gathered."""
+    # pylint: disable=import-outside-toplevel
+    from .serde import Serialization
+    from .task import AsyncResult as AsyncResultClass
+
+    size: int = state["size"]
+    client = RedisConnectionPools.get_client(url=Config.workflow_url())
+    gathered: t.Optional[list[bytes]] = await client.register_script(_FAN_IN_SCRIPT)(
+        keys=[
+            Constants.fan_in_key_template().format(workflow_id=state["id"], stage=state["stage"])
+        ],
+        args=[state["index"], Serialization.serialize(result), size, Config.result_ttl_s()],
+    )
+    if gathered is None:
+        return None
+    messages: dict[bytes, bytes] = dict(zip(gathered[::2], gathered[1::2]))
+    return [
+        Serialization.deserialize(AsyncResultClass, messages[str(index).encode()]).result
+        for index in range(size)
+    ]
@@ -1,6 +1,8 @@
 import asyncio
 import logging
 import os
+import time
+import typing as t
 
 import aiotaskq
 
@@ -101,6 +103,13 @@ async def wait(t_s: int) -> int:
     return t_s
 
 
+@aiotaskq.task()
+def block(t_s: float) -> float:
+    """Block the whole worker process for `t_s` seconds."""
+    time.sleep(t_s)
+    return t_s
+
+
 @aiotaskq.task()
 def add(x: int, y: int) -> int:
     return x + y
@@ -116,6 +125,57 @@ def join(ls: list, delimiter: str = ",") -> str:
     return delimiter.join([str(x) for x in ls])
 
 
+@aiotaskq.task(options={"shared_memory": True})
+def checksum(data: bytes, rows: memoryview) -> list[int]:
+    """Return the sum of `data` followed by the sum of each row of `rows`."""
+    return [sum(data)] + [sum(row) for row in rows.tolist()]
+
+
+@aiotaskq.task(options={"cache": {"ttl_s": 60, "namespace": "simple_app"}})
+def cached_power(filename: str, a: int, b: int = 1) -> int:
+    """Return `a**b`, appending the pid to `filename` on every actual execution."""
+    _append_pid_to_file(filename)
+    return a**b
+
+
+@aiotaskq.task(options={"single_flight": True})
+async def single_flight_wait(filename: str, t_s: float) -> float:
+    """Wait for `t_s` seconds, appending the pid to `filename` on every actual execution."""
+    _append_pid_to_file(filename)
+    await asyncio.sleep(t_s)
+    return t_s
+
+
+@aiotaskq.task()
+def count(n: int, fail_at: int | None = None) -> t.Iterator[int]:
+    """Yield the numbers from 0 to `n - 1`, raising `SomeException` at `fail_at` if provided."""
+    for i in range(n):
+        if i == fail_at:
+            raise SomeException(f"Failed at {i}")
+        yield i
+
+
+@aiotaskq.task()
+async def count_to_file(filename: str, n: int) -> t.AsyncIterator[int]:
+    """Yield the numbers from 0 to `n - 1`, appending each of them to `filename` once yielded."""
+    for i in range(n):
+        yield i
+        with open(filename, mode="a", encoding="utf-8") as fo:
+            fo.write(f"{i}\n")
+        await asyncio.sleep(0)
+
+
+@aiotaskq.task()
+def write_line(filename: str, line: str) -> None:
+    with open(filename, mode="a", encoding="utf-8") as fo:
+        fo.write(f"{line}\n")
+
+
+@aiotaskq.task(options={"schedule": {"every_s": 0.2, "kwargs": {"x": 1, "y": 2}}})
+def add_periodically(x: int, y: int) -> int:
+    return x + y
+
+
 @aiotaskq.task()
 def some_task(b: int) -> int:
     # Some task with high cpu usage
@@ -127,6 +187,11 @@ def some_task(b: int) -> int:
     return _naive_fib(b)
 
 
+@aiotaskq.task(options={"rate_limit": "5/s"})
+def add_rate_limited(x: int, y: int) -> int:
+    return x + y
+
+
 if __name__ == "__main__":  # pragma: no cover
     from asyncio import get_event_loop
 
@@ -0,0 +1,63 @@
+"""
+Benchmark the client-side overhead of preparing an individual call to a task.
+
+Compare the previous way, i.e. `copy.deepcopy` of the task and `inspect.signature` on every call,
+with the current way, i.e. a shallow copy and a signature computed once per task.
+
+Usage (from the `src` directory, no redis needed)::
+
+    python -m tests.benchmarks.bench_apply_async_overhead --calls 100000
+"""
+
+import argparse
+import copy
+import inspect
+import logging
+import time
+
+from aiotaskq.serde import Serialization
+from aiotaskq.task import Task
+from tests.apps import simple_app
+
+
+def _prepare_before(task: Task, *task_args, **task_kwargs) -> Task:
+    inspect.signature(task.func).bind(*task_args, **task_kwargs)
+    task_ = copy.deepcopy(task)
+    task_.args, task_.kwargs, task_.id = task_args, task_kwargs, task_.generate_task_id()
+    return task_
+
+
+def _prepare_after(task: Task, *task_args, **task_kwargs) -> Task:
+    # pylint: disable=protected-access
+    task._validate_arguments(task_args=task_args, task_kwargs=task_kwargs)
+    task_ = task._copy()
+    task_.args, task_.kwargs, task_.id = task_args, task_kwargs, task_.generate_task_id()
+    return task_
+
+
+def main(calls: int) -> None:
+    """Prepare and serialize `calls` calls of a tiny task with retry options both ways."""
+    task = simple_app.add.with_retry(max_retries=3, on=(ValueError, KeyError))
+    for name, prepare in (("before", _prepare_before), ("after", _prepare_after)):
+        t_0 = time.perf_counter()
+        for x in range(calls):
+            prepare(task, x, y=1)
+        dt_prepare = time.perf_counter() - t_0
+
+        t_0 = time.perf_counter()
+        for x in range(calls):
+            Serialization.serialize(prepare(task, x, y=1))
+        dt_total = time.perf_counter() - t_0
+
+        print(
+            f"{name:<7} prepare: {calls / dt_prepare:>9.0f} calls/s  "
+            f"prepare + serialize: {calls / dt_total:>9.0f} calls/s"
+        )
+
+
+if __name__ == "__main__":
+    logging.disable(logging.DEBUG)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+    main(calls=args.calls)
@@ -0,0 +1,47 @@
+"""
+Benchmark `Task.apply_many` against `asyncio.gather` over many `Task.apply_async`.
+
+Usage (from the `src` directory, with redis running)::
+
+    python -m tests.benchmarks.bench_apply_many --calls 10000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture
+
+
+async def main(calls: int, concurrency: int) -> None:
+    """Apply `calls` tiny tasks with both patterns and report the throughput of each."""
+    worker = WorkerFixture()
+    await worker.start(app=simple_app.__name__, concurrency=concurrency)
+    try:
+        t_0 = time.perf_counter()
+        results = await asyncio.gather(*[simple_app.add.apply_async(x, 1) for x in range(calls)])
+        dt_gather = time.perf_counter() - t_0
+        assert results == [x + 1 for x in range(calls)]
+
+        t_0 = time.perf_counter()
+        results = await simple_app.add.apply_many((x, 1) for x in range(calls))
+        dt_apply_many = time.perf_counter() - t_0
+        assert results == [x + 1 for x in range(calls)]
+    finally:
+        worker.terminate()
+        worker.close()
+
+    print(f"calls: {calls}")
+    print(f"gather(apply_async): {dt_gather:.3f} s ({calls / dt_gather:.0f} calls/s)")
+    print(f"apply_many: {dt_apply_many:.3f} s ({calls / dt_apply_many:.0f} calls/s)")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.DEBUG)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(main(calls=args.calls, concurrency=args.concurrency))
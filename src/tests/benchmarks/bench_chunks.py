@@ -0,0 +1,55 @@
+"""
+Benchmark `Task.chunks` against `Task.apply_many` for many calls to a tiny task.
+
+Usage (from the `src` directory, with redis running)::
+
+    python -m tests.benchmarks.bench_chunks --calls 100000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture
+
+
+async def main(calls: int, concurrency: int, size: int) -> None:
+    """Apply `calls` tiny tasks with and without chunks and report the throughput of each."""
+    worker = WorkerFixture()
+    await worker.start(app=simple_app.__name__, concurrency=concurrency)
+    expected = [x + 1 for x in range(calls)]
+    try:
+        t_0 = time.perf_counter()
+        assert await simple_app.add.apply_many((x, 1) for x in range(calls)) == expected
+        dt_apply_many = time.perf_counter() - t_0
+
+        t_0 = time.perf_counter()
+        assert await simple_app.add.chunks(((x, 1) for x in range(calls)), size=size) == expected
+        dt_chunks = time.perf_counter() - t_0
+
+        t_0 = time.perf_counter()
+        assert await simple_app.add.chunks((x, 1) for x in range(calls)) == expected
+        dt_chunks_auto = time.perf_counter() - t_0
+    finally:
+        worker.terminate()
+        worker.close()
+
+    print(f"calls: {calls}")
+    for name, dt in (
+        ("apply_many", dt_apply_many),
+        (f"chunks(size={size})", dt_chunks),
+        ("chunks(size=auto)", dt_chunks_auto),
+    ):
+        print(f"{name}: {dt:.3f} s ({calls / dt:.0f} calls/s)")
+
+
+if __name__ == "__main__":
+    logging.disable(logging.DEBUG)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(calls=args.calls, concurrency=args.concurrency, size=args.size))
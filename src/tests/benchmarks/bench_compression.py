@@ -0,0 +1,64 @@
+"""
+Benchmark the size/CPU tradeoff of each compression type on typical task payloads.
+
+Usage (from the `src` directory, no redis needed)::
+
+    python -m tests.benchmarks.bench_compression --ids 50000 --repeat 20
+"""
+
+import argparse
+import logging
+import time
+
+from aiotaskq.compression import Compression
+from aiotaskq.exceptions import CompressionNotSupported
+from aiotaskq.interfaces import CompressionType
+from aiotaskq.serde import Serialization
+from aiotaskq.task import AsyncResult, Task
+from tests.apps import simple_app
+
+
+def main(ids: int, repeat: int) -> None:
+    """Serialize a task with many ids and a big result with each compression, and report."""
+    task_ = Task(simple_app.join.func, task_id="some-task-id", args=(list(range(ids)),), kwargs={})
+    result = AsyncResult(
+        task_id="some-task-id",
+        ready=True,
+        result={f"user:{i}": {"total_spending": i * 1.5} for i in range(ids)},
+        error=None,
+    )
+
+    print(f"{'payload':<8} {'compression':<12} {'size':>10} {'ratio':>6} {'ser':>9} {'de':>9}")
+    for name, obj in (("task", task_), ("result", result)):
+        for compression_type in CompressionType:
+            try:
+                Compression.validate(compression_type)
+            except CompressionNotSupported:
+                print(f"{name:<8} {compression_type.value:<12} {'(not installed)':>10}")
+                continue
+
+            t_0 = time.perf_counter()
+            for _ in range(repeat):
+                message = Serialization.serialize(obj, compression_type=compression_type)
+            dt_serialize = (time.perf_counter() - t_0) / repeat
+
+            t_0 = time.perf_counter()
+            for _ in range(repeat):
+                Serialization.deserialize(obj.__class__, message)
+            dt_deserialize = (time.perf_counter() - t_0) / repeat
+
+            uncompressed_size = len(Serialization.serialize(obj, CompressionType.NONE))
+            print(
+                f"{name:<8} {compression_type.value:<12} {len(message):>10} "
+                f"{uncompressed_size / len(message):>6.1f} "
+                f"{dt_serialize * 1000:>7.2f}ms {dt_deserialize * 1000:>7.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    logging.disable(logging.DEBUG)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ids", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(ids=args.ids, repeat=args.repeat)
@@ -0,0 +1,52 @@
+"""
+Benchmark the number of broker connections opened and the latency per `apply_async` call.
+
+Usage (from the `src` directory, with redis running)::
+
+    python -m tests.benchmarks.bench_connections --calls 1000
+"""
+
+import argparse
+import asyncio
+import time
+
+import aioredis as redis
+
+from aiotaskq.config import Config
+from aiotaskq.pubsub import get_redis_url
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture
+
+
+async def _get_total_connections_received(redis_client: redis.Redis) -> int:
+    info = await redis_client.info(section="stats")
+    return int(info["total_connections_received"])
+
+
+async def main(calls: int, concurrency: int) -> None:
+    """Run `calls` sequential `apply_async` calls and report connections and latency per call."""
+    worker = WorkerFixture()
+    await worker.start(app=simple_app.__name__, concurrency=concurrency)
+    try:
+        async with redis.Redis.from_url(get_redis_url(Config.broker_url())) as redis_client:
+            connections_before = await _get_total_connections_received(redis_client)
+            t_0 = time.perf_counter()
+            for i in range(calls):
+                await simple_app.echo.apply_async(i)
+            dt = time.perf_counter() - t_0
+            connections_after = await _get_total_connections_received(redis_client)
+    finally:
+        worker.terminate()
+        worker.close()
+
+    print(f"calls: {calls}")
+    print(f"connections opened per call: {(connections_after - connections_before) / calls:.2f}")
+    print(f"mean latency per call: {dt / calls * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(calls=args.calls, concurrency=args.concurrency))
@@ -0,0 +1,79 @@
+"""
+Benchmark the encode/decode throughput and message size of each serialization type.
+
+Usage (from the `src` directory, no redis needed)::
+
+    python -m tests.benchmarks.bench_serde --repeat 1000
+"""
+
+import argparse
+import logging
+import os
+import time
+
+from aiotaskq.interfaces import SerializationType
+from aiotaskq.serde import Serialization
+from aiotaskq.task import AsyncResult, Task
+from tests.apps import simple_app
+
+
+def main(repeat: int) -> None:
+    """Serialize a few typical tasks and results with each serialization type, and report."""
+    payloads: dict[str, Task | AsyncResult] = {
+        "small task": Task(simple_app.add.func, task_id="some-task-id", args=(1, 2), kwargs={}),
+        "ids task": Task(
+            simple_app.join.func, task_id="some-task-id", args=(list(range(10000)),), kwargs={}
+        ),
+        "small result": AsyncResult(task_id="some-task-id", ready=True, result=3, error=None),
+        "dict result": AsyncResult(
+            task_id="some-task-id",
+            ready=True,
+            result={f"user:{i}": {"total_spending": i * 1.5} for i in range(1000)},
+            error=None,
+        ),
+    }
+    # JSON can't represent bytes, so only compare the binary serialization types on them
+    payloads_binary: dict[str, Task | AsyncResult] = {
+        "bytes task": Task(
+            simple_app.echo.func,
+            task_id="some-task-id",
+            args=(bytearray(os.urandom(1024 * 1024)),),
+            kwargs={},
+        ),
+    }
+
+    print(f"{'payload':<14} {'serialization':<14} {'size':>9} {'encode/s':>10} {'decode/s':>10}")
+    for serialization_type in SerializationType:
+        os.environ["AIOTASKQ_SERIALIZATION"] = serialization_type.value
+        items = list(payloads.items())
+        if serialization_type != SerializationType.JSON:
+            items += list(payloads_binary.items())
+        for name, obj in items:
+            try:
+                message = Serialization.serialize(obj)
+            except Exception as exc:  # pylint: disable=broad-except
+                print(f"{name:<14} {serialization_type.value:<14} ({exc.__class__.__name__})")
+                continue
+
+            t_0 = time.perf_counter()
+            for _ in range(repeat):
+                Serialization.serialize(obj)
+            dt_encode = time.perf_counter() - t_0
+
+            t_0 = time.perf_counter()
+            for _ in range(repeat):
+                Serialization.deserialize(obj.__class__, message)
+            dt_decode = time.perf_counter() - t_0
+
+            print(
+                f"{name:<14} {serialization_type.value:<14} {len(message):>9} "
+                f"{repeat / dt_encode:>10.0f} {repeat / dt_decode:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    logging.disable(logging.DEBUG)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+    main(repeat=args.repeat)
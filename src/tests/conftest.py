@@ -3,11 +3,14 @@ import multiprocessing
 import os
 import signal
 import typing as t
+import uuid
 
 import pytest
 
-from aiotaskq.interfaces import ConcurrencyType
+from aiotaskq.interfaces import ConcurrencyType, DispatchStrategy, PriorityMode
 from aiotaskq.concurrency_manager import ConcurrencyManagerSingleton
+from aiotaskq.result_backend import RedisResultBackend, ResultBackend
+from aiotaskq.serde import Serialization
 from aiotaskq.worker import Defaults, run_worker_forever
 
 
@@ -22,6 +25,9 @@ class WorkerFixture:
         concurrency_type: t.Optional[ConcurrencyType] = Defaults.concurrency_type(),
         worker_rate_limit: int = Defaults.worker_rate_limit(),
         poll_interval_s: t.Optional[float] = Defaults.poll_interval_s(),
+        dispatch_strategy: DispatchStrategy = Defaults.dispatch_strategy(),
+        priority_mode: PriorityMode = Defaults.priority_mode(),
+        queues: str = Defaults.queues(),
     ) -> None:
         # Reset singleton so each test is isolated
         ConcurrencyManagerSingleton.reset()
@@ -33,6 +39,9 @@ class WorkerFixture:
                 concurrency_type=concurrency_type,
                 worker_rate_limit=worker_rate_limit,
                 poll_interval_s=poll_interval_s,
+                dispatch_strategy=dispatch_strategy,
+                priority_mode=priority_mode,
+                queues=queues,
             )
         )
         proc.start()
@@ -65,6 +74,14 @@ class WorkerFixture:
             self.proc.close()
 
 
+@pytest.fixture(autouse=True)
+def serialization():
+    # Tests configure the serialization via env vars, which are otherwise read once per process
+    Serialization.reset()
+    yield Serialization
+    Serialization.reset()
+
+
 @pytest.fixture
 def worker():
     worker_ = WorkerFixture()
@@ -75,7 +92,22 @@ def worker():
 
 @pytest.fixture
 def some_file():
-    filename = "./some_file.txt"
+    # Unique per test, so that e.g. the results cached for it don't leak into later runs
+    filename = f"./some_file-{uuid.uuid4()}.txt"
     yield filename
     if os.path.exists(filename):
         os.remove(filename)
+
+
+@pytest.fixture(name="result_backend")
+def fixture_result_backend(monkeypatch: pytest.MonkeyPatch) -> RedisResultBackend:
+    monkeypatch.setenv("AIOTASKQ_RESULT_BACKEND_URL", "redis://127.0.0.1:6379")
+    return ResultBackend.get()
+
+
+def get_num_executions(filename: str) -> int:
+    """Return the number of lines a task appended to the file, one per execution."""
+    if not os.path.exists(filename):
+        return 0
+    with open(filename, mode="r", encoding="utf-8") as fi:
+        return len(fi.read().splitlines())
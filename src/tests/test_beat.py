@@ -0,0 +1,171 @@
+import asyncio
+import datetime
+import typing as t
+
+import pytest
+import pytest_asyncio
+
+import aiotaskq
+from aiotaskq.beat import Beat
+from aiotaskq.config import Config
+from aiotaskq.constants import Constants
+from aiotaskq.exceptions import InvalidArgument, InvalidScheduleOptions
+from aiotaskq.interfaces import IPubSub
+from aiotaskq.pubsub import PubSub, RedisConnectionPools
+from aiotaskq.schedule import CronSchedule, IntervalSchedule
+from aiotaskq.serde import Serialization
+from aiotaskq.task import Task
+from tests.apps import simple_app
+
+
+def _timestamp(*args: int) -> float:
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc).timestamp()
+
+
+def test_interval_schedule():
+    # Given a schedule every 30 seconds
+    schedule = IntervalSchedule(every_s=30)
+
+    # Then it should be due at the multiples of 30 seconds, strictly after the given time
+    assert schedule.get_next(100) == 120
+    assert schedule.get_next(120) == 150
+
+
+@pytest.mark.parametrize(
+    "expression,after,expected",
+    [
+        ("*/15 * * * *", (2022, 3, 4, 10, 7), (2022, 3, 4, 10, 15)),
+        ("*/15 * * * *", (2022, 3, 4, 23, 50), (2022, 3, 5, 0, 0)),
+        # From a Saturday to the next Monday
+        ("30 8 * * 1-5", (2022, 3, 5, 9, 0), (2022, 3, 7, 8, 30)),
+        # Either the 1st of the month or a Friday, whichever comes first
+        ("0 0 1 * 5", (2022, 3, 5, 0, 0), (2022, 3, 11, 0, 0)),
+        ("0 0 1 * 5", (2022, 3, 26, 0, 0), (2022, 4, 1, 0, 0)),
+        ("0 12 29 2 *", (2022, 1, 1, 0, 0), (2024, 2, 29, 12, 0)),
+        ("0 9,17 * * 0", (2022, 3, 6, 9, 0), (2022, 3, 6, 17, 0)),
+        ("@monthly", (2022, 12, 15, 0, 0), (2023, 1, 1, 0, 0)),
+    ],
+)
+def test_cron_schedule(expression: str, after: tuple, expected: tuple):
+    # Given a cron schedule
+    schedule = CronSchedule(expression)
+
+    # Then it should be due at the first matching time in UTC, strictly after the given time
+    assert schedule.get_next(_timestamp(*after)) == _timestamp(*expected)
+
+
+@pytest.mark.parametrize(
+    "schedule",
+    [
+        {"cron": "* * * *"},
+        {"cron": "60 * * * *"},
+        {"cron": "*/0 * * * *"},
+        {"cron": "a * * * *"},
+        {"cron": "0 0 30 2 *"},
+        {"every_s": 0},
+        {"every_s": 1, "cron": "* * * * *"},
+        {},
+    ],
+)
+def test_task__invalid_schedule(schedule: dict):
+    # When a task is defined with an invalid schedule
+    # Then an error should be raised
+    with pytest.raises(InvalidScheduleOptions):
+        aiotaskq.task(options={"schedule": schedule})(simple_app.add.func)
+
+
+def test_task__invalid_schedule_arguments():
+    # When a task is defined with a schedule with invalid arguments
+    # Then an error should be raised
+    with pytest.raises(InvalidArgument):
+        aiotaskq.task(options={"schedule": {"every_s": 1, "args": [1]}})(simple_app.add.func)
+
+
+@pytest_asyncio.fixture
+async def beat_keys():
+    keys = [Constants.beat_leader_key(), Constants.beat_schedule_key()]
+    client = RedisConnectionPools.get_client(url=Config.beat_url())
+    await client.delete(*keys)
+    yield keys
+    await client.delete(*keys)
+
+
+async def _receive_tasks(pubsub: IPubSub, duration_s: float) -> list[Task]:
+    tasks: list[Task] = []
+    loop = asyncio.get_running_loop()
+    deadline: float = loop.time() + duration_s
+    while (timeout := deadline - loop.time()) > 0:
+        try:
+            message = await asyncio.wait_for(pubsub.poll(), timeout)
+        except asyncio.TimeoutError:
+            break
+        tasks.append(Serialization.deserialize(Task, message["data"]))
+    return tasks
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("beat_keys")
+async def test_beat__single_leader_with_failover(monkeypatch: pytest.MonkeyPatch):
+    # pylint: disable=protected-access
+    # Given 2 beat processes running, for an app with a task scheduled every 0.2 seconds
+    monkeypatch.setenv("AIOTASKQ_BEAT_LEASE_S", "0.6")
+    pubsub_ = PubSub.get(url=Config.broker_url(), poll_interval_s=Config.poll_interval_s())
+    async with pubsub_ as pubsub:  # pylint: disable=not-async-context-manager
+        await pubsub.subscribe(Constants.tasks_channel())
+        beats = [Beat(app_import_path=simple_app.__name__) for _ in range(2)]
+        runs: list[asyncio.Task] = [asyncio.create_task(beat._main_loop()) for beat in beats]
+        try:
+            # When they run for a while
+            tasks: list[Task] = await _receive_tasks(pubsub, duration_s=1.1)
+
+            # Then only the leader should apply the task, on schedule
+            assert [beat.is_leader for beat in beats].count(True) == 1
+            assert 4 <= len(tasks) <= 6
+            assert {task.name for task in tasks} == {simple_app.add_periodically.name}
+            assert all(task.kwargs == {"x": 1, "y": 2} for task in tasks)
+            assert len({task.id for task in tasks}) == len(tasks)
+
+            # When the leader stops
+            leader: int = [beat.is_leader for beat in beats].index(True)
+            runs[leader].cancel()
+            await asyncio.gather(runs[leader], return_exceptions=True)
+            tasks = await _receive_tasks(pubsub, duration_s=1.1)
+
+            # Then the other one should take over
+            assert beats[1 - leader].is_leader
+            assert 4 <= len(tasks) <= 6
+        finally:
+            for run in runs:
+                run.cancel()
+            await asyncio.gather(*runs, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("beat_keys")
+async def test_beat__resumes_schedule(monkeypatch: pytest.MonkeyPatch):
+    # pylint: disable=protected-access
+    # Given the schedule left by a previous leader, with the task due long ago
+    client = RedisConnectionPools.get_client(url=Config.beat_url())
+    await client.hset(Constants.beat_schedule_key(), simple_app.add_periodically.name, 0)
+    monkeypatch.setenv("AIOTASKQ_BEAT_LEASE_S", "0.6")
+    pubsub_ = PubSub.get(url=Config.broker_url(), poll_interval_s=Config.poll_interval_s())
+    async with pubsub_ as pubsub:  # pylint: disable=not-async-context-manager
+        await pubsub.subscribe(Constants.tasks_channel())
+
+        # When a beat process takes over
+        beat = Beat(app_import_path=simple_app.__name__)
+        run: asyncio.Task = asyncio.create_task(beat._main_loop())
+        try:
+            tasks: list[Task] = await _receive_tasks(pubsub, duration_s=0.5)
+        finally:
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+
+    # Then it should apply the missed runs only once, then go on with the schedule
+    assert 3 <= len(tasks) <= 4
+    next_time: t.Optional[bytes] = await client.hget(
+        Constants.beat_schedule_key(), simple_app.add_periodically.name
+    )
+    assert next_time is not None and float(next_time) > 0
+    # And it should release the lead once stopped
+    assert await client.get(Constants.beat_leader_key()) is None
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from aiotaskq.cache import ResultCache
+from aiotaskq.task import AsyncResult
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture, get_num_executions
+
+
+def test_get_key__canonical_arguments(some_file: str):
+    # pylint: disable=protected-access
+    # Given a cached task
+    task = simple_app.cached_power
+
+    # When the same call is expressed differently
+    keys = {
+        task._bind_call((some_file, 2), {}).cache_key,
+        task._bind_call((some_file, 2, 1), {}).cache_key,
+        task._bind_call(tuple(), {"b": 1, "a": 2, "filename": some_file}).cache_key,
+    }
+
+    # Then all should share the same key, namespaced per task
+    assert len(keys) == 1
+    assert keys.pop().startswith("cache:simple_app:tests.apps.simple_app.cached_power:")
+    # And a different call should have a different key
+    assert (
+        task._bind_call((some_file, 2, 2), {}).cache_key
+        != task._bind_call((some_file, 2), {}).cache_key
+    )
+
+
+def test_get_key__arguments_not_canonicalizable(some_file: str):
+    # pylint: disable=protected-access
+    # Given a cached task
+    task = simple_app.cached_power
+
+    # When it's called with an argument which has no canonical form, e.g. whose repr holds its
+    # memory address
+    task_ = task._bind_call((some_file, object()), {})
+
+    # Then the call should not be cached
+    assert task_.cache is None
+    assert task_.cache_key is None
+    # But calls with sets or buffers should
+    assert task._bind_call((some_file, {1, 2}, bytearray(b"x")), {}).cache_key is not None
+
+
+@pytest.mark.asyncio
+async def test_apply_async__cached_result(worker: WorkerFixture, some_file: str):
+    # Given a worker running a cached task
+    await worker.start(app=simple_app.__name__, concurrency=1)
+    stats_before = await ResultCache.stats(namespace="simple_app")
+
+    # When the task is called several times with the same arguments
+    results = [await simple_app.cached_power.apply_async(some_file, 2, b=10) for _ in range(3)]
+
+    # Then it should be executed only once
+    assert results == [1024, 1024, 1024]
+    assert get_num_executions(some_file) == 1
+    # And the hits and misses should be counted
+    stats_after = await ResultCache.stats(namespace="simple_app")
+    assert stats_after["hits"] - stats_before["hits"] == 2
+    assert stats_after["misses"] - stats_before["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_apply_async__errors_not_cached(worker: WorkerFixture, some_file: str):
+    # Given a worker running a cached task
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When the task raises
+    # Then the error should be raised again on every call, since errors are not cached
+    for _ in range(2):
+        with pytest.raises(TypeError):
+            await simple_app.cached_power.apply_async(some_file, 2, b="x")
+    assert get_num_executions(some_file) == 2
+
+
+@pytest.mark.asyncio
+async def test_apply_async__client_lookup(monkeypatch: pytest.MonkeyPatch, some_file: str):
+    # pylint: disable=protected-access
+    # Given a cached result and a task looking it up on the client
+    monkeypatch.setitem(simple_app.cached_power.cache, "client_lookup", True)
+    task = simple_app.cached_power._bind_call((some_file, 3), {})
+    await ResultCache.store(
+        task=task, result=AsyncResult(task_id="", ready=True, result=3, error=None)
+    )
+
+    # When the task is called without any worker running
+    result = await asyncio.wait_for(simple_app.cached_power.apply_async(some_file, a=3), 1)
+
+    # Then the cached result should be returned without publishing the task
+    assert result == 3
@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from aiotaskq.chunks import ChunkSizer
+from aiotaskq.exceptions import InvalidArgument
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture
+
+
+@pytest.fixture(autouse=True)
+def chunk_sizer():
+    ChunkSizer.reset()
+    yield ChunkSizer
+    ChunkSizer.reset()
+
+
+def test_chunk_sizer__tuned_from_execution_time(monkeypatch: pytest.MonkeyPatch):
+    # Given chunks should take 0.1s each
+    monkeypatch.setenv("AIOTASKQ_CHUNK_TARGET_S", "0.1")
+
+    # When the execution time of a task is not observed yet
+    # Then its chunks should be small probes
+    assert not ChunkSizer.is_tuned("some_task")
+    assert ChunkSizer.get_size("some_task") == 16
+
+    # When a chunk of 10 calls took 0.01s, i.e. 1ms per call
+    ChunkSizer.observe("some_task", elapsed_s=0.01, num_items=10)
+    # Then the chunks should hold 100 calls
+    assert ChunkSizer.is_tuned("some_task")
+    assert ChunkSizer.get_size("some_task") == 100
+
+    # When a chunk then took 11ms per call
+    ChunkSizer.observe("some_task", elapsed_s=0.11, num_items=10)
+    # Then the observations should be averaged, with more weight on the older ones
+    assert ChunkSizer.get_size("some_task") == 25
+
+    # When calls take no measurable time
+    ChunkSizer.observe("some_other_task", elapsed_s=0.0, num_items=10)
+    # Then the chunks should still be bounded
+    assert ChunkSizer.get_size("some_other_task") == 10000
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 3, 100, "auto"])
+async def test_chunks__results_in_order(worker: WorkerFixture, size: int | str):
+    # Given a worker
+    await worker.start(app=simple_app.__name__, concurrency=2)
+
+    # When a task is called in chunks
+    results = await simple_app.power.chunks([(x, 2) for x in range(50)] + [{"a": 3}], size=size)
+
+    # Then every result should be returned in order
+    assert results == [x**2 for x in range(50)] + [3]
+    # And the execution time of the task should be observed
+    assert ChunkSizer.is_tuned(simple_app.power.name)
+
+
+@pytest.mark.asyncio
+async def test_chunks__coroutine_function(worker: WorkerFixture):
+    # Given a worker
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When a coroutine function is called in a single chunk
+    t_0 = time.perf_counter()
+    results = await simple_app.wait.chunks([(0.2,)] * 10, size=10)
+
+    # Then the calls should be executed concurrently
+    assert results == [0.2] * 10
+    assert time.perf_counter() - t_0 < 1
+
+
+@pytest.mark.asyncio
+async def test_chunks__error(worker: WorkerFixture):
+    # Given a worker
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When a call of a chunk raises
+    # Then the error should be raised
+    with pytest.raises(TypeError):
+        await simple_app.power.chunks([(1, 2), (1, "x")], size=2)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [0, -1, "big"])
+async def test_chunks__invalid_size(size):
+    # When calling a task in chunks of an invalid size
+    # Then an error should be raised before publishing anything
+    with pytest.raises(InvalidArgument):
+        await simple_app.power.chunks([(1, 2)], size=size)
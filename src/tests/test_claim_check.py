@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from aiotaskq.claim_check import ClaimCheck
+from aiotaskq.exceptions import BlobNotFound
+from aiotaskq.interfaces import TaskEnvelope
+from aiotaskq.pubsub import RedisConnectionPools
+
+
+@pytest.mark.asyncio
+async def test_offload__disabled_by_default(monkeypatch: pytest.MonkeyPatch):
+    # Given no blob store is configured
+    monkeypatch.delenv("AIOTASKQ_CLAIM_CHECK_URL", raising=False)
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_MIN_SIZE", "0")
+
+    # When offloading a message
+    message = await ClaimCheck.offload(b"json|{}")
+
+    # Then the message should be sent inline as is
+    assert message == b"json|{}"
+
+
+@pytest.mark.asyncio
+async def test_offload__small_message_sent_inline(monkeypatch: pytest.MonkeyPatch):
+    # Given a blob store is configured
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_URL", "redis://127.0.0.1:6379")
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_MIN_SIZE", "1024")
+
+    # When offloading a message smaller than the minimum size
+    message = await ClaimCheck.offload(b"json|{}")
+
+    # Then the message should be sent inline as is
+    assert message == b"json|{}"
+    assert await ClaimCheck.resolve(message) == b"json|{}"
+
+
+@pytest.mark.parametrize("url", ["redis://127.0.0.1:6379", "file://{tmp_path}/blobs"])
+@pytest.mark.asyncio
+async def test_offload_and_resolve(monkeypatch: pytest.MonkeyPatch, tmp_path, url: str):
+    # Given a blob store is configured
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_URL", url.format(tmp_path=tmp_path))
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_MIN_SIZE", "1024")
+
+    # When offloading a big message
+    message_original = b"json|" + b"x" * 4096
+    message = await ClaimCheck.offload(message_original)
+
+    # Then only a small reference to it should be sent
+    assert message.startswith(b"claim|claim:")
+    assert len(message) < 64
+    # And resolving the reference should return the original message
+    assert await ClaimCheck.resolve(message) == message_original
+    # And the message should be removed from the blob store once consumed
+    with pytest.raises(BlobNotFound):
+        await ClaimCheck.resolve(message)
+
+
+@pytest.mark.asyncio
+async def test_offload__envelope_outlives_body(monkeypatch: pytest.MonkeyPatch):
+    # Given a blob store is configured
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_URL", "redis://127.0.0.1:6379")
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_MIN_SIZE", "1024")
+
+    # When offloading a big task with its envelope
+    envelope: TaskEnvelope = {
+        "task_id": "some-task-id",
+        "reply_to": "some-channel",
+        "store_result": False,
+    }
+    message = await ClaimCheck.offload(b"json|" + b"x" * 4096, envelope=envelope)
+
+    # Then the original message should be resolved from the reference
+    assert await ClaimCheck.resolve(message) == b"json|" + b"x" * 4096
+    # And the envelope should still be known once the body is gone
+    with pytest.raises(BlobNotFound):
+        await ClaimCheck.resolve(message)
+    assert ClaimCheck.get_envelope(message) == envelope
+    # But not for messages sent inline
+    assert ClaimCheck.get_envelope(b"json|{}") is None
+
+
+@pytest.mark.asyncio
+async def test_offload__delayed_message_kept_until_due(monkeypatch: pytest.MonkeyPatch):
+    # Given a blob store whose blobs expire after a minute
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_URL", "redis://127.0.0.1:6379")
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_MIN_SIZE", "1024")
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_TTL_S", "60")
+
+    # When offloading a big message due in an hour
+    message = await ClaimCheck.offload(b"json|" + b"x" * 4096, eta=time.time() + 3600)
+
+    # Then its body should be kept for a minute after it's due
+    key: bytes = message[len(b"claim|") :]
+    client = RedisConnectionPools.get_client(url="redis://127.0.0.1:6379")
+    assert 3600 < await client.ttl(key) <= 3660
+    assert await ClaimCheck.resolve(message) == b"json|" + b"x" * 4096
@@ -30,6 +30,7 @@ def test_root_show_proper_help_message():
             "  --help                          Show this message and exit.\n"
             "\n"
             "Commands:\n"
+            "  beat    Command to apply the periodic tasks of an app on their schedule.\n"
             "  metric  Command to start server to collect and report tasks metrics...\n"
             "  worker  Command to start workers.\n"
         )
@@ -58,6 +59,24 @@ def test_version():
             assert output == f"{__version__}\n"
 
 
+def test_beat_show_proper_help_message():
+    bash_command = "aiotaskq beat --help"
+    with os.popen(bash_command) as pipe:
+        output = pipe.read()
+        output_expected = (
+            "Usage: aiotaskq beat [OPTIONS] APP\n"
+            "\n"
+            "  Command to apply the periodic tasks of an app on their schedule.\n"
+            "\n"
+            "Arguments:\n"
+            "  APP  [required]\n"
+            "\n"
+            "Options:\n"
+            "  --help  Show this message and exit.\n"
+        )
+        assert output == output_expected
+
+
 def test_worker_show_proper_help_message():
     bash_command = "aiotaskq worker --help"
     default_cpu_count: int = multiprocessing.cpu_count()
@@ -78,6 +97,11 @@ def test_worker_show_proper_help_message():
             "  --concurrency-type [multiprocessing]\n"
             "                                  [default: multiprocessing]\n"
             "  --worker-rate-limit INTEGER     [default: -1]\n"
+            "  --dispatch-strategy [round-robin|least-outstanding|power-of-two-choices]\n"
+            "                                  [default: least-outstanding]\n"
+            "  --priority-mode [strict|weighted]\n"
+            "                                  [default: strict]\n"
+            "  --queues TEXT                   [default: default]\n"
             "  --help                          Show this message and exit.\n"
         )
         assert output == output_expected
@@ -4,6 +4,7 @@ from time import time
 
 import pytest
 
+from aiotaskq.interfaces import DispatchStrategy
 from tests.apps import simple_app
 
 if t.TYPE_CHECKING:
@@ -104,3 +105,26 @@ async def test_async__concurrency_and_worker_rate_limit_of_1__effectively_serial
     # And the results should be correct
     results_expected = [1, 1, 1, 1, 1]
     assert results_actual == results_expected
+
+
+@pytest.mark.asyncio
+async def test_least_outstanding_dispatch__avoids_blocked_worker(worker: "WorkerFixture"):
+    # Given that the worker cli is run with "--concurrency 2" option
+    # and with "--dispatch-strategy least-outstanding"
+    await worker.start(
+        app=simple_app.__name__,
+        concurrency=2,
+        dispatch_strategy=DispatchStrategy.LEAST_OUTSTANDING,
+    )
+
+    # When a task is blocking one of the child workers
+    blocking_task = asyncio.create_task(simple_app.block.apply_async(t_s=2))
+    await asyncio.sleep(0.5)
+
+    # Then other tasks should be passed to the child worker that is not blocked
+    t_0 = time()
+    results_actual = [await simple_app.echo.apply_async(x=x) for x in range(4)]
+    t_1 = time()
+    assert t_1 - t_0 < 1.0
+    assert results_actual == [0, 1, 2, 3]
+    assert await blocking_task == 2
@@ -0,0 +1,132 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from aiotaskq.dispatch import (
+    Dispatcher,
+    GruntWorkerLoads,
+    LeastOutstandingDispatcher,
+    PowerOfTwoChoicesDispatcher,
+    RoundRobinDispatcher,
+)
+from aiotaskq.exceptions import DispatchStrategyNotSupported
+from aiotaskq.interfaces import DispatchStrategy
+
+
+def _get_loads(outstanding: list[int], capacity: int = 10) -> GruntWorkerLoads:
+    loads = GruntWorkerLoads(size=len(outstanding))
+    for pid, num_tasks in enumerate(outstanding, start=1000):
+        index = loads.register(pid=pid, capacity=capacity)
+        for _ in range(num_tasks):
+            loads.add_outstanding(index)
+    return loads
+
+
+@pytest.mark.parametrize(
+    "strategy,dispatcher_class",
+    [
+        (DispatchStrategy.ROUND_ROBIN, RoundRobinDispatcher),
+        (DispatchStrategy.LEAST_OUTSTANDING, LeastOutstandingDispatcher),
+        (DispatchStrategy.POWER_OF_TWO_CHOICES, PowerOfTwoChoicesDispatcher),
+    ],
+)
+def test_get_dispatcher(strategy: DispatchStrategy, dispatcher_class: type):
+    # When getting a dispatcher for a supported strategy
+    dispatcher = Dispatcher.get(strategy=strategy, loads=_get_loads([0, 0]))
+
+    # Then the correct implementation should be returned
+    assert isinstance(dispatcher, dispatcher_class)
+
+
+def test_unsupported_dispatch_strategy():
+    # When getting a dispatcher for an unsupported strategy
+    error = None
+    try:
+        Dispatcher.get(strategy="some-incorrect-strategy", loads=_get_loads([0]))
+    except DispatchStrategyNotSupported as err:
+        error = err
+    finally:
+        # Then a helpful error should be raised
+        assert str(error) == 'Dispatch strategy "some-incorrect-strategy" is not yet supported.'
+
+
+def test_round_robin__ignores_load():
+    # Given grunt workers where the first one is busy
+    loads = _get_loads([5, 0, 0])
+
+    # When selecting grunt workers in round-robin
+    dispatcher = RoundRobinDispatcher(loads=loads)
+
+    # Then each grunt worker should be selected in turn regardless of its load
+    assert [dispatcher.select() for _ in range(4)] == [0, 1, 2, 0]
+
+
+def test_least_outstanding__selects_least_loaded():
+    # Given grunt workers with different numbers of outstanding tasks
+    loads = _get_loads([3, 1, 2])
+    dispatcher = LeastOutstandingDispatcher(loads=loads)
+
+    # When selecting a grunt worker
+    # Then the one with the least outstanding tasks should be selected
+    assert dispatcher.select() == 1
+
+
+def test_least_outstanding__spreads_ties():
+    # Given idle grunt workers
+    loads = _get_loads([0, 0, 0])
+    dispatcher = LeastOutstandingDispatcher(loads=loads)
+
+    # When selecting grunt workers while passing them tasks
+    selected = []
+    for _ in range(3):
+        index = dispatcher.select()
+        loads.add_outstanding(index)
+        selected.append(index)
+
+    # Then every grunt worker should get a task
+    assert sorted(selected) == [0, 1, 2]
+
+
+def test_least_outstanding__relative_to_capacity():
+    # Given a grunt worker with fewer outstanding tasks, but a much smaller capacity
+    loads = GruntWorkerLoads(size=2)
+    small = loads.register(pid=1000, capacity=1)
+    large = loads.register(pid=1001, capacity=100)
+    loads.add_outstanding(small)
+    for _ in range(3):
+        loads.add_outstanding(large)
+
+    # Then the grunt worker with more room left should be selected
+    assert LeastOutstandingDispatcher(loads=loads).select() == large
+
+
+def test_power_of_two_choices__never_selects_most_loaded_of_two():
+    # Given two grunt workers where one is much busier
+    loads = _get_loads([10, 0])
+    dispatcher = PowerOfTwoChoicesDispatcher(loads=loads)
+
+    # Then the less busy one should always be selected
+    assert {dispatcher.select() for _ in range(20)} == {1}
+
+
+@pytest.mark.asyncio
+async def test_wait_for_capacity__woken_up_by_other_process():
+    # Given grunt workers all at capacity
+    loads = _get_loads([1, 1], capacity=1)
+
+    # When one of them is done with its task, in another process, a bit later
+    def _release_later():
+        time.sleep(0.2)
+        loads.remove_outstanding(1)
+
+    proc = multiprocessing.Process(target=_release_later)
+    proc.start()
+    t_0 = time.perf_counter()
+    await asyncio.wait_for(loads.wait_for_capacity(), timeout=5)
+    proc.join()
+
+    # Then waiting for capacity should return as soon as it's done
+    assert 0.2 <= time.perf_counter() - t_0 < 1
+    assert loads.has_capacity()
@@ -0,0 +1,60 @@
+import asyncio
+import typing as t
+
+import aioredis as redis
+import pytest
+
+from aiotaskq.config import Config
+from aiotaskq.inbox import ResultInbox
+from aiotaskq.pubsub import get_redis_url
+from aiotaskq.serde import Serialization
+from aiotaskq.task import AsyncResult
+from tests.apps import simple_app
+
+if t.TYPE_CHECKING:
+    from tests.conftest import WorkerFixture
+
+
+@pytest.mark.asyncio
+async def test_one_reply_channel_per_process(worker: "WorkerFixture"):
+    # Given a worker running in the background
+    await worker.start(app=simple_app.__name__, concurrency=2)
+
+    # When many tasks are applied at the same time
+    results = await asyncio.gather(*[simple_app.echo.apply_async(x) for x in range(100)])
+
+    # Then the results should be correct
+    assert results == list(range(100))
+    # And all the results should have been received on the same reply channel
+    inbox = await ResultInbox.get()
+    assert inbox is await ResultInbox.get()
+    async with redis.Redis.from_url(get_redis_url(Config.broker_url())) as redis_client:
+        [(_, num_subscribers)] = await redis_client.pubsub_numsub(inbox.channel)
+        assert num_subscribers == 1
+        # And no per-task results channel should have been subscribed to
+        assert await redis_client.pubsub_channels("channel:results:*") == []
+
+
+@pytest.mark.asyncio
+async def test_result_failing_to_be_received_only_fails_its_caller():
+    # Given an inbox expecting the results of a few tasks
+    inbox = await ResultInbox.get()
+    future_bad = inbox.expect("bad")
+    future_good = inbox.expect("good")
+
+    # When a result which can't be decoded, one which can't be deserialized, then a valid one
+    # are received
+    async with redis.Redis.from_url(get_redis_url(Config.broker_url())) as redis_client:
+        await redis_client.publish(inbox.channel, b"garbage")
+        await redis_client.publish(inbox.channel, b'json|{"task_id": "bad"}')
+        await redis_client.publish(
+            inbox.channel,
+            Serialization.serialize(AsyncResult(task_id="good", ready=True, result=1, error=None)),
+        )
+
+    # Then only the caller of the result which can't be deserialized should fail
+    with pytest.raises(KeyError):
+        await asyncio.wait_for(future_bad, timeout=5)
+    # And the inbox should keep receiving the other results
+    async_result = await asyncio.wait_for(future_good, timeout=5)
+    assert async_result.result == 1
@@ -1,4 +1,6 @@
+import asyncio
 import inspect
+
 import pytest
 
 from aiotaskq.task import Task
@@ -27,3 +29,97 @@ async def test_sync_and_async_parity__simple_app(worker: WorkerFixture):
             sync_result = task(*args, **kwargs)
         async_result = await task.apply_async(*args, **kwargs)
         assert async_result == sync_result, f"{async_result} != {sync_result}"
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_parity__redis_streams_broker(
+    worker: WorkerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # Given a simple app running as a worker using the Redis Streams broker
+    monkeypatch.setenv("BROKER_URL", "redis+streams://127.0.0.1:6379")
+    await worker.start(app=simple_app.__name__, concurrency=2)
+
+    # Then there should be parity between sync and async call of the tasks
+    results = await asyncio.gather(*[simple_app.add.apply_async(x, 1) for x in range(10)])
+    assert results == [simple_app.add(x, 1) for x in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_parity__ipc_broker(
+    worker: WorkerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path,
+):
+    # Given a simple app running as a worker using the single-host IPC broker
+    monkeypatch.setenv("BROKER_URL", f"ipc://{tmp_path / 'aiotaskq.sock'}")
+    await worker.start(app=simple_app.__name__, concurrency=2)
+
+    # Then there should be parity between sync and async call of the tasks
+    results = await asyncio.gather(*[simple_app.add.apply_async(x, 1) for x in range(10)])
+    assert results == [simple_app.add(x, 1) for x in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_ipc_broker__socket_removed_on_termination(
+    worker: WorkerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path,
+):
+    # Given a worker hosting the single-host IPC broker
+    monkeypatch.setenv("BROKER_URL", f"ipc://{tmp_path / 'aiotaskq.sock'}")
+    await worker.start(app=simple_app.__name__, concurrency=2)
+    assert await simple_app.add.apply_async(1, 1) == 2
+    assert (tmp_path / "aiotaskq.sock").exists()
+
+    # When the worker is terminated
+    worker.terminate()
+
+    # Then it should remove its socket file
+    assert not (tmp_path / "aiotaskq.sock").exists()
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_parity__compression(
+    worker: WorkerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # Given a simple app running as a worker with every message compressed
+    monkeypatch.setenv("AIOTASKQ_COMPRESSION", "zlib")
+    monkeypatch.setenv("AIOTASKQ_COMPRESSION_MIN_SIZE", "0")
+    await worker.start(app=simple_app.__name__, concurrency=2)
+
+    # Then there should be parity between sync and async call of the tasks
+    ls = [str(x) for x in range(10000)]
+    assert await simple_app.join.apply_async(ls) == simple_app.join(ls)
+    assert await simple_app.add.apply_async(1, 2) == simple_app.add(1, 2)
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_parity__claim_check(
+    worker: WorkerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # Given a simple app running as a worker with every message offloaded to a blob store
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_URL", "redis://127.0.0.1:6379")
+    monkeypatch.setenv("AIOTASKQ_CLAIM_CHECK_MIN_SIZE", "0")
+    await worker.start(app=simple_app.__name__, concurrency=2)
+
+    # Then there should be parity between sync and async call of the tasks
+    ls = [str(x) for x in range(10000)]
+    assert await simple_app.join.apply_async(ls) == simple_app.join(ls)
+    assert await simple_app.add.apply_many([(1, 2), (3, 4)]) == [3, 7]
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_parity__pickle_serialization(
+    worker: WorkerFixture,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # Given a simple app running as a worker using the pickle serialization
+    monkeypatch.setenv("AIOTASKQ_SERIALIZATION", "pickle")
+    await worker.start(app=simple_app.__name__, concurrency=2)
+
+    # Then there should be parity between sync and async call of the tasks
+    assert await simple_app.join.apply_async((1, 2, 3)) == simple_app.join((1, 2, 3))
+    assert await simple_app.power.apply_many([(2, 3), {"a": 3}]) == [8, 3]
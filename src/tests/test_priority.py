@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from aiotaskq.constants import Constants
+from aiotaskq.exceptions import InvalidArgument
+from aiotaskq.interfaces import PriorityMode
+from aiotaskq.priority import PriorityBuffer
+from aiotaskq.pubsub import RedisConnectionPools
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture
+
+
+@pytest.mark.asyncio
+async def test_priority_buffer__strict():
+    # Given messages of various priorities buffered in the strict mode
+    buffer = PriorityBuffer(channel="some-channel", mode=PriorityMode.STRICT)
+    for priority, data in [(0, b"a"), (5, b"b"), (0, b"c"), (9, b"d"), (5, b"e")]:
+        buffer.put(priority=priority, data=data)
+
+    # When getting them
+    # Then the most urgent ones should come first, in order of arrival among the same priority
+    assert [await buffer.get() for _ in range(len(buffer))] == [
+        (9, b"d"),
+        (5, b"b"),
+        (5, b"e"),
+        (0, b"a"),
+        (0, b"c"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_priority_buffer__weighted():
+    # Given messages of the lowest and highest priorities buffered in the weighted mode
+    buffer = PriorityBuffer(channel="some-channel", mode=PriorityMode.WEIGHTED)
+    for _ in range(100):
+        buffer.put(priority=0, data=b"low")
+        buffer.put(priority=9, data=b"high")
+
+    # When getting some of them
+    priorities = [(await buffer.get())[0] for _ in range(22)]
+
+    # Then each priority should get a share proportional to its weight, without starvation
+    assert priorities.count(9) == 20
+    assert priorities.count(0) == 2
+
+
+def test_with_priority__invalid():
+    # When setting an invalid priority
+    # Then an error should be raised
+    for priority in (-1, 10, "9"):
+        with pytest.raises(InvalidArgument):
+            simple_app.add.with_priority(priority)
+    # And the original task should be unchanged
+    assert simple_app.add.with_priority(9).priority == 9
+    assert simple_app.add.priority == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("priority_mode", [PriorityMode.STRICT, PriorityMode.WEIGHTED])
+async def test_apply_async__higher_priority_first(
+    worker: WorkerFixture, some_file: str, priority_mode: PriorityMode
+):
+    # Given a worker executing only one task at a time, busy with a task
+    await worker.start(
+        app=simple_app.__name__, concurrency=1, worker_rate_limit=1, priority_mode=priority_mode
+    )
+    busy = asyncio.create_task(simple_app.block.apply_async(0.5))
+    await asyncio.sleep(0.2)
+
+    # When tasks of low priority, then a task of high priority are applied
+    low = [
+        asyncio.create_task(simple_app.write_line.apply_async(some_file, f"low-{i}"))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0.1)
+    high = simple_app.write_line.with_priority(9).apply_async(some_file, "high")
+    await asyncio.gather(busy, *low, high)
+
+    # Then the task of high priority should be executed first
+    with open(some_file, mode="r", encoding="utf-8") as fi:
+        assert fi.read().splitlines() == ["high", "low-0", "low-1", "low-2"]
+
+
+@pytest.mark.asyncio
+async def test_worker__leaves_backlog_in_broker(
+    worker: WorkerFixture, monkeypatch: pytest.MonkeyPatch
+):
+    # Given a worker with room for a single task at a time, consuming a broker keeping messages
+    monkeypatch.setenv("BROKER_URL", "redis+streams://127.0.0.1:6379")
+    await worker.start(app=simple_app.__name__, concurrency=1, worker_rate_limit=1)
+
+    # When more tasks are applied than it has room for
+    results = asyncio.gather(*[simple_app.wait.apply_async(0.3) for _ in range(6)])
+    await asyncio.sleep(0.4)
+
+    # Then the backlog should be left in the broker rather than buffered by the worker
+    client = RedisConnectionPools.get_client(url="redis://127.0.0.1:6379")
+    assert await client.xlen(Constants.tasks_channel()) >= 2
+    # And every task should be executed eventually
+    assert await results == [0.3] * 6
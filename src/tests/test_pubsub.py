@@ -1,5 +1,20 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from aiotaskq.constants import Constants
 from aiotaskq.exceptions import UrlNotSupported
-from aiotaskq.pubsub import PubSub
+from aiotaskq.interfaces import IPubSub, PollResponse
+from aiotaskq.ipc import IpcBroker
+from aiotaskq.pubsub import (
+    PubSub,
+    PubSubIpc,
+    PubSubRedisStreams,
+    RedisConnectionPools,
+    get_redis_url,
+)
 
 
 def test_invalid_url():
@@ -15,3 +30,237 @@ def test_invalid_url():
     finally:
         # Then a helpful error should be raised
         assert str(error) == 'Url "cache+memcached://127.0.0.1:11211/" is currently not supported.'
+
+
+def test_redis_streams_url():
+    # Given a redis streams url
+    url = "redis+streams://127.0.0.1:6379"
+
+    # When getting a pubsub instance using the url
+    pubsub = PubSub.get(url=url, poll_interval_s=1.0)
+
+    # Then the Redis Streams implementation should be returned
+    assert isinstance(pubsub, PubSubRedisStreams)
+
+
+def test_get_redis_url():
+    # Given some broker urls
+    # When converting them to urls understood by the redis client
+    # Then the broker-specific part of the scheme should be dropped
+    assert get_redis_url("redis+streams://127.0.0.1:6379") == "redis://127.0.0.1:6379"
+    assert get_redis_url("rediss+streams://127.0.0.1:6379/1") == "rediss://127.0.0.1:6379/1"
+    assert get_redis_url("redis://127.0.0.1:6379") == "redis://127.0.0.1:6379"
+
+
+@pytest.mark.asyncio
+async def test_redis_streams__message_published_before_subscribe_is_not_lost():
+    # Given a channel that nobody is subscribed to yet
+    channel = f"channel:test:{uuid.uuid4()}"
+    url = "redis+streams://127.0.0.1:6379"
+
+    # When a message is published to the channel
+    publisher_ = PubSub.get(url=url, poll_interval_s=0.1)
+    async with publisher_ as publisher:  # pylint: disable=not-async-context-manager
+        await publisher.publish(channel=channel, message="Hello World")
+
+    # Then a subscriber that subscribes afterwards should still receive the message
+    subscriber_ = PubSub.get(url=url, poll_interval_s=0.1)
+    async with subscriber_ as subscriber:  # pylint: disable=not-async-context-manager
+        await subscriber.subscribe(channel=channel)
+        message = await asyncio.wait_for(subscriber.poll(), timeout=1.0)
+    assert message["data"] == b"Hello World"
+
+
+@pytest.mark.asyncio
+async def test_redis_streams__messages_of_several_streams_read_at_once():
+    # Given messages published to several channels
+    channels = [f"channel:test:{uuid.uuid4()}" for _ in range(3)]
+    url = "redis+streams://127.0.0.1:6379"
+    publisher_ = PubSub.get(url=url, poll_interval_s=0.1)
+    async with publisher_ as publisher:  # pylint: disable=not-async-context-manager
+        for channel in channels:
+            await publisher.publish_many(channel=channel, messages=[f"{channel}:1", f"{channel}:2"])
+
+    # When a subscriber to all of them polls
+    subscriber_ = PubSub.get(url=url, poll_interval_s=0.1)
+    async with subscriber_ as subscriber:  # pylint: disable=not-async-context-manager
+        for channel in channels:
+            await subscriber.subscribe(channel=channel)
+        messages = [await asyncio.wait_for(subscriber.poll(), timeout=1.0) for _ in range(6)]
+
+    # Then it should receive every message, in order within each channel
+    assert sorted(message["data"] for message in messages) == sorted(
+        f"{channel}:{i}".encode() for channel in channels for i in (1, 2)
+    )
+    for channel in channels:
+        assert [m["data"] for m in messages if m["channel"] == channel.encode()] == [
+            f"{channel}:1".encode(),
+            f"{channel}:2".encode(),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_redis_poll__wakes_up_before_poll_interval():
+    # Given a subscriber with a very long poll interval
+    channel = f"channel:test:{uuid.uuid4()}"
+    url = "redis://127.0.0.1:6379"
+    poll_interval_s = 5.0
+    subscriber_ = PubSub.get(url=url, poll_interval_s=poll_interval_s)
+    async with subscriber_ as subscriber:  # pylint: disable=not-async-context-manager
+        await subscriber.subscribe(channel=channel)
+
+        # When a message is published shortly after the subscriber starts polling
+        async def _publish_later():
+            await asyncio.sleep(0.1)
+            publisher_ = PubSub.get(url=url, poll_interval_s=poll_interval_s)
+            async with publisher_ as publisher:  # pylint: disable=not-async-context-manager
+                await publisher.publish(channel=channel, message="Hello World")
+
+        t_0 = time.monotonic()
+        publish_task = asyncio.create_task(_publish_later())
+        message = await subscriber.poll()
+        dt = time.monotonic() - t_0
+        await publish_task
+
+    # Then the subscriber should receive the message right away instead of after the interval
+    assert message["data"] == b"Hello World"
+    assert dt < 1.0
+
+
+@pytest.mark.asyncio
+async def test_redis_connection_pools__reused_within_event_loop():
+    # Given a broker url
+    url = "redis://127.0.0.1:6379"
+
+    # When publishing many messages, each through a new pubsub instance
+    for _ in range(20):
+        publisher_ = PubSub.get(url=url, poll_interval_s=1.0)
+        async with publisher_ as publisher:  # pylint: disable=not-async-context-manager
+            await publisher.publish(channel=f"channel:test:{uuid.uuid4()}", message="Hello")
+
+    # Then the same connection pool should be shared by all of them
+    pool = RedisConnectionPools.get_pool(url=url)
+    assert pool is RedisConnectionPools.get_pool(url=url)
+    # And only one connection should have been opened
+    assert len(pool._connections) == 1  # pylint: disable=protected-access
+    # And subscriptions should use a different pool
+    assert RedisConnectionPools.get_pool(url=url, blocking=True) is not pool
+
+
+@pytest.mark.asyncio
+async def test_ipc__round_trip(tmp_path):
+    # Given an IPC broker listening on a Unix domain socket
+    url = f"ipc://{tmp_path / 'aiotaskq.sock'}"
+    broker = IpcBroker(path=str(tmp_path / "aiotaskq.sock"))
+    await broker.start()
+
+    try:
+        # And a subscriber to a channel
+        subscriber_ = PubSub.get(url=url, poll_interval_s=1.0)
+        async with subscriber_ as subscriber:  # pylint: disable=not-async-context-manager
+            assert isinstance(subscriber, PubSubIpc)
+            await subscriber.subscribe(channel="channel:test")
+
+            # When messages are published to the channel
+            publisher_ = PubSub.get(url=url, poll_interval_s=1.0)
+            async with publisher_ as publisher:  # pylint: disable=not-async-context-manager
+                await publisher.publish(channel="channel:test", message="Hello World")
+                await publisher.publish_many(channel="channel:test", messages=["a", b"b"])
+
+            # Then the subscriber should receive all of them in order
+            messages = [await asyncio.wait_for(subscriber.poll(), timeout=1.0) for _ in range(3)]
+    finally:
+        await broker.close()
+
+    assert [message["data"] for message in messages] == [b"Hello World", b"a", b"b"]
+    assert messages[0]["channel"] == b"channel:test"
+
+
+async def _poll_many(pubsub: IPubSub, count: int) -> list[PollResponse]:
+    return [await pubsub.poll() for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_ipc__slow_subscriber_backpressure(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    # Given an IPC broker holding at most 1 MiB for each subscriber
+    monkeypatch.setenv("AIOTASKQ_IPC_MAX_PENDING_SIZE", str(1024 * 1024))
+    url = f"ipc://{tmp_path / 'aiotaskq.sock'}"
+    broker = IpcBroker(path=str(tmp_path / "aiotaskq.sock"))
+    await broker.start()
+
+    try:
+        # And a subscriber which reads its messages, and one which doesn't yet
+        fast_ = PubSub.get(url=url, poll_interval_s=1.0)
+        slow_ = PubSub.get(url=url, poll_interval_s=1.0)
+        async with fast_ as fast, slow_ as slow:  # pylint: disable=not-async-context-manager
+            await fast.subscribe(channel="channel:test")
+            await slow.subscribe(channel="channel:test")
+            receiving = asyncio.create_task(_poll_many(fast, count=100))
+
+            # When more messages are published than the slow subscriber can hold
+            publisher_ = PubSub.get(url=url, poll_interval_s=1.0)
+            async with publisher_ as publisher:  # pylint: disable=not-async-context-manager
+
+                async def _publish_many():
+                    for _ in range(100):
+                        await publisher.publish(channel="channel:test", message=b"x" * 64 * 1024)
+
+                publishing = asyncio.create_task(_publish_many())
+
+                # Then publishing should wait for the slow subscriber to catch up
+                await asyncio.sleep(1.0)
+                assert not publishing.done()
+                # And once it does, both subscribers should receive all the messages
+                assert len(await asyncio.wait_for(_poll_many(slow, count=100), timeout=5.0)) == 100
+                assert len(await asyncio.wait_for(receiving, timeout=5.0)) == 100
+                await asyncio.wait_for(publishing, timeout=5.0)
+    finally:
+        await broker.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_streams__unacknowledged_message_claimed_once_idle(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # pylint: disable=protected-access
+    # Given messages which must be acknowledged once handled, left idle for at most 0.6s
+    monkeypatch.setenv("AIOTASKQ_STREAM_CLAIM_IDLE_S", "0.6")
+    channel = f"channel:test:{uuid.uuid4()}"
+    url = "redis+streams://127.0.0.1:6379"
+    publisher_ = PubSub.get(url=url, poll_interval_s=0.1)
+    async with publisher_ as publisher:  # pylint: disable=not-async-context-manager
+        await publisher.publish_many(channel=channel, messages=["a", "b"])
+
+    # When a consumer polls both and dies before acknowledging the first one
+    # And another consumer keeps the second one without acknowledging it for a while
+    dead_ = PubSub.get(url=url, poll_interval_s=0.1)
+    alive_ = PubSub.get(url=url, poll_interval_s=0.1)
+    async with alive_ as alive:  # pylint: disable=not-async-context-manager
+        alive._consumer = "alive"
+        await alive.subscribe(channel=channel, ack_late=True)
+        async with dead_ as dead:  # pylint: disable=not-async-context-manager
+            dead._consumer = "dead"
+            await dead.subscribe(channel=channel, ack_late=True)
+            assert (await asyncio.wait_for(dead.poll(), timeout=1.0))["data"] == b"a"
+        message = await asyncio.wait_for(alive.poll(), timeout=1.0)
+        assert message["data"] == b"b"
+
+        # Then the other consumer should be passed the first one once it's idle for long enough
+        t_0 = time.monotonic()
+        claimed = await asyncio.wait_for(alive.poll(), timeout=2.0)
+        assert claimed["data"] == b"a"
+        assert time.monotonic() - t_0 >= 0.4
+        # But the one it keeps should not be passed to anyone else meanwhile
+        other_ = PubSub.get(url=url, poll_interval_s=0.1)
+        async with other_ as other:  # pylint: disable=not-async-context-manager
+            other._consumer = "other"
+            await other.subscribe(channel=channel, ack_late=True)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(other.poll(), timeout=1.0)
+
+        # And both should be removed from the stream once acknowledged
+        await alive.ack(message)
+        await alive.ack(claimed)
+    client = RedisConnectionPools.get_client(url="redis://127.0.0.1:6379")
+    assert await client.xlen(channel) == 0
+    assert (await client.xpending(channel, Constants.consumer_group()))["pending"] == 0
@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+import aiotaskq
+from aiotaskq.config import Config
+from aiotaskq.constants import Constants
+from aiotaskq.exceptions import InvalidArgument
+from aiotaskq.interfaces import DispatchStrategy, SerializationType
+from aiotaskq.pubsub import RedisConnectionPools
+from aiotaskq.rate_limit import RateLimiter, parse_rate_limit
+from aiotaskq.serde import Serialization
+from aiotaskq.task import Task
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture
+
+
+@pytest_asyncio.fixture(name="bucket_keys")
+async def fixture_bucket_keys():
+    keys: list[str] = [
+        Constants.rate_limit_key_template().format(task_name=task.name)
+        for task in (simple_app.add, simple_app.add_rate_limited)
+    ]
+    client = RedisConnectionPools.get_client(url=Config.rate_limit_url())
+    await client.delete(*keys)
+    RateLimiter.reset()
+    yield keys
+    await client.delete(*keys)
+    RateLimiter.reset()
+
+
+def test_parse_rate_limit():
+    # Given rate limits per second, minute and hour
+    # Then they should be parsed as a rate per second and a burst
+    assert parse_rate_limit("100/s") == (100, 100)
+    assert parse_rate_limit("30/m") == (0.5, 30)
+    assert parse_rate_limit(" 36 / h ") == (0.01, 36)
+
+    # Given invalid rate limits
+    # Then they should be rejected
+    for rate_limit in ("100", "0/s", "-1/s", "1.5/s", "10/d", "s/10", 100):
+        with pytest.raises(InvalidArgument):
+            parse_rate_limit(rate_limit)  # type: ignore
+
+
+def test_rate_limit__invalid_at_definition():
+    # When a task is defined with an invalid rate limit
+    # Then it should fail right away
+    with pytest.raises(InvalidArgument):
+
+        @aiotaskq.task(options={"rate_limit": "100/d"})
+        def _some_task() -> None:
+            pass
+
+    with pytest.raises(InvalidArgument):
+        simple_app.add.with_rate_limit("fast")
+
+
+@pytest.mark.parametrize("serialization_type", [SerializationType.JSON, SerializationType.PICKLE])
+def test_rate_limit__serialization(
+    serialization_type: SerializationType, monkeypatch: pytest.MonkeyPatch
+):
+    # pylint: disable=protected-access
+    # Given a call to a task with a rate limit, which reserved its tokens
+    monkeypatch.setenv("AIOTASKQ_SERIALIZATION", serialization_type.value)
+    task = simple_app.add.with_rate_limit("10/m")._bind_call((1, 2), {})
+    task.rate_limit_reserved = True
+
+    # When it's serialized and deserialized
+    serialized: bytes = Serialization.serialize(task)
+    task_: Task = Serialization.deserialize(Task, serialized)
+
+    # Then it should keep its rate limit and reservation
+    assert task_.rate_limit == "10/m"
+    assert task_.rate_limit_reserved is True
+
+
+@pytest.fixture(name="script_calls")
+def fixture_script_calls(monkeypatch: pytest.MonkeyPatch) -> list[list]:
+    """Record the arguments of every call to the scripts of the rate limiter."""
+    calls: list[list] = []
+
+    class _Client:
+        def __init__(self, url: str) -> None:
+            self._client = RedisConnectionPools.get_client(url=url)
+
+        def register_script(self, script: str):
+            registered = self._client.register_script(script)
+
+            async def _call(keys: list, args: list):
+                calls.append(args)
+                return await registered(keys=keys, args=args)
+
+            return _call
+
+    class _Pools:
+        get_client = _Client
+
+    monkeypatch.setattr("aiotaskq.rate_limit.RedisConnectionPools", _Pools)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_acquire__in_batches(bucket_keys: list[str], script_calls: list[list]):
+    # pylint: disable=protected-access
+    # Given a task limited to 100 calls per second
+    task = simple_app.add.with_rate_limit("100/s")
+    client = RedisConnectionPools.get_client(url=Config.rate_limit_url())
+
+    # When a lone call takes its token
+    assert await RateLimiter.acquire(task) == 0
+    # Then only its own token should be taken from the bucket
+    assert float(await client.hget(bucket_keys[0], "tokens")) == pytest.approx(99, abs=1)
+
+    # When many calls take their tokens at once
+    script_calls.clear()
+    for _ in range(20):
+        assert await RateLimiter.acquire(task) == 0
+    # Then they should take them in batches, growing up to a tenth of a second's worth
+    assert len(script_calls) < 10
+    assert max(args[3] for args in script_calls) == 10
+
+    # When the tokens left in the batch are not spent in time
+    unspent, _ = RateLimiter._tokens[task.name]
+    await asyncio.sleep(0.25)
+    script_calls.clear()
+    assert await RateLimiter.acquire(task) == 0
+    # Then they should be returned to the bucket with the next batch
+    [[*_, returned]] = script_calls
+    assert returned == unspent
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("bucket_keys")
+async def test_acquire__reserves_over_limit():
+    # Given a task limited to 2 calls per minute, whose burst is spent
+    task = simple_app.add.with_rate_limit("2/m")
+    assert await RateLimiter.acquire(task) == 0
+    assert await RateLimiter.acquire(task) == 0
+
+    # When the next calls take their tokens
+    wait_1_s: float = await RateLimiter.acquire(task)
+    wait_2_s: float = await RateLimiter.acquire(task)
+
+    # Then they should reserve the next tokens, each due in turn
+    assert 29 < wait_1_s <= 30.001
+    assert 59 < wait_2_s <= 60.001
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("bucket_keys")
+async def test_apply_many__rate_limited(worker: WorkerFixture):
+    # Given workers running a task limited to 5 calls per second
+    await worker.start(app=simple_app.__name__, concurrency=4)
+
+    # When 10 calls are applied at once
+    t_0 = time.perf_counter()
+    results = await simple_app.add_rate_limited.apply_many([(i, 1) for i in range(10)])
+    elapsed_s: float = time.perf_counter() - t_0
+
+    # Then the first 5 should be executed right away, and the others deferred to one every 0.2s
+    assert results == [i + 1 for i in range(10)]
+    assert 0.9 < elapsed_s < 3
+
+
+@pytest.mark.asyncio
+async def test_apply_async__below_rate_limit_not_deferred(
+    worker: WorkerFixture, bucket_keys: list[str]
+):
+    # Given several grunt workers running a task limited to 50 calls per second, each one of them
+    # receiving a call in turn
+    await worker.start(
+        app=simple_app.__name__, concurrency=4, dispatch_strategy=DispatchStrategy.ROUND_ROBIN
+    )
+    task = simple_app.add.with_rate_limit("50/s")
+
+    # When the task is called at half its limit, i.e. 25 times per second, for 2 seconds
+    calls: list[asyncio.Task] = []
+    for i in range(50):
+        calls.append(asyncio.create_task(task.apply_async(i, 1)))
+        await asyncio.sleep(0.04)
+    assert await asyncio.gather(*calls) == [i + 1 for i in range(50)]
+
+    # Then the calls should only have taken their own tokens, so the bucket should never have run
+    # dry, i.e. no call should have been deferred
+    client = RedisConnectionPools.get_client(url=Config.rate_limit_url())
+    assert float(await client.hget(bucket_keys[0], "tokens")) > 20
@@ -0,0 +1,115 @@
+import hashlib
+
+import pytest
+
+from aiotaskq import App
+from aiotaskq.exceptions import TaskNotRegistered
+from aiotaskq.registry import TaskRegistry, get_task_code
+from aiotaskq.task import Task, task
+from tests.apps import simple_app
+
+
+@pytest.fixture(name="registry")
+def fixture_registry():
+    # pylint: disable=protected-access
+    state = (
+        dict(TaskRegistry._tasks),
+        dict(TaskRegistry._tasks_by_code),
+        set(TaskRegistry._ambiguous_codes),
+    )
+    app_state = dict(App._task_registry)
+    yield TaskRegistry
+    TaskRegistry.reset()
+    TaskRegistry._tasks, TaskRegistry._tasks_by_code, TaskRegistry._ambiguous_codes = state
+    App._task_registry = app_state
+
+
+def test_task_decorator__registers_task(registry: type[TaskRegistry]):
+    # Given an app whose module has been imported
+    assert simple_app.add.name == "tests.apps.simple_app.add"
+
+    # Then its tasks should be registered with the App by qualified name
+    # pylint: disable=protected-access
+    assert App._task_registry["tests.apps.simple_app.add"] is simple_app.add
+    assert App().add is simple_app.add
+    # And should be resolved by their full names and compact codes
+    assert registry.get("tests.apps.simple_app", "add") is simple_app.add
+    assert registry.get_by_code(get_task_code("tests.apps.simple_app.add")) is simple_app.add
+    assert registry.get_code(simple_app.add) == get_task_code("tests.apps.simple_app.add")
+
+
+@pytest.mark.usefixtures("registry")
+def test_task_decorator__same_name_in_different_modules():
+    # Given a task named like a task of another module
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    other_add = task()(add)
+
+    # Then both tasks should be registered with the App
+    app = App()
+    assert getattr(app, "tests.apps.simple_app.add") is simple_app.add
+    assert getattr(app, other_add.name) is other_add
+    # And neither should be accessed by their shared name
+    with pytest.raises(AttributeError, match='Several tasks are named "add"'):
+        _ = app.add
+
+
+def test_get_by_code__task_unknown_to_the_worker(registry: type[TaskRegistry]):
+    # Given a task known to the worker, and one unknown to it, whose names share a 32-bit hash
+    name, other_name = "tests.test_registry.task_58345", "tests.test_registry.task_126832"
+    assert (
+        hashlib.blake2b(name.encode(), digest_size=4).digest()
+        == hashlib.blake2b(other_name.encode(), digest_size=4).digest()
+    )
+
+    def _some_task() -> None:
+        pass
+
+    _some_task.__qualname__ = "task_58345"
+    registry.register(Task(_some_task))
+
+    # When resolving the unknown task by its code
+    # Then it should not be resolved to the known task
+    with pytest.raises(TaskNotRegistered):
+        registry.get_by_code(get_task_code(other_name))
+
+
+def test_freeze__unknown_task_fails_fast(registry: type[TaskRegistry]):
+    # Given the registry has been frozen
+    registry.freeze()
+
+    # When resolving a task that is not registered
+    # Then a helpful error should be raised without importing anything
+    with pytest.raises(TaskNotRegistered, match='Task "os.path.join" is not registered'):
+        registry.get("os.path", "join")
+    with pytest.raises(
+        TaskNotRegistered, match='Task with code "0000000000000000" is not registered'
+    ):
+        registry.get_by_code("0000000000000000")
+
+
+def test_register__ambiguous_code_falls_back_to_full_name(
+    registry: type[TaskRegistry], monkeypatch: pytest.MonkeyPatch
+):
+    # Given two tasks whose codes collide
+    monkeypatch.setattr("aiotaskq.registry.get_task_code", lambda name: "0000000000000000")
+    task_1, task_2 = Task(simple_app.add.func), Task(simple_app.power.func)
+    registry.register(task_1)
+    registry.register(task_2)
+
+    # Then neither should be sent with a code
+    assert registry.get_code(task_1) is None
+    assert registry.get_code(task_2) is None
+    # And the code should not resolve to either of them
+    with pytest.raises(TaskNotRegistered):
+        registry.get_by_code("0000000000000000")
+
+
+def test_generate_task_id__compact():
+    # When generating task ids
+    task_ids = {simple_app.add.generate_task_id() for _ in range(1000)}
+
+    # Then they should be unique and compact
+    assert len(task_ids) == 1000
+    assert {len(task_id) for task_id in task_ids} == {22}
@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+
+import pytest
+
+from aiotaskq import AsyncResultHandle
+from aiotaskq.exceptions import ResultBackendNotConfigured
+from aiotaskq.result_backend import RedisResultBackend
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("result_backend")
+async def test_send__fetch_result_later(worker: WorkerFixture):
+    # Given a worker with a result backend
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When tasks are sent
+    handle = await simple_app.wait.send(t_s=0.5)
+    handle_2 = await simple_app.add.send(1, 2)
+
+    # Then the result should not be ready until the task is done
+    assert not await handle.ready()
+    assert await handle.get(timeout=5) == 0.5
+    assert await handle.ready()
+    # And the result should be fetched again later, even with a new handle
+    assert await AsyncResultHandle(task_id=handle.task_id).get() == 0.5
+    assert await AsyncResultHandle.get_many([handle_2, handle], timeout=5) == [3, 0.5]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("result_backend")
+async def test_send__error_and_timeout(worker: WorkerFixture):
+    # Given a worker with a result backend
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When a task that raises is sent
+    handle = await simple_app.append_to_file_2.send(filename=f"/tmp/{uuid.uuid4()}")
+
+    # Then getting its result should raise its error
+    with pytest.raises(simple_app.SomeException2):
+        await handle.get(timeout=5)
+    # And getting the result of a task that is not done should time out
+    with pytest.raises(asyncio.TimeoutError):
+        await AsyncResultHandle(task_id=str(uuid.uuid4())).get(timeout=0.1)
+
+
+@pytest.mark.asyncio
+async def test_store__bounded_size(
+    result_backend: RedisResultBackend, monkeypatch: pytest.MonkeyPatch
+):
+    # Given the result backend holds at most 2 results
+    monkeypatch.setenv("AIOTASKQ_RESULT_BACKEND_MAX_SIZE", "2")
+
+    # When 3 results are stored
+    task_ids = [str(uuid.uuid4()) for _ in range(3)]
+    for task_id in task_ids:
+        await result_backend.store(task_id=task_id, message=task_id.encode())
+
+    # Then only the last 2 should remain
+    assert await result_backend.fetch_many(task_ids) == [None, *[t.encode() for t in task_ids[1:]]]
+
+
+@pytest.mark.asyncio
+async def test_send__result_backend_not_configured(monkeypatch: pytest.MonkeyPatch):
+    # Given no result backend is configured
+    monkeypatch.delenv("AIOTASKQ_RESULT_BACKEND_URL", raising=False)
+
+    # When sending a task
+    # Then a helpful error should be raised
+    with pytest.raises(ResultBackendNotConfigured):
+        await simple_app.add.send(1, 2)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("result_backend")
+async def test_send__waiting_clients_dont_starve_broker(
+    worker: WorkerFixture, monkeypatch: pytest.MonkeyPatch
+):
+    # Given a worker, and a result backend on the same url as the broker, with 2 connections each
+    monkeypatch.setenv("AIOTASKQ_BROKER_MAX_CONNECTIONS", "2")
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When 2 clients are waiting for results which aren't stored yet
+    handles = [AsyncResultHandle(task_id=str(uuid.uuid4())) for _ in range(2)]
+    waiting = [asyncio.create_task(handle.get(timeout=5)) for handle in handles]
+    await asyncio.sleep(0.1)
+
+    # Then tasks should still be applied meanwhile
+    assert await asyncio.wait_for(simple_app.add.apply_async(1, 2), timeout=3) == 3
+    for waiter in waiting:
+        waiter.cancel()
+    await asyncio.gather(*waiting, return_exceptions=True)
@@ -0,0 +1,127 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from aiotaskq.dispatch import QueueLoads
+from aiotaskq.exceptions import InvalidArgument
+from aiotaskq.interfaces import PriorityMode
+from aiotaskq.routing import DEFAULT_QUEUE, QueueBuffer, Router, get_queue_channel, parse_queues
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture
+
+
+@pytest.fixture(name="router")
+def fixture_router():
+    Router.reset()
+    yield Router
+    Router.reset()
+
+
+def test_get_queue__precedence(router: type[Router], monkeypatch: pytest.MonkeyPatch):
+    # Given no routing rules
+    # Then tasks should be routed to the default queue
+    assert router.get_queue(simple_app.add) == DEFAULT_QUEUE
+
+    # When routing rules are given via env var
+    monkeypatch.setenv("AIOTASKQ_ROUTES", "tests.apps.simple_app.a*=io, tests.apps.*=cpu")
+    # Then tasks should be routed to the queue of the first matching rule
+    assert router.get_queue(simple_app.add) == "io"
+    assert router.get_queue(simple_app.echo) == "cpu"
+
+    # When routing rules are added
+    router.add_route("tests.apps.simple_app.add", "fast")
+    # Then they should take precedence over the ones given via env var
+    assert router.get_queue(simple_app.add) == "fast"
+    assert router.get_queue(simple_app.echo) == "cpu"
+
+    # And the queue of a task should take precedence over any rule
+    assert router.get_queue(simple_app.add.with_queue("slow")) == "slow"
+
+
+def test_parse_queues():
+    # When parsing the queues with their concurrency limits
+    # Then each queue should be limited as given
+    assert parse_queues("cpu:4,default, io:16") == {"cpu": 4, "default": None, "io": 16}
+    # And invalid queues should raise an error
+    for queues in ("cpu:0", "cpu:a", "", "a b", "cpu,"):
+        with pytest.raises(InvalidArgument):
+            parse_queues(queues)
+    with pytest.raises(InvalidArgument):
+        simple_app.add.with_queue("channel:tasks")
+
+
+@pytest.mark.asyncio
+async def test_apply_async__only_queues_consumed(worker: WorkerFixture):
+    # Given a worker consuming only the "cpu" queue
+    await worker.start(app=simple_app.__name__, concurrency=1, queues="cpu")
+
+    # When tasks are published to the "cpu" queue
+    # Then they should be executed, even if delayed
+    assert await simple_app.add.with_queue("cpu").apply_async(x=1, y=2) == 3
+    assert await simple_app.add.with_queue("cpu").with_countdown(0.3).apply_async(x=2, y=2) == 4
+    assert await simple_app.add.with_queue("cpu").apply_many([(1, 1), (2, 2)]) == [2, 4]
+
+    # When a task is published to the default queue
+    # Then it should not be executed
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(simple_app.add.apply_async(x=1, y=2), timeout=0.5)
+
+
+@pytest.mark.asyncio
+async def test_apply_async__queue_concurrency(worker: WorkerFixture):
+    # Given a worker consuming the "slow" queue with a concurrency of 1, and the default queue
+    await worker.start(app=simple_app.__name__, concurrency=1, queues="slow:1,default")
+
+    # When tasks are published to the "slow" queue, then to the default queue
+    t_0 = time.perf_counter()
+    slow = asyncio.gather(*[simple_app.wait.with_queue("slow").apply_async(0.4) for _ in range(3)])
+    await asyncio.sleep(0.1)
+    assert await simple_app.echo.apply_async(1) == 1
+
+    # Then the tasks of the default queue should not wait for the tasks of the "slow" queue
+    assert time.perf_counter() - t_0 < 0.4
+    # And the tasks of the "slow" queue should be executed one at a time
+    await slow
+    assert time.perf_counter() - t_0 >= 1.2
+
+
+class _OneMessagePubSub:
+    """Receive a single message, then nothing."""
+
+    def __init__(self, channel: str, data: bytes) -> None:
+        self._messages = [{"channel": channel.encode(), "data": data}]
+
+    async def poll(self) -> dict:
+        if not self._messages:
+            await asyncio.Event().wait()
+        return self._messages.pop()
+
+
+@pytest.mark.asyncio
+async def test_queue_buffer_get__woken_up_by_release():
+    # Given a message buffered in a queue at its concurrency limit
+    loads = QueueLoads(limits=[1])
+    loads.add_outstanding(0)
+    buffer = QueueBuffer(channel="some-channel", queues=["cpu"], mode=PriorityMode.STRICT)
+    pubsub = _OneMessagePubSub(channel=get_queue_channel("cpu", "some-channel"), data=b"a")
+    receiving = asyncio.create_task(buffer.receive_forever(pubsub))  # type: ignore
+
+    # When a task of the queue is done, in another process, a bit later
+    def _release_later():
+        time.sleep(0.2)
+        loads.remove_outstanding(0)
+
+    proc = multiprocessing.Process(target=_release_later)
+    proc.start()
+    t_0 = time.perf_counter()
+    queue_index, priority, message = await asyncio.wait_for(
+        buffer.get(has_capacity=loads.has_capacity, released=loads.wait_for_release), timeout=5
+    )
+    proc.join()
+    receiving.cancel()
+
+    # Then the message should be returned as soon as the queue has room for it
+    assert (queue_index, priority, message["data"]) == (0, 0, b"a")
+    assert 0.2 <= time.perf_counter() - t_0 < 1
@@ -0,0 +1,138 @@
+import asyncio
+import datetime
+import time
+
+import pytest
+import pytest_asyncio
+
+from aiotaskq.config import Config
+from aiotaskq.constants import Constants
+from aiotaskq.exceptions import InvalidArgument
+from aiotaskq.pubsub import RedisConnectionPools
+from aiotaskq.scheduler import Scheduler
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture
+
+
+@pytest_asyncio.fixture(name="schedule_key")
+async def fixture_schedule_key():
+    key: str = Constants.schedule_key_template().format(channel=Constants.tasks_channel())
+    client = RedisConnectionPools.get_client(url=Config.schedule_url())
+    await client.delete(key)
+    yield key
+    await client.delete(key)
+
+
+@pytest.mark.asyncio
+async def test_with_countdown(worker: WorkerFixture):
+    # Given a worker running
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When a task is applied with a countdown
+    t_0 = time.perf_counter()
+    result = await simple_app.add.with_countdown(1).apply_async(x=1, y=2)
+
+    # Then it should be executed once the countdown is over
+    assert time.perf_counter() - t_0 >= 1
+    assert result == 3
+
+
+@pytest.mark.asyncio
+async def test_with_eta__apply_many(worker: WorkerFixture):
+    # Given a worker running
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When many calls to a task are applied with an ETA
+    t_0 = time.perf_counter()
+    eta = datetime.datetime.now() + datetime.timedelta(seconds=1)
+    results = await simple_app.add.with_eta(eta).apply_many([(i, 1) for i in range(10)])
+
+    # Then they should be executed once the ETA is reached
+    assert time.perf_counter() - t_0 >= 1
+    assert results == [i + 1 for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_with_eta__in_the_past(worker: WorkerFixture, schedule_key: str):
+    # Given a worker running
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When a task is applied with an ETA in the past
+    result = await simple_app.add.with_eta(time.time() - 60).apply_async(x=1, y=2)
+
+    # Then it should be published right away, without being scheduled
+    assert result == 3
+    client = RedisConnectionPools.get_client(url=Config.schedule_url())
+    assert await client.zcard(schedule_key) == 0
+
+
+def test_with_countdown__invalid():
+    # When setting an invalid countdown or ETA
+    # Then an error should be raised
+    with pytest.raises(InvalidArgument):
+        simple_app.add.with_countdown(-1)
+    with pytest.raises(InvalidArgument):
+        simple_app.add.with_eta("tomorrow")
+    # And the original task should be unchanged
+    assert simple_app.add.with_countdown(1).eta is not None
+    assert simple_app.add.eta is None
+
+
+@pytest.mark.asyncio
+async def test_retry__countdown(worker: WorkerFixture, some_file: str):
+    # Given a worker running, and a task failing twice then retried after a countdown
+    await worker.start(app=simple_app.__name__, concurrency=1)
+    task = simple_app.append_to_file_first_3_times_with_error.with_retry(
+        max_retries=2, on=(simple_app.SomeException,), countdown_s=0.5
+    )
+
+    # When the task is applied
+    t_0 = time.perf_counter()
+    await task.apply_async(filename=some_file)
+
+    # Then it should succeed after 2 retries, each after the countdown
+    assert time.perf_counter() - t_0 >= 1
+    with open(some_file, mode="r", encoding="utf-8") as fi:
+        assert len(fi.read().splitlines()) == 3
+
+
+@pytest.mark.asyncio
+async def test_promote__only_due_tasks_in_batches(schedule_key: str):
+    # Given many tasks due, and some tasks due later
+    channel: str = Constants.tasks_channel()
+    await Scheduler.schedule(channel, messages=[f"due-{i}".encode() for i in range(1500)], eta=0)
+    await Scheduler.schedule(channel, messages=[b"later-1", b"later-2"], eta=time.time() + 60)
+
+    # When promoting the due tasks
+    promoted = [await Scheduler.promote() for _ in range(3)]
+
+    # Then they should be promoted in batches, leaving the tasks due later scheduled
+    assert promoted == [1000, 500, 0]
+    client = RedisConnectionPools.get_client(url=Config.schedule_url())
+    assert await client.zrange(schedule_key, 0, -1) == [b"later-1", b"later-2"]
+
+
+@pytest.mark.asyncio
+async def test_promote_forever__backs_off_while_unreachable(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+):
+    # Given the schedule store is unreachable
+    monkeypatch.setenv("AIOTASKQ_SCHEDULE_URL", "redis://127.0.0.1:1")
+    monkeypatch.setenv("AIOTASKQ_SCHEDULE_POLL_INTERVAL_S", "0.01")
+    attempts: list[float] = []
+    promote = Scheduler.promote
+
+    async def _promote(*args, **kwargs) -> int:
+        attempts.append(time.perf_counter())
+        return await promote(*args, **kwargs)
+
+    monkeypatch.setattr(Scheduler, "promote", _promote)
+
+    # When promoting the due tasks for a while
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(Scheduler.promote_forever(), timeout=0.7)
+
+    # Then the attempts should be backed off, and the failure logged once
+    assert 3 <= len(attempts) <= 6
+    assert attempts[-1] - attempts[-2] > 2 * (attempts[1] - attempts[0])
+    assert len([r for r in caplog.records if r.levelname == "ERROR"]) == 1
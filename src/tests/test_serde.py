@@ -1,8 +1,16 @@
+import datetime
 from importlib import import_module
 import json
+import os
+import pickle
 
-from aiotaskq.serde import JsonTaskSerialization
-from aiotaskq.task import Task, task
+import pytest
+
+from aiotaskq.exceptions import CompressionNotSupported, SerializationTypeNotSupported
+from aiotaskq.interfaces import CompressionType, SerializationType
+from aiotaskq.registry import get_task_code
+from aiotaskq.serde import JsonTaskSerialization, Serialization
+from aiotaskq.task import AsyncResult, Task, task
 
 
 @task()
@@ -23,6 +31,11 @@ def some_task_2(a: int, b: int) -> int:
     return a * b
 
 
+@task(options={"compression": CompressionType.ZLIB})
+def some_task_3(ids: list[int]) -> int:
+    return len(ids)
+
+
 def test_serialize_task_to_json():
     # Given a task definition
     assert isinstance(some_task, Task)
@@ -39,11 +52,13 @@ def test_serialize_task_to_json():
     # And the task should be serialized into correct json
     task_serialized_dict = json.loads(task_serialized_str)
     assert task_serialized_dict == {
-        "func": {"module": "tests.test_serde", "qualname": "some_task"},
+        "func": get_task_code("tests.test_serde.some_task"),
         "task_id": None,
         "args": None,
         "kwargs": None,
         "options": {},
+        "reply_to": None,
+        "retries": 0,
     }
     # And should be functionally the same as the original task
     assert task_deserialized.func(1, 2) == some_task.func(1, 2)
@@ -64,7 +79,7 @@ def test_serialize_task_to_json__with_retry_param():
     # And the serialized task should contain information about retry
     task_serialized_dict = json.loads(task_serialized_str)
     assert task_serialized_dict == {
-        "func": {"module": "tests.test_serde", "qualname": "some_task_2"},
+        "func": get_task_code("tests.test_serde.some_task_2"),
         "task_id": None,
         "args": None,
         "kwargs": None,
@@ -74,7 +89,194 @@ def test_serialize_task_to_json__with_retry_param():
                 "on": '{"py/tuple": [{"py/type": "tests.test_serde.SomeException"}]}',
             },
         },
+        "reply_to": None,
+        "retries": 0,
     }
     # And the deserialized task should function the same as the original
-    task_deserialized = import_module(task_serialized_dict["func"]["module"]).some_task_2
+    task_deserialized = import_module("tests.test_serde").some_task_2
     assert task_deserialized(2, 3) == some_task_2(2, 3)
+
+
+def test_serialize_task__compressed_with_task_compression_option():
+    # Given a task with compression option, applied with big arguments
+    task_ = Task(some_task_3.func, compression=some_task_3.compression)
+    task_.id = "some-task-id"
+    task_.args, task_.kwargs = (list(range(10000)),), {}
+
+    # When the task is serialized
+    task_serialized = Serialization.serialize(task_, compression_type=task_.compression)
+
+    # Then the serialized task should be compressed
+    assert task_serialized.startswith(b"json+zlib|")
+    assert len(task_serialized) < len(JsonTaskSerialization.serialize(task_)) / 2
+    # And should be deserialized into the same task, including its compression option
+    task_deserialized = Serialization.deserialize(Task, task_serialized)
+    assert task_deserialized.args == [list(range(10000))]
+    assert task_deserialized.compression == CompressionType.ZLIB
+
+
+def test_serialize_async_result__small_message_not_compressed():
+    # Given a small result
+    result = AsyncResult(task_id="some-task-id", ready=True, result=1, error=None)
+
+    # When the result is serialized with compression
+    result_serialized = Serialization.serialize(result, compression_type=CompressionType.ZLIB)
+
+    # Then it should be sent as is since compressing it is not worth it
+    assert result_serialized.startswith(b"json|")
+    assert Serialization.deserialize(AsyncResult, result_serialized).result == 1
+
+
+def test_serialize_async_result__global_compression(monkeypatch: pytest.MonkeyPatch):
+    # Given compression is configured globally
+    monkeypatch.setenv("AIOTASKQ_COMPRESSION", "zlib")
+    monkeypatch.setenv("AIOTASKQ_COMPRESSION_MIN_SIZE", "0")
+
+    # When a result is serialized without specifying the compression
+    result = AsyncResult(task_id="some-task-id", ready=True, result={"a": 1}, error=None)
+    result_serialized = Serialization.serialize(result)
+
+    # Then the globally configured compression should be used
+    assert result_serialized.startswith(b"json+zlib|")
+    assert Serialization.deserialize(AsyncResult, result_serialized).result == {"a": 1}
+
+
+def test_unsupported_compression():
+    # Given an unsupported compression
+    # When defining a task with that compression
+    # Then a helpful error should be raised
+    with pytest.raises(CompressionNotSupported, match='Compression "brotli" is not supported.'):
+        task(options={"compression": "brotli"})(some_task.func)
+
+
+@pytest.mark.parametrize(
+    "serialization_type", [SerializationType.PICKLE, SerializationType.MSGPACK]
+)
+def test_serialize_task__binary_serialization(
+    monkeypatch: pytest.MonkeyPatch, serialization_type: SerializationType
+):
+    # Given a binary serialization type is configured
+    if serialization_type == SerializationType.MSGPACK:
+        pytest.importorskip("msgpack")
+    monkeypatch.setenv("AIOTASKQ_SERIALIZATION", serialization_type.value)
+    # And a task applied with bytes arguments
+    task_ = some_task_2.with_retry(max_retries=2, on=(SomeException,))
+    task_.id, task_.args, task_.kwargs = "some-task-id", (b"\x00\x01", 2), {"c": b"\xff"}
+
+    # When the task is serialized
+    task_serialized = Serialization.serialize(task_)
+
+    # Then the message should be headed by the serialization type
+    assert task_serialized.startswith(f"{serialization_type.value}|".encode())
+    # And should be deserialized into the same task by workers configured otherwise that accept it
+    monkeypatch.setenv("AIOTASKQ_SERIALIZATION", "json")
+    monkeypatch.setenv("AIOTASKQ_ACCEPT_SERIALIZATION", "json,msgpack,pickle")
+    Serialization.reset()
+    task_deserialized = Serialization.deserialize(Task, task_serialized)
+    assert list(task_deserialized.args) == [b"\x00\x01", 2]
+    assert task_deserialized.kwargs == {"c": b"\xff"}
+    assert task_deserialized.retry == {"max_retries": 2, "on": (SomeException,)}
+    assert task_deserialized(3, 4) == some_task_2(3, 4)
+
+
+class _Exploit:
+    def __reduce__(self):
+        return (os.system, ("exit 1",))
+
+
+def test_deserialize__pickle_not_accepted_by_default(monkeypatch: pytest.MonkeyPatch):
+    # Given workers with the default serialization configuration
+    monkeypatch.delenv("AIOTASKQ_SERIALIZATION", raising=False)
+    monkeypatch.delenv("AIOTASKQ_ACCEPT_SERIALIZATION", raising=False)
+    # And a pickled message running code when it's unpickled
+    message = b"pickle|" + pickle.dumps(_Exploit())
+
+    # When it's deserialized
+    # Then it should be rejected without being unpickled
+    with pytest.raises(SerializationTypeNotSupported):
+        Serialization.deserialize(Task, message)
+    # And so should messages with an unknown header
+    with pytest.raises(SerializationTypeNotSupported):
+        Serialization.deserialize(Task, b"yaml|a: 1")
+
+
+def test_serialize__pickle_preserves_python_types(monkeypatch: pytest.MonkeyPatch):
+    # Given the pickle serialization type is configured
+    monkeypatch.setenv("AIOTASKQ_SERIALIZATION", "pickle")
+    # And a task applied with arguments that JSON can't represent
+    args = ((1, 2), {3}, datetime.datetime(2022, 1, 1), bytearray(b"x" * 1024))
+    task_ = Task(some_task.func, task_id="some-task-id", args=args, kwargs={})
+    # And a result with an error
+    result = AsyncResult(task_id="some-task-id", ready=True, result=None, error=SomeException("a"))
+
+    # When they are serialized then deserialized
+    task_deserialized = Serialization.deserialize(Task, Serialization.serialize(task_))
+    result_deserialized = Serialization.deserialize(AsyncResult, Serialization.serialize(result))
+
+    # Then the arguments should be the same, including their types
+    assert task_deserialized.args == args
+    # And so should the error
+    assert isinstance(result_deserialized.error, SomeException)
+    assert result_deserialized.error.args == ("a",)
+
+
+def test_serialize_task__full_name_fallback(monkeypatch: pytest.MonkeyPatch):
+    # Given compact task names are disabled
+    monkeypatch.setenv("AIOTASKQ_COMPACT_TASK_NAMES", "false")
+
+    # When a task is serialized
+    task_serialized = JsonTaskSerialization.serialize(some_task)
+
+    # Then it should be referred to by its full name
+    task_serialized_dict = json.loads(task_serialized.decode("utf-8").split("|", 1)[1])
+    assert task_serialized_dict["func"] == {"module": "tests.test_serde", "qualname": "some_task"}
+    # And should still be deserialized into the same task
+    assert JsonTaskSerialization.deserialize(Task, task_serialized)(3, 4) == some_task(3, 4)
+
+
+@pytest.mark.parametrize("serialization_type", list(SerializationType))
+def test_get_envelope__task_not_registered(
+    monkeypatch: pytest.MonkeyPatch, serialization_type: SerializationType
+):
+    # Given a serialized call to a task not registered in the worker
+    if serialization_type == SerializationType.MSGPACK:
+        pytest.importorskip("msgpack")
+    monkeypatch.setenv("AIOTASKQ_SERIALIZATION", serialization_type.value)
+    monkeypatch.setenv("AIOTASKQ_COMPACT_TASK_NAMES", "false")
+
+    def _some_task() -> None:
+        pass
+
+    task_ = Task(_some_task, task_id="some-task-id", args=(), kwargs={}, store_result=True)
+    task_.reply_to = "some-channel"
+    message = Serialization.serialize(task_, compression_type=CompressionType.ZLIB)
+
+    # When getting its envelope
+    # Then it should be decoded without resolving the task
+    assert (
+        Serialization.get_envelope(message)
+        == task_.envelope
+        == {
+            "task_id": "some-task-id",
+            "reply_to": "some-channel",
+            "store_result": True,
+        }
+    )
+    # But not that of a message that can't be decoded
+    assert Serialization.get_envelope(b"json|{") is None
+
+
+def test_serialize__configuration_read_once(monkeypatch: pytest.MonkeyPatch):
+    # Given messages were serialized with the JSON serialization type
+    monkeypatch.setenv("AIOTASKQ_SERIALIZATION", "json")
+    assert Serialization.serialize(some_task).startswith(b"json|")
+
+    # When the configured serialization type changes
+    monkeypatch.setenv("AIOTASKQ_SERIALIZATION", "pickle")
+    monkeypatch.setattr(
+        "aiotaskq.config.Config.serialization_type", lambda: pytest.fail("Read again")
+    )
+
+    # Then the messages should keep being serialized without reading the configuration again
+    assert Serialization.serialize(some_task).startswith(b"json|")
+    assert isinstance(Serialization.deserialize(Task, Serialization.serialize(some_task)), Task)
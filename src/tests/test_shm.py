@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from aiotaskq.shm import SharedMemoryArgs
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture
+
+
+def _list_shared_memory() -> set[str]:
+    return set(os.listdir("/dev/shm"))
+
+
+def test_share_and_attach():
+    # Given some buffer arguments, including a 2-dimensional one, along with regular arguments
+    rows = memoryview(bytearray(range(6))).cast("B", [2, 3])
+    args, kwargs = (b"hello", 1), {"rows": rows, "name": "x"}
+
+    # When the arguments are shared then attached, like the client then the worker would do
+    args_shared, kwargs_shared, segments = SharedMemoryArgs.share(args, kwargs)
+    args_attached, kwargs_attached, attached = SharedMemoryArgs.attach(args_shared, kwargs_shared)
+
+    # Then only the buffer arguments should be replaced by handles
+    assert isinstance(args_shared[0], dict) and args_shared[1] == 1
+    assert isinstance(kwargs_shared["rows"], dict) and kwargs_shared["name"] == "x"
+    # And the attached arguments should be views of the same data, format and shape
+    assert args_attached[0].tobytes() == b"hello"
+    assert kwargs_attached["rows"].shape == (2, 3)
+    assert kwargs_attached["rows"].tolist() == [[0, 1, 2], [3, 4, 5]]
+    assert args_attached[1] == 1 and kwargs_attached["name"] == "x"
+
+    # And the segments should be removed once detached and unlinked
+    SharedMemoryArgs.detach(attached)
+    SharedMemoryArgs.unlink(segments)
+    assert not {segment.name for segment in segments} & _list_shared_memory()
+
+
+@pytest.mark.asyncio
+async def test_apply_async__shared_memory(worker: WorkerFixture):
+    # Given a worker running a task with the shared memory option
+    await worker.start(app=simple_app.__name__, concurrency=1)
+    shared_memory_before = _list_shared_memory()
+
+    # When applying the task with big buffer arguments
+    data = os.urandom(1024 * 1024)
+    rows = memoryview(bytearray(range(6))).cast("B", [2, 3])
+    result = await simple_app.checksum.apply_async(data, rows=rows)
+
+    # Then the result should be the same as calling the task synchronously
+    assert result == simple_app.checksum(data, rows=rows)
+    # And no shared memory segment should be left behind
+    assert _list_shared_memory() == shared_memory_before
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from aiotaskq.single_flight import SingleFlight
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture, get_num_executions
+
+
+class _NotCoalescedLocally(dict):
+    """Make every call in this process look like it's made from a different process."""
+
+    def get(self, *_):
+        return None
+
+    def __setitem__(self, *_):
+        pass
+
+    def __delitem__(self, *_):
+        pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("result_backend")
+async def test_apply_async__coalesced_locally(worker: WorkerFixture, some_file: str):
+    # Given a worker running a single-flight task
+    await worker.start(app=simple_app.__name__, concurrency=4)
+
+    # When the task is called concurrently with the same arguments
+    results = await asyncio.gather(
+        *[simple_app.single_flight_wait.apply_async(some_file, t_s=0.5) for _ in range(10)]
+    )
+
+    # Then it should be executed only once, and every caller should get its result
+    assert results == [0.5] * 10
+    assert get_num_executions(some_file) == 1
+    assert not SingleFlight._in_flight  # pylint: disable=protected-access
+
+    # And it should be executed again once the first calls are done
+    await simple_app.single_flight_wait.apply_async(some_file, t_s=0.1)
+    assert get_num_executions(some_file) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("result_backend")
+async def test_apply_async__coalesced_across_processes(
+    worker: WorkerFixture, some_file: str, monkeypatch: pytest.MonkeyPatch
+):
+    # Given a worker running a single-flight task
+    await worker.start(app=simple_app.__name__, concurrency=4)
+    # And calls that are not coalesced locally, as if made from different processes
+    monkeypatch.setattr(SingleFlight, "_in_flight", _NotCoalescedLocally())
+
+    # When the task is called concurrently with the same arguments
+    results = await asyncio.gather(
+        *[simple_app.single_flight_wait.apply_async(some_file, t_s=0.5) for _ in range(5)]
+    )
+
+    # Then it should be executed only once, and every caller should get its result
+    assert results == [0.5] * 5
+    assert get_num_executions(some_file) == 1
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture, get_num_executions
+
+
+@pytest.mark.asyncio
+async def test_stream__all_items(
+    worker: WorkerFixture, monkeypatch: pytest.MonkeyPatch, some_file: str
+):
+    # Given a worker and a stream window smaller than the stream
+    monkeypatch.setenv("AIOTASKQ_STREAM_WINDOW", "8")
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When a generator task is streamed
+    # Then every item should be received in order
+    assert [i async for i in simple_app.count.stream(100)] == list(range(100))
+    # And async generator tasks should be streamed too
+    assert [i async for i in simple_app.count_to_file.stream(some_file, 20)] == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_stream__error(worker: WorkerFixture):
+    # Given a worker
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When a streamed task raises
+    items = []
+    with pytest.raises(simple_app.SomeException):
+        async for item in simple_app.count.stream(10, fail_at=3):
+            items.append(item)
+
+    # Then its error should be raised after the items yielded so far
+    assert items == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_stream__flow_control_and_cancel(
+    worker: WorkerFixture, monkeypatch: pytest.MonkeyPatch, some_file: str
+):
+    # Given a worker and a stream window of 4 items
+    monkeypatch.setenv("AIOTASKQ_STREAM_WINDOW", "4")
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When the caller of a long stream consumes its items slowly
+    async for _ in simple_app.count_to_file.stream(some_file, 1000):
+        await asyncio.sleep(0.5)
+        # Then the worker should not produce more than a window ahead of the caller
+        assert get_num_executions(some_file) <= 4 + 1
+        # When the caller stops consuming
+        break
+
+    # Then the generator should be stopped on the worker
+    await asyncio.sleep(0.5)
+    assert get_num_executions(some_file) <= 4 + 1
+    # And the worker should still be available
+    assert await simple_app.add.apply_async(1, 2) == 3
+
+
+@pytest.mark.asyncio
+async def test_apply_async__generator_task(worker: WorkerFixture):
+    # Given a worker
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When a generator task is not streamed
+    # Then all its items should be returned at once
+    assert await simple_app.count.apply_async(5) == [0, 1, 2, 3, 4]
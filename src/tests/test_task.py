@@ -227,6 +227,21 @@ async def test_retry_until_successful(worker: "WorkerFixture", some_file: str):
     assert num_lines == 3  # (first call + 2 retries)
 
 
+def test_with_retry__original_task_unchanged():
+    # Given a task definition without retry options
+    assert simple_app.add.retry is None
+
+    # When the task is copied with retry options
+    task_with_retry = simple_app.add.with_retry(max_retries=1, on=(ValueError,))
+
+    # Then only the copy should have the retry options
+    assert task_with_retry.retry == {"max_retries": 1, "on": (ValueError,)}
+    assert simple_app.add.retry is None
+    # And the copy should still behave like the original
+    assert task_with_retry(1, 2) == simple_app.add(1, 2)
+    assert task_with_retry.name == simple_app.add.name
+
+
 def test_empty_retry_on_during_task_definition__invalid():
     # When a task is defined with options.retry.on = tuple()
     exception = None
@@ -264,3 +279,32 @@ async def test_empty_retry_on_during_task_call__invalid(some_file: str):
     finally:
         # Then InvalidRetryOptions should be raised during task call
         assert isinstance(exception, InvalidRetryOptions), "Task call should fail with InvalidRetryOptions"
+
+
+@pytest.mark.asyncio
+async def test_apply_many(worker: "WorkerFixture"):
+    # Given a worker running in the background
+    await worker.start(app=simple_app.__name__, concurrency=2)
+
+    # When a task is applied many times at once with positional and keyword arguments
+    arguments = [(x, 1) for x in range(1000)] + [{"x": 1, "y": 2}]
+    results = await simple_app.add.apply_many(arguments)
+
+    # Then the results should be returned in the same order as the arguments
+    assert results == [x + 1 for x in range(1000)] + [3]
+
+
+@pytest.mark.asyncio
+async def test_apply_many__invalid_argument(worker: "WorkerFixture"):
+    # Given a worker running in the background
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When a task is applied many times and one of the arguments is invalid
+    # Then an error should raised
+    error = None
+    try:
+        await simple_app.add.apply_many([(1, 2), (1,)])
+    except InvalidArgument as exc:
+        error = exc
+    finally:
+        assert str(error) == "These arguments are invalid: args=(1,), kwargs={}"
@@ -1,3 +1,4 @@
+import asyncio
 import multiprocessing
 import os
 import subprocess
@@ -5,8 +6,14 @@ from typing import TYPE_CHECKING
 
 import pytest
 
+from aiotaskq.config import Config
+from aiotaskq.constants import Constants
+from aiotaskq.exceptions import TaskNotRegistered
 from aiotaskq.interfaces import ConcurrencyType
+from aiotaskq.pubsub import PubSub
+from aiotaskq.task import Task
 from aiotaskq.worker import validate_input
+from tests.apps import simple_app
 
 if TYPE_CHECKING:
     from tests.conftest import WorkerFixture
@@ -155,3 +162,32 @@ class WrapClose:
     def close(self):
         self._stdout.close()
         self._proc.wait()
+
+
+@pytest.mark.asyncio
+async def test_apply_async__task_not_registered(worker: "WorkerFixture"):
+    # Given a worker running an app
+    await worker.start(app="tests.apps.simple_app", concurrency=1)
+    # And a task the app doesn't define
+    def _add(x: int, y: int) -> int:
+        return x + y
+
+    # When the task is applied
+    # Then its caller should get the error rather than wait forever
+    with pytest.raises(TaskNotRegistered):
+        await asyncio.wait_for(Task(_add).apply_async(1, 2), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_undecodable_tasks__release_their_room(worker: "WorkerFixture"):
+    # Given a worker with room for a single task at a time
+    await worker.start(app="tests.apps.simple_app", concurrency=1, worker_rate_limit=1)
+
+    # When it receives tasks that can't be decoded at all
+    pubsub_ = PubSub.get(url=Config.broker_url(), poll_interval_s=Config.poll_interval_s())
+    async with pubsub_ as pubsub:  # pylint: disable=not-async-context-manager
+        for message in [b"yaml|a: 1", b"json|{", b"pickle|x"]:
+            await pubsub.publish(channel=Constants.tasks_channel(), message=message)
+
+    # Then it should still have room for the next tasks
+    assert await asyncio.wait_for(simple_app.add.apply_async(1, 2), timeout=5) == 3
@@ -0,0 +1,108 @@
+import pytest
+
+from aiotaskq import chain, chord, group
+from aiotaskq.exceptions import InvalidArgument
+from aiotaskq.serde import Serialization
+from aiotaskq.task import Task
+from tests.apps import simple_app
+from tests.conftest import WorkerFixture
+
+
+@pytest.mark.asyncio
+async def test_chain__results_passed_between_stages(worker: WorkerFixture):
+    # Given a worker
+    await worker.start(app=simple_app.__name__, concurrency=2)
+
+    # When a workflow with a group in the middle is applied
+    workflow = chain(
+        simple_app.add.s(1, 2),
+        group(simple_app.power.s(2), simple_app.power.s(b=3)),
+        simple_app.join.s(),
+    )
+
+    # Then the result of each stage should be passed to the next one
+    assert await workflow.apply_async() == "9,27"
+
+
+@pytest.mark.asyncio
+async def test_chord_and_group(worker: WorkerFixture):
+    # Given a worker
+    await worker.start(app=simple_app.__name__, concurrency=2)
+
+    # When a chord is applied
+    # Then its body should be called with the results of its header in order
+    workflow = chord([simple_app.add.s(i, i) for i in range(10)], simple_app.join.s(delimiter="-"))
+    assert await workflow.apply_async() == "-".join(str(2 * i) for i in range(10))
+    # And a group alone should return the results of its steps
+    assert await group(simple_app.echo.s(1), simple_app.echo.s("a")).apply_async() == [1, "a"]
+
+
+@pytest.mark.asyncio
+async def test_chain__immutable_step(worker: WorkerFixture):
+    # Given a worker
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When a step is immutable
+    # Then it should not receive the result of the previous stage
+    assert await chain(simple_app.add.s(1, 2), simple_app.add.si(10, 10)).apply_async() == 20
+
+
+@pytest.mark.asyncio
+async def test_chain__error(worker: WorkerFixture):
+    # Given a worker
+    await worker.start(app=simple_app.__name__, concurrency=1)
+
+    # When a step of a workflow raises
+    # Then the workflow should raise its error
+    with pytest.raises(TypeError):
+        await chain(
+            simple_app.add.s(1, 2), simple_app.power.si(1, "x"), simple_app.echo.s()
+        ).apply_async()
+    # And a step called with invalid arguments should fail the workflow too
+    with pytest.raises(InvalidArgument):
+        await chain(simple_app.add.s(1, 2), simple_app.add.s(1, 2)).apply_async()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("result_backend")
+async def test_send(worker: WorkerFixture):
+    # Given a worker with a result backend
+    await worker.start(app=simple_app.__name__, concurrency=2)
+
+    # When a workflow is sent
+    handle = await chord(
+        [simple_app.add.s(1, 1), simple_app.add.s(2, 2)], simple_app.join.s()
+    ).send()
+
+    # Then its final result should be stored
+    assert await handle.get(timeout=5) == "2,4"
+
+
+@pytest.mark.asyncio
+async def test_apply_async__messages_dont_carry_the_workflow(monkeypatch: pytest.MonkeyPatch):
+    # pylint: disable=protected-access
+    # Given the tasks published by workflows are captured
+    published: list[Task] = []
+
+    async def _publish_tasks(tasks: list[Task]) -> None:
+        published.extend(tasks)
+
+    monkeypatch.setattr("aiotaskq.workflow.publish_tasks", _publish_tasks)
+
+    # When chords with small and big headers are started
+    sizes: dict[int, int] = {}
+    for num_steps in (10, 1000):
+        published.clear()
+        workflow = chord([simple_app.add.s(i, i) for i in range(num_steps)], simple_app.join.s())
+        await workflow._start(simple_app.add.generate_task_id(), reply_to=None)
+        sizes[num_steps] = max(len(Serialization.serialize(task_)) for task_ in published)
+
+    # Then the messages of their tasks should be about the same size
+    assert sizes[1000] < sizes[10] + 16
+
+
+def test_group__empty():
+    # When creating an empty group
+    # Then an error should be raised
+    with pytest.raises(InvalidArgument):
+        group()